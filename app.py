@@ -1,75 +1,17 @@
-import gradio as gr
-import torch
-from torchvision import models, transforms
 from PIL import Image
-from datetime import datetime
 import os
-from fpdf import FPDF
-from fpdf.enums import XPos, YPos
-
-# 🧠 Class labels
-CLASS_NAMES = ["glioma", "meningioma", "no_tumor", "pituitary"]
-
-# 🔄 Load selected model
-def load_model():
-    model = models.efficientnet_b0(weights=None)
-    model.classifier[1] = torch.nn.Linear(model.classifier[1].in_features, len(CLASS_NAMES))
-    model.load_state_dict(torch.load("model/efficientnetb0_classifier.pt", map_location="cpu"))
-    model.eval()
-    return model
-
-# 🧪 Image transformation
-transform = transforms.Compose([
-    transforms.Resize((224, 224)),
-    transforms.Grayscale(num_output_channels=3),
-    transforms.ToTensor(),
-    transforms.Normalize([0.485, 0.456, 0.406],
-                         [0.229, 0.224, 0.225])
-])
-
-# 🔍 Prediction function
-def predict(image: Image.Image):
-    model = load_model()
-    image = transform(image.convert("RGB")).unsqueeze(0)
-    with torch.no_grad():
-        outputs = model(image)
-        probabilities = torch.softmax(outputs, dim=1)
-        predicted_index = probabilities.argmax(dim=1).item()
-        confidence = probabilities[0][predicted_index].item()
-
-    predicted_class = CLASS_NAMES[predicted_index]
-    description = DESCRIPTIONS.get(predicted_class.lower(), "No description available.")
-
-    return predicted_class.title(), f"{confidence * 100:.2f}%", description, predicted_class, confidence
-
-# 📝 PDF Report Generator
-def generate_pdf_report(predicted_class, confidence):
-    now = datetime.now().strftime("%d-%m-%Y_%H-%M-%S")
-    os.makedirs("outputs", exist_ok=True)
-    pdf_file = f"outputs/{predicted_class}_{now}.pdf"
-
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-
-    # Başlık
-    pdf.cell(0, 10, "Brain MRI Diagnostic Report", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="C")
-
-    # Tarih ve Saat
-    pdf.cell(0, 10, f"Date & Time: {now}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-
-    # Tahmin edilen sınıf
-    pdf.cell(0, 10, f"Tumor Type: {predicted_class.title()}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-
-    # Güven düzeyi
-    pdf.cell(0, 10, f"Confidence: {confidence}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-
-    # Açıklama
-    desc = DESCRIPTIONS.get(predicted_class.lower(), "No description available.")
-    pdf.multi_cell(0, 10, f"Description: {desc}")
-
-    pdf.output(pdf_file)
-    return pdf_file
+from utils.report_jobs import REPORT_WORKERS, ReportJobs, ReportQueueFull
+
+# 📦 Gradio, torch and the serving helpers are imported in build_app(): report workers are spawned processes that
+# re-import this module, and they only need utils.report_jobs
+
+# 🧠 Model served by the app (see utils/model_registry.py); APP_BACKEND=torchscript|onnx serves an exported copy
+APP_MODEL = "efficientnet_b0"
+APP_BACKEND = os.environ.get("APP_BACKEND", "eager")  # run scripts/export_model.py first for torchscript / onnx
+
+# 🚦 Micro-batching: requests arriving within the window share one forward pass
+MAX_BATCH_SIZE = 8
+BATCH_WINDOW_MS = 10
 
 # 🌐 Descriptions
 DESCRIPTIONS = {
@@ -79,32 +21,167 @@ DESCRIPTIONS = {
     "pituitary": "Pituitary tumors are abnormal growths that develop in the pituitary gland, affecting hormone regulation."
 }
 
-# 🌐 Gradio Interface
-with gr.Blocks() as demo:
-    gr.Markdown("# 🧠 Brain MRI Tumor Classifier (EfficientNetB0 Model)")
-
-    image_input = gr.Image(type="pil", label="Upload Brain MRI Image")
-
-    predict_btn = gr.Button("🔮 Predict")
-    tumor_label = gr.Label(label="Predicted Tumor Type")
-    confidence_box = gr.Textbox(label="Confidence (%)")
-    description_md = gr.Textbox(label="Description")
-    hidden_class = gr.Textbox(visible=False)
-    hidden_confidence = gr.Textbox(visible=False)
-
-    report_btn = gr.Button("📝 Generate Diagnostic Report")
-    pdf_output = gr.File(label="Download Diagnostic Report (PDF)")
-
-    predict_btn.click(
-        fn=predict,
-        inputs=image_input,
-        outputs=[tumor_label, confidence_box, description_md, hidden_class, hidden_confidence]
-    )
-
-    report_btn.click(
-        fn=generate_pdf_report,
-        inputs=[hidden_class, confidence_box],
-        outputs=pdf_output
-    )
-
-demo.launch(server_name="0.0.0.0", server_port=7860, share=True)
\ No newline at end of file
+# 🏗️ Check the served model, then create the schedulers, prediction cache, report pool and Gradio interface
+def build_app():
+    import gradio as gr
+    from utils.backends import BACKENDS, model_name_for
+    from utils.batching import MicroBatcher
+    from utils.inference import top_class
+    from utils.metrics import METRICS
+    from utils.model_registry import MODEL_REGISTRY
+    from utils.prediction_cache import PredictionCache, hash_image
+    from utils.preprocessing import load_luminance, normalize_batch, resize_batch
+    from utils.quantization import QUANTIZED_PATHS
+
+    if APP_BACKEND not in BACKENDS:
+        raise SystemExit(f"❌ APP_BACKEND={APP_BACKEND} is not one of: {', '.join(BACKENDS)}")
+
+    # ⚡ Offer the INT8 variant once scripts/quantize_model.py has created it
+    model_choices = [model_name_for(APP_MODEL, APP_BACKEND)] + ([f"{APP_MODEL}_int8"] if os.path.exists(QUANTIZED_PATHS[APP_MODEL]) else [])
+
+    # ✅ Fail at startup, not on the first request, when the served checkpoint has not been created
+    path = MODEL_REGISTRY.checkpoint_path(model_choices[0])
+    if not os.path.exists(path):
+        hint = "run scripts/export_model.py first" if APP_BACKEND != "eager" else "train the model first"
+        raise SystemExit(f"❌ {model_choices[0]} (APP_BACKEND={APP_BACKEND}) needs {path}: {hint}")
+
+    # 🔥 Load the model once before serving the first request (hot-swapped later when the checkpoint changes)
+    MODEL_REGISTRY.get(model_choices[0])
+
+    # 🚦 One scheduler per selectable model
+    batchers = {
+        name: MicroBatcher(
+            lambda name=name: MODEL_REGISTRY.get(name),
+            max_batch_size=MAX_BATCH_SIZE, max_wait_ms=BATCH_WINDOW_MS,
+            prepare=normalize_batch,  # requests queue as 224x224 uint8 luminance; normalize once per batch
+            metrics=METRICS,
+        )
+        for name in model_choices
+    }
+
+    # 🗄️ Repeat uploads of the same image skip the forward pass
+    prediction_cache = PredictionCache(commit_every=1)
+
+    # 📝 PDF reports render in a separate process pool, so report traffic never competes with prediction
+    report_jobs = ReportJobs(workers=REPORT_WORKERS, metrics=METRICS)
+    METRICS.gauge("app_report_queue_depth", "Reports submitted but not rendered yet.", report_jobs.queue_depth)
+
+    # 🔍 Prediction function (every stage is timed; see utils/metrics.py)
+    def predict(image: Image.Image, model_name=model_choices[0]):
+        with METRICS.request("predict"):
+            return _predict(image, model_name)
+
+    def _predict(image, model_name):
+        METRICS.annotate(model=model_name)
+        with METRICS.stage("decode"):
+            image = image.convert("RGB")
+        with METRICS.stage("hash"):
+            image_hash = hash_image(image)
+        with METRICS.stage("model_version"):
+            version = MODEL_REGISTRY.checkpoint_version(model_name)  # no get(): the batcher fetches the model once per batch
+        with METRICS.stage("cache_lookup"):
+            probabilities = prediction_cache.get(model_name, version, image_hash)
+        METRICS.annotate(cache_hit=probabilities is not None)
+        if probabilities is None:
+            with METRICS.stage("transform"):
+                tensor = resize_batch([load_luminance(image)])[0]
+            timings = {}
+            probabilities, version = batchers[model_name].predict(tensor, timings=timings)
+            METRICS.annotate(batch_size=timings.pop("batch_size", None))
+            METRICS.add_request_stages(timings)
+            probabilities = probabilities.tolist()
+            with METRICS.stage("cache_store"):
+                prediction_cache.put(model_name, version, image_hash, probabilities)
+
+        predicted_class, confidence = top_class(probabilities)
+        description = DESCRIPTIONS.get(predicted_class.lower(), "No description available.")
+
+        return predicted_class.title(), f"{confidence * 100:.2f}%", description, predicted_class, confidence
+
+    # 📝 PDF Report Generator: queue the report and return its job handle right away
+    def generate_pdf_report(predicted_class, confidence):
+        with METRICS.request("report"):
+            if not predicted_class:
+                return "", "⚠️ Run a prediction first.", gr.Timer(active=False)
+            desc = DESCRIPTIONS.get(predicted_class.lower(), "No description available.")
+            try:
+                job_id = report_jobs.submit(predicted_class, confidence, desc)
+            except ReportQueueFull:
+                return "", "⏳ Too many reports in progress, please try again in a moment.", gr.Timer(active=False)
+            METRICS.annotate(job_id=job_id)
+            return job_id, f"🕒 Report {job_id} queued ({report_jobs.queue_depth()} in progress)", gr.Timer(active=True)
+
+    # 📬 Polled by the timer: deliver the file once the job has finished
+    def poll_report(job_id):
+        status = report_jobs.status(job_id)
+        if status["state"] == "pending":
+            return gr.update(), gr.update(), gr.update()
+        if status["state"] == "done":
+            return status["file"], f"✅ Report {job_id} ready", gr.Timer(active=False)
+        return None, f"❌ Report {job_id} failed: {status.get('error', 'unknown job')}", gr.Timer(active=False)
+
+    # 📊 Model and scheduler status
+    def model_status():
+        return {
+            "registry": MODEL_REGISTRY.stats(),
+            "scheduler": {name: b.stats() for name, b in batchers.items()},
+            "cache": prediction_cache.stats(),
+            "reports": report_jobs.stats(),
+        }
+
+    # 🌐 Gradio Interface
+    with gr.Blocks() as demo:
+        gr.Markdown("# 🧠 Brain MRI Tumor Classifier (EfficientNetB0 Model)")
+
+        image_input = gr.Image(type="pil", label="Upload Brain MRI Image")
+        model_choice = gr.Dropdown(choices=model_choices, value=model_choices[0], label="Model (fp32 / INT8)")
+
+        predict_btn = gr.Button("🔮 Predict")
+        tumor_label = gr.Label(label="Predicted Tumor Type")
+        confidence_box = gr.Textbox(label="Confidence (%)")
+        description_md = gr.Textbox(label="Description")
+        hidden_class = gr.Textbox(visible=False)
+        hidden_confidence = gr.Textbox(visible=False)
+
+        report_btn = gr.Button("📝 Generate Diagnostic Report")
+        report_job = gr.Textbox(visible=False)
+        report_status = gr.Markdown()
+        report_timer = gr.Timer(1.0, active=False)
+        pdf_output = gr.File(label="Download Diagnostic Report (PDF)")
+
+        with gr.Accordion("📊 Model Status", open=False):
+            stats_btn = gr.Button("🔄 Refresh")
+            stats_json = gr.JSON(label="Load time, memory, batching, cache & reports")
+
+        predict_btn.click(
+            fn=predict,
+            inputs=[image_input, model_choice],
+            outputs=[tumor_label, confidence_box, description_md, hidden_class, hidden_confidence],
+            concurrency_limit=MAX_BATCH_SIZE  # let concurrent uploads reach the batcher together
+        )
+
+        report_btn.click(
+            fn=generate_pdf_report,
+            inputs=[hidden_class, confidence_box],
+            outputs=[report_job, report_status, report_timer]
+        )
+        report_timer.tick(fn=poll_report, inputs=report_job, outputs=[pdf_output, report_status, report_timer])
+
+        stats_btn.click(fn=model_status, inputs=None, outputs=stats_json)
+
+    return demo
+
+# 🚀 Serve
+def main():
+    from utils.metrics import METRICS
+
+    demo = build_app()
+
+    # 📈 Prometheus metrics next to the Gradio server (APP_METRICS=0 disables them)
+    if METRICS.enabled:
+        METRICS.serve()
+
+    demo.launch(server_name="0.0.0.0", server_port=7860, share=True)
+
+if __name__ == "__main__":
+    main()
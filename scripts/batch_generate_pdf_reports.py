@@ -1,54 +1,54 @@
 # 📦 Required Imports
 import os
-import json
-from fpdf import FPDF
-from datetime import datetime
+import sys
+import time
+import argparse
+
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.jsonl import FORMATS, iter_records, with_format
+from utils.parallel import run_in_parallel
+from utils.pdf_reports import REPORT_WORKERS, ReportPDF, ReportTemplate, in_shard, parse_shard, run_timestamp
+from utils.report_store import ReportStore
 
 # 📁 Paths
 CLEANED_REPORTS_PATH = "outputs/cleaned_reports.json"
 PREDICTED_LABELS_PATH = "outputs/predicted_labels.json"
 OUTPUT_DIR = "outputs/generated_reports"
-FONT_PATH = "fonts/Arial.ttf"
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-# 📜 PDF Class
-class PDF(FPDF):
-    def __init__(self):
-        super().__init__()
-        self.add_font("ArialUnicode", "", FONT_PATH, uni=True)
-
-    def header(self):
-        self.set_font("ArialUnicode", "", 14)
-        self.cell(0, 10, "Brain MRI Diagnostic Report", ln=True, align="C")
-        self.ln(5)
-
-    def chapter_title(self, title):
-        self.set_font("ArialUnicode", "", 13)
-        self.cell(0, 10, title, ln=True)
-        self.ln(2)
-
-    def chapter_body(self, text):
-        self.set_font("ArialUnicode", "", 12)
-        self.multi_cell(0, 8, text)
-        self.ln(4)
-
-    def footer(self):
-        self.set_y(-15)
-        self.set_font("ArialUnicode", "", 8)
-        self.cell(0, 10, "Generated by AI Assistant", align="C")
-
-# 📄 Load JSON files
-def load_json(path):
-    with open(path, "r") as f:
-        return json.load(f)
-
-# 📄 Generate PDF for each patient
-def generate_pdf(patient_info, prediction_info, idx):
-    pdf = PDF()
+# 📜 PDF Class (layout and the once-per-process font parsing live in utils/pdf_reports.py)
+class PDF(ReportPDF):
+    title_text = "Brain MRI Diagnostic Report"
+
+# 🧩 Static text; the template lays it out once per run (the report sections come from each patient's record)
+WARNING_TEXT = "⚠️ Warning:\nThe model's confidence is low. It is strongly recommended to consult a medical professional."
+PLACEHOLDERS = {
+    "report": "[No Report Available]",
+    "conclusion": "[No Conclusion Available]",
+    "recommendations": "[No Recommendations Available]",
+}
+TEMPLATE = ReportTemplate([WARNING_TEXT, *PLACEHOLDERS.values()])
+
+# 🤷 Prediction for a report without a matching image
+NO_PREDICTION = {"predicted_class": "Unknown", "confidence": 0.0}
+
+# 📁 Output file for the idx-th patient
+def report_path(idx, output_dir=OUTPUT_DIR):
+    return os.path.join(output_dir, f"report_{idx}.pdf")
+
+# 📄 Build the PDF of one patient (created: the run timestamp; template=None lays out everything per report)
+def build_pdf(patient_info, prediction_info, created, template=TEMPLATE):
+    sections = {key: patient_info.get(key, placeholder) for key, placeholder in PLACEHOLDERS.items()}
+    predicted_class = prediction_info.get("predicted_class", "Unknown")
+    confidence = prediction_info.get("confidence", 0.0)
+    fields = [patient_info.get(key, "N/A") for key in ("age", "sex", "race", "year")]
+    pdf = PDF(created, template, [*fields, predicted_class, confidence, *sections.values()])
     pdf.add_page()
 
-    now = datetime.now().strftime("%d %B %Y - %H:%M")
+    now = created.strftime("%d %B %Y - %H:%M")
 
     # General Info
     pdf.chapter_title("General Information")
@@ -62,8 +62,6 @@ def generate_pdf(patient_info, prediction_info, idx):
 
     # Model Prediction
     pdf.chapter_title("Model Prediction")
-    predicted_class = prediction_info.get("predicted_class", "Unknown")
-    confidence = prediction_info.get("confidence", 0.0)
     pdf.set_font("ArialUnicode", "", 12)
     pdf.cell(0, 10, f"Predicted Tumor Type: {predicted_class}", ln=True)
     pdf.cell(0, 10, f"Confidence: {confidence}%", ln=True)
@@ -73,50 +71,84 @@ def generate_pdf(patient_info, prediction_info, idx):
         pdf.ln(3)
         pdf.set_font("ArialUnicode", "", 12)
         pdf.set_text_color(255, 0, 0)
-        pdf.multi_cell(0, 10, "⚠️ Warning:\nThe model's confidence is low. It is strongly recommended to consult a medical professional.")
+        pdf.multi_cell(0, 10, WARNING_TEXT)
         pdf.set_text_color(0, 0, 0)
         pdf.ln(3)
 
     # Report Details
     pdf.chapter_title("Report Details")
-    pdf.chapter_body(patient_info.get("report", "[No Report Available]"))
+    pdf.chapter_body(sections["report"])
 
     # Conclusion
     pdf.chapter_title("Conclusion")
-    pdf.chapter_body(patient_info.get("conclusion", "[No Conclusion Available]"))
+    pdf.chapter_body(sections["conclusion"])
 
     # Recommendations
     pdf.chapter_title("Recommendations")
-    pdf.chapter_body(patient_info.get("recommendations", "[No Recommendations Available]"))
+    pdf.chapter_body(sections["recommendations"])
+    return pdf
 
-    # Save PDF
-    output_path = os.path.join(OUTPUT_DIR, f"report_{idx}.pdf")
-    pdf.output(output_path)
+# 📄 Generate PDF for each patient
+def generate_pdf(patient_info, prediction_info, idx, created, template=TEMPLATE, output_dir=OUTPUT_DIR):
+    output_path = report_path(idx, output_dir)
+    build_pdf(patient_info, prediction_info, created, template).output(output_path)
+    return output_path
 
-    print(f"✅ Saved: {output_path}")
+# 🏭 Pool entry point: one (patient_info, prediction_info, idx, created, use_template, output_dir) task; each worker keeps its own TEMPLATE
+def render_task(task):
+    patient_info, prediction_info, idx, created, use_template, output_dir = task
+    return generate_pdf(patient_info, prediction_info, idx, created, TEMPLATE if use_template else None, output_dir)
 
 # 🚀 Main
 def main():
-    patients = load_json(CLEANED_REPORTS_PATH)
-    predictions = load_json(PREDICTED_LABELS_PATH)
-
-    print(f"✅ Loaded {len(patients)} cleaned reports.")
-    print(f"✅ Loaded {len(predictions)} predictions.")
-
-    # Mapping for easier match
-    prediction_map = {}
-    for item in predictions:
-        patient_id = item["patient_id"]
-        prediction_map[patient_id] = item
-
-    for idx, patient_info in enumerate(patients, start=1):
-        # Match prediction
-        prediction_info = prediction_map.get(patient_info.get("patient_id"), {
-            "predicted_class": "Unknown",
-            "confidence": 0.0
-        })
-
-        generate_pdf(patient_info, prediction_info, idx)
+    parser = argparse.ArgumentParser(description="Generate a PDF report for every cleaned report.")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="Read .jsonl inputs (streamed) instead of .json")
+    parser.add_argument("--from-store", action="store_true", help="Read reports joined with predictions from the report store")
+    parser.add_argument("--resume", action="store_true", help="Skip patients whose report PDF already exists")
+    parser.add_argument("--workers", type=int, default=REPORT_WORKERS, help="Rendering processes (1 = sequential)")
+    parser.add_argument("--shard", type=parse_shard, default=None, help="Render only shard i of n (e.g. 2/4), for splitting a run across machines")
+    parser.add_argument("--timestamp", default=None, help="Report date as ISO time (default: now); fixes the output bytes")
+    parser.add_argument("--no-template", action="store_true", help="Lay out every report from scratch with the full font")
+    args = parser.parse_args()
+    created = run_timestamp(args.timestamp)
+
+    store = ReportStore()
+    if args.from_store:
+        # 🔗 The store joins each report with its prediction on the indexed patient_id
+        patients = store.reports_with_predictions("unknown")
+    else:
+        # Mapping for easier match (later records win, so re-scored patients use their newest prediction)
+        prediction_map = {}
+        for item in iter_records(with_format(PREDICTED_LABELS_PATH, args.format)):
+            patient_id = item["patient_id"]
+            prediction_map[patient_id] = item
+        print(f"✅ Loaded {len(prediction_map)} predictions.")
+        patients = (
+            (patient_info, prediction_map.get(patient_info.get("patient_id")))
+            for patient_info in iter_records(with_format(CLEANED_REPORTS_PATH, args.format))
+        )
+
+    # Cleaned reports are streamed one at a time and rendered across the pool
+    rendering = {}  # output path -> (patient id, prediction) of the reports in flight, for the store
+    def tasks():
+        for idx, (patient_info, prediction_info) in enumerate(patients, start=1):
+            if not in_shard(idx, args.shard) or (args.resume and os.path.exists(report_path(idx))):
+                continue
+
+            prediction_info = prediction_info or NO_PREDICTION
+            rendering[report_path(idx)] = (patient_info.get("patient_id"), prediction_info)
+            yield patient_info, prediction_info, idx, created, not args.no_template, OUTPUT_DIR
+
+    generated = 0
+    start = time.perf_counter()
+    for output_path in run_in_parallel(render_task, tasks(), args.workers):
+        print(f"✅ Saved: {output_path}")
+        store.record_generated(output_path, *rendering.pop(output_path), created)
+        generated += 1
+    store.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Generated {generated} reports in {elapsed:.1f}s ({generated / max(elapsed, 1e-9):.1f} reports/sec, {args.workers} workers).")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,53 +1,43 @@
 # 📦 Required Imports
 import os
-import json
-from fpdf import FPDF
-from datetime import datetime
+import sys
+import time
+import argparse
+
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.jsonl import FORMATS, iter_records, with_format
+from utils.parallel import run_in_parallel
+from utils.pdf_reports import REPORT_WORKERS, ReportPDF, ReportTemplate, in_shard, parse_shard, run_timestamp
+from utils.report_store import ReportStore
 
 # 📁 Paths
 PREDICTED_SYNTHETIC_LABELS_PATH = "outputs/predicted_synthetic_labels.json"
 OUTPUT_DIR = "outputs/generated_reports_synthetic"
-FONT_PATH = "fonts/Arial.ttf"
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-# 📜 PDF Class
-class PDF(FPDF):
-    def __init__(self):
-        super().__init__()
-        self.add_font("ArialUnicode", "", FONT_PATH, uni=True)
-
-    def header(self):
-        self.set_font("ArialUnicode", "", 14)
-        self.cell(0, 10, "Brain MRI Diagnostic Report (Synthetic)", ln=True, align="C")
-        self.ln(5)
-
-    def chapter_title(self, title):
-        self.set_font("ArialUnicode", "", 13)
-        self.cell(0, 10, title, ln=True)
-        self.ln(2)
-
-    def chapter_body(self, text):
-        self.set_font("ArialUnicode", "", 12)
-        self.multi_cell(0, 8, text)
-        self.ln(4)
-
-    def footer(self):
-        self.set_y(-15)
-        self.set_font("ArialUnicode", "", 8)
-        self.cell(0, 10, "Generated by AI Assistant", align="C")
-
-# 📄 Load predictions
-def load_predictions(path):
-    with open(path, "r") as f:
-        return json.load(f)
+# 📜 PDF Class (layout and the once-per-process font parsing live in utils/pdf_reports.py)
+class PDF(ReportPDF):
+    title_text = "Brain MRI Diagnostic Report (Synthetic)"
 
-# 📄 Generate PDF for each synthetic patient
-def generate_pdf(prediction_info, idx):
-    pdf = PDF()
+# 🧩 Static text of every synthetic report; the template lays it out once per run
+REPORT_TEXT = "This is a synthetic MRI report generated for training purposes. No real medical data is associated with this record."
+CONCLUSION_TEXT = "Synthetic data conclusion based on model prediction."
+RECOMMENDATIONS_TEXT = "No medical action required. For training only."
+WARNING_TEXT = "⚠️ Warning:\nThe model's confidence is low. Please review this case manually."
+TEMPLATE = ReportTemplate([REPORT_TEXT, CONCLUSION_TEXT, RECOMMENDATIONS_TEXT, WARNING_TEXT])
+
+# 📄 Build the PDF of one synthetic patient (created: the run timestamp; template=None lays out everything per report)
+def build_pdf(prediction_info, created, template=TEMPLATE):
+    predicted_class = prediction_info.get("predicted_class", "Unknown")
+    confidence = prediction_info.get("confidence", 0.0)
+    fields = (prediction_info.get("patient_id", "N/A"), predicted_class, confidence)
+    pdf = PDF(created, template, fields)
     pdf.add_page()
 
-    now = datetime.now().strftime("%d %B %Y - %H:%M")
+    now = created.strftime("%d %B %Y - %H:%M")
 
     # General Info
     pdf.chapter_title("General Information")
@@ -59,8 +49,6 @@ def generate_pdf(prediction_info, idx):
 
     # Model Prediction
     pdf.chapter_title("Model Prediction")
-    predicted_class = prediction_info.get("predicted_class", "Unknown")
-    confidence = prediction_info.get("confidence", 0.0)
     pdf.set_font("ArialUnicode", "", 12)
     pdf.cell(0, 10, f"Predicted Tumor Type: {predicted_class}", ln=True)
     pdf.cell(0, 10, f"Confidence: {confidence}%", ln=True)
@@ -68,36 +56,74 @@ def generate_pdf(prediction_info, idx):
     if confidence < 60:
         pdf.ln(3)
         pdf.set_text_color(255, 0, 0)
-        pdf.multi_cell(0, 10, "⚠️ Warning:\nThe model's confidence is low. Please review this case manually.")
+        pdf.multi_cell(0, 10, WARNING_TEXT)
         pdf.set_text_color(0, 0, 0)
         pdf.ln(3)
 
     # Dummy Report
     pdf.chapter_title("Report Details")
-    pdf.chapter_body("This is a synthetic MRI report generated for training purposes. No real medical data is associated with this record.")
+    pdf.chapter_body(REPORT_TEXT)
 
     # Conclusion
     pdf.chapter_title("Conclusion")
-    pdf.chapter_body("Synthetic data conclusion based on model prediction.")
+    pdf.chapter_body(CONCLUSION_TEXT)
 
     # Recommendations
     pdf.chapter_title("Recommendations")
-    pdf.chapter_body("No medical action required. For training only.")
+    pdf.chapter_body(RECOMMENDATIONS_TEXT)
+    return pdf
+
+# 📁 Output file for the idx-th synthetic patient
+def report_path(idx):
+    return os.path.join(OUTPUT_DIR, f"synthetic_report_{idx}.pdf")
 
-    # Save PDF
-    output_path = os.path.join(OUTPUT_DIR, f"synthetic_report_{idx}.pdf")
-    pdf.output(output_path)
+# 📄 Generate PDF for each synthetic patient
+def generate_pdf(prediction_info, idx, created, template=TEMPLATE):
+    output_path = report_path(idx)
+    build_pdf(prediction_info, created, template).output(output_path)
+    return output_path
 
-    print(f"✅ Saved: {output_path}")
+# 🏭 Pool entry point: one (prediction_info, idx, created, use_template) task; each worker keeps its own TEMPLATE
+def render_task(task):
+    prediction_info, idx, created, use_template = task
+    return generate_pdf(prediction_info, idx, created, TEMPLATE if use_template else None)
 
 # 🚀 Main
 def main():
-    predictions = load_predictions(PREDICTED_SYNTHETIC_LABELS_PATH)
-
-    print(f"✅ Loaded {len(predictions)} synthetic predictions.")
-
-    for idx, prediction_info in enumerate(predictions, start=1):
-        generate_pdf(prediction_info, idx)
+    parser = argparse.ArgumentParser(description="Generate a PDF report for every synthetic prediction.")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="Read .jsonl predictions (streamed) instead of .json")
+    parser.add_argument("--from-store", action="store_true", help="Read the synthetic predictions from the report store")
+    parser.add_argument("--workers", type=int, default=REPORT_WORKERS, help="Rendering processes (1 = sequential)")
+    parser.add_argument("--shard", type=parse_shard, default=None, help="Render only shard i of n (e.g. 2/4), for splitting a run across machines")
+    parser.add_argument("--timestamp", default=None, help="Report date as ISO time (default: now); fixes the output bytes")
+    parser.add_argument("--no-template", action="store_true", help="Lay out every report from scratch with the full font")
+    args = parser.parse_args()
+    created = run_timestamp(args.timestamp)
+
+    store = ReportStore()
+    if args.from_store:
+        predictions = store.predictions("synthetic")
+    else:
+        predictions = iter_records(with_format(PREDICTED_SYNTHETIC_LABELS_PATH, args.format))
+
+    rendering = {}  # output path -> prediction of the reports in flight, for the store
+    def tasks():
+        for idx, prediction_info in enumerate(predictions, start=1):
+            if in_shard(idx, args.shard):
+                rendering[report_path(idx)] = prediction_info
+                yield prediction_info, idx, created, not args.no_template
+
+    count = 0
+    start = time.perf_counter()
+    for output_path in run_in_parallel(render_task, tasks(), args.workers):
+        print(f"✅ Saved: {output_path}")
+        prediction_info = rendering.pop(output_path)
+        store.record_generated(output_path, prediction_info.get("patient_id"), prediction_info, created, "synthetic")
+        count += 1
+    store.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Generated {count} synthetic reports in {elapsed:.1f}s ({count / max(elapsed, 1e-9):.1f} reports/sec, {args.workers} workers).")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,71 +1,136 @@
 # 📦 Required Imports
 import os
-import json
-import pdfplumber
-from tqdm import tqdm
+import sys
+import time
+import argparse
+
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.extraction_cache import ExtractionCache
+from utils.jsonl import FORMATS, open_writer, with_format
+from utils.parallel import DEFAULT_WORKERS, run_in_parallel
+from utils.pdf_text import PDF_ENGINES, extract_text, select_engines
+from utils.report_parser import PARSER_VERSION, parse_report
+from utils.report_store import ReportStore
 
 # 📁 Source PDF Directory
 PDF_DIR = "data/brain-mri/"
-OUTPUT_JSON = "outputs/extracted_reports.json"
-
-# 🛠️ Helper Function to Extract Text Fields
-def extract_fields_from_text(text):
-    fields = {
-        "age": None,
-        "sex": None,
-        "race": None,
-        "year": None,
-        "report": None,
-        "conclusion": None,
-        "recommendations": None,
-    }
+OUTPUT_JSON = "outputs/cleaned_reports.json"  # final fields: no separate cleaning step
 
+# 🔍 Yield every PDF under a folder
+def find_pdfs(pdf_dir):
+    for root, dirs, files in os.walk(pdf_dir):
+        for file in files:
+            if file.lower().endswith(".pdf"):
+                yield os.path.join(root, file)
+
+# 📄 Extract one PDF (runs in a worker process): {"file_path", "content_hash", "text", "fields" | "error", ...}
+def extract_task(task):
+    pdf_path, content_hash, engines = task
     try:
-        lines = text.split("\n")
-        for line in lines:
-            line = line.strip()
-            if line.lower().startswith("age:"):
-                fields["age"] = line.split(":", 1)[1].strip()
-            elif line.lower().startswith("sex:"):
-                fields["sex"] = line.split(":", 1)[1].strip()
-            elif line.lower().startswith("race:"):
-                fields["race"] = line.split(":", 1)[1].strip()
-            elif "year of study" in line.lower():
-                fields["year"] = line.split(":")[-1].strip()
-            elif line.lower().startswith("report"):
-                idx = lines.index(line)
-                fields["report"] = "\n".join(lines[idx+1:])
-                break
+        text, engine, pages, seconds = extract_text(pdf_path, engines)
     except Exception as e:
-        print(f"⚠️ Error while parsing fields: {e}")
+        return {"file_path": pdf_path, "error": str(e)}
+
+    return {"file_path": pdf_path, "content_hash": content_hash, "text": text, "fields": parse_report(text),
+            "engine": engine, "pages": pages, "seconds": seconds}
+
+# 🏷️ Patient id from a file name (same rule as predict_unknown_images.py, so reports and images can be matched)
+def patient_id_for(path):
+    return os.path.basename(path).split('.')[0]
+
+# 📄 Output record of one PDF
+def report_record(pdf_path, fields):
+    return {**fields, "patient_id": patient_id_for(pdf_path), "file_path": pdf_path}
+
+# 🔁 Fields of every PDF as they become available: cached ones first, then each new or changed PDF as soon as a
+# worker has parsed it. Yields (pdf_path, fields); engine_stats collects files / pages / seconds per engine
+def extract_reports(cache, pdf_paths, engines, workers, engine_stats, context=None):
+    to_extract, copies = [], {}  # copies: content hash -> other paths with that content (extracted once)
+    for pdf_path in pdf_paths:
+        state, content_hash = cache.lookup(pdf_path)
+        if state == "reparse":
+            cache.update_fields(content_hash, parse_report(cache.text(content_hash)))
+        if state != "extract":
+            yield pdf_path, cache.fields(pdf_path)
+        elif content_hash in copies:
+            copies[content_hash].append(pdf_path)
+        else:
+            copies[content_hash] = []
+            to_extract.append((pdf_path, content_hash, engines))
+    print(f"🔁 Extracting {len(to_extract)} new or changed of {len(pdf_paths)} PDFs with {', '.join(engines)} on {workers} worker(s)")
 
-    return fields
+    for result in run_in_parallel(extract_task, to_extract, workers, context=context):
+        if "error" in result:
+            print(f"⚠️ Failed to process {result['file_path']}: {result['error']}")
+            cache.failed()
+            continue
+        cache.store(result["content_hash"], result["engine"], result["pages"], result["text"], result["fields"])
+        stats = engine_stats.setdefault(result["engine"], {"files": 0, "pages": 0, "seconds": 0.0})
+        stats["files"] += 1
+        stats["pages"] += result["pages"]
+        stats["seconds"] += result["seconds"]
+        for pdf_path in [result["file_path"], *copies[result["content_hash"]]]:
+            yield pdf_path, result["fields"]
+
+# 📊 Pages per second of each engine (per process) and of the whole run
+def print_throughput(engine_stats, wall_seconds, workers):
+    print(f"\n{'Engine':<12}{'Files':>8}{'Pages':>8}{'pages/s per process':>22}")
+    for engine, stats in engine_stats.items():
+        rate = stats["pages"] / stats["seconds"] if stats["seconds"] else 0.0
+        print(f"{engine:<12}{stats['files']:>8}{stats['pages']:>8}{rate:>22.1f}")
+    total_pages = sum(stats["pages"] for stats in engine_stats.values())
+    if wall_seconds > 0:
+        print(f"⚡ {total_pages / wall_seconds:.1f} pages/s overall with {workers} worker(s) ({wall_seconds:.1f}s)")
 
 # 🚀 Main Processing
-all_reports = []
-
-print("🔍 Scanning for PDF files...")
-for root, dirs, files in os.walk(PDF_DIR):
-    for file in files:
-        if file.lower().endswith(".pdf"):
-            pdf_path = os.path.join(root, file)
-            try:
-                with pdfplumber.open(pdf_path) as pdf:
-                    full_text = ""
-                    for page in pdf.pages:
-                        full_text += page.extract_text() + "\n"
-                    
-                    report_fields = extract_fields_from_text(full_text)
-                    report_fields["file_path"] = pdf_path
-                    all_reports.append(report_fields)
-
-            except Exception as e:
-                print(f"⚠️ Failed to process {pdf_path}: {e}")
-
-# 💾 Save Extracted Data
-os.makedirs("outputs", exist_ok=True)
-with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
-    json.dump(all_reports, f, indent=2, ensure_ascii=False)
-
-print(f"\n✅ Successfully extracted {len(all_reports)} reports.")
-print(f"📄 Saved to: {OUTPUT_JSON}")
+def main():
+    parser = argparse.ArgumentParser(description="Extract report fields from every PDF under data/brain-mri/.")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="jsonl writes one record per line")
+    parser.add_argument("--refresh", action="store_true", help="Empty the extraction cache and extract every PDF again")
+    parser.add_argument("--engine", choices=("auto",) + PDF_ENGINES, default="auto",
+                        help="auto: PyMuPDF when installed, pdfplumber for files it cannot read")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Extraction processes (1 = sequential)")
+    args = parser.parse_args()
+
+    engines = select_engines(args.engine)
+    output_path = with_format(OUTPUT_JSON, args.format)
+
+    # 🗄️ Only new or changed PDFs are extracted; a new PARSER_VERSION re-parses the cached text
+    cache = ExtractionCache(PARSER_VERSION)
+    if args.refresh:
+        cache.clear()
+    print("🔍 Scanning for PDF files...")
+    pdf_paths = sorted(find_pdfs(PDF_DIR))
+    print(f"🧹 {cache.prune(pdf_paths)} PDFs removed since the last run")
+
+    engine_stats = {}
+    start = time.perf_counter()
+    for _ in extract_reports(cache, pdf_paths, engines, args.workers, engine_stats):
+        pass  # everything lands in the cache; the output is written in path order below
+    wall_seconds = time.perf_counter() - start
+
+    # 💾 Save Extracted Data (every PDF on disk, in path order, straight from the cache) to the file and the store
+    writer = open_writer(output_path, args.format)
+    store = ReportStore()
+    store.prune_reports(pdf_paths)
+    for pdf_path in pdf_paths:
+        fields = cache.fields(pdf_path)
+        if fields is not None:
+            record = report_record(pdf_path, fields)
+            writer.write(record)
+            store.upsert_report(record)
+    writer.close()
+    print(f"🗃️ Report store: {store.stats()}")
+    store.close()
+
+    if engine_stats:
+        print_throughput(engine_stats, wall_seconds, args.workers)
+    print(f"🗄️ Extraction cache: {cache.stats()}")
+    cache.close()
+    print(f"\n✅ Successfully extracted {writer.count} reports.")
+    print(f"📄 Saved to: {output_path}")
+
+if __name__ == "__main__":
+    main()
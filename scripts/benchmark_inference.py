@@ -0,0 +1,218 @@
+# 📦 Required Imports
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import torch
+
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.backends import BACKENDS, model_name_for
+from utils.inference import IMAGE_EXTENSIONS
+from utils.model_registry import MODEL_REGISTRY, MODEL_SPECS, peak_rss_bytes
+from utils.preprocessing import preprocess_images
+from utils.stats import percentile
+
+# 📄 Default results file
+RESULTS_PATH = "outputs/inference_benchmark.json"
+
+# 🖼️ Real images used with --inputs real
+IMAGES_DIR = "data/classificationdata/timri/valid"
+
+# ⚙️ Backends to sweep: the export backends plus the INT8 models
+BENCHMARK_BACKENDS = BACKENDS + ("int8",)
+
+# 📈 Metrics where a larger value is worse (images_per_sec is the one where smaller is worse)
+HIGHER_IS_WORSE = ("cold_start_seconds", "p50_ms", "p95_ms", "p99_ms", "peak_rss_mb")
+
+
+# 🏷️ Registry name for a model on a benchmark backend
+def registry_name(model, backend):
+    return f"{model}_int8" if backend == "int8" else model_name_for(model, backend)
+
+
+# 📂 Image files under a folder (class subfolders included), in a fixed order
+def find_images(directory):
+    paths = []
+    for root, _, files in sorted(os.walk(directory)):
+        paths.extend(os.path.join(root, name) for name in sorted(files) if name.lower().endswith(IMAGE_EXTENSIONS))
+    return paths
+
+
+# ⏱️ One configuration, measured in a fresh process so cold start and peak RSS are its own
+def run_case(case):
+    torch.set_num_threads(case["threads"])
+    name = registry_name(case["model"], case["backend"])
+    batch_size = case["batch_size"]
+
+    # 🧪 Synthetic inputs time the model alone; real inputs add decoding and preprocessing
+    if case["input"] == "synthetic":
+        batch = torch.randn(batch_size, 3, 224, 224, generator=torch.Generator().manual_seed(0))
+        next_batch = lambda: batch
+    else:
+        paths = find_images(case["images_dir"])
+        if not paths:
+            return {**case, "skipped": f"no images in {case['images_dir']}"}
+        random.Random(0).shuffle(paths)
+        path_cycle = itertools.cycle(paths)
+        next_batch = lambda: preprocess_images(list(itertools.islice(path_cycle, batch_size)))
+
+    with torch.no_grad():
+        # 🧊 Cold start: load the checkpoint and run the first batch
+        start = time.perf_counter()
+        try:
+            entry = MODEL_REGISTRY.get(name)
+        except FileNotFoundError as error:
+            return {**case, "skipped": f"missing checkpoint ({error.filename})"}
+        loaded = time.perf_counter()
+        entry.model(next_batch())
+        cold_start = time.perf_counter() - start
+        first_batch = time.perf_counter() - loaded
+
+        for _ in range(case["warmup"]):
+            entry.model(next_batch())
+
+        latencies = []
+        for _ in range(case["runs"]):
+            tick = time.perf_counter()
+            entry.model(next_batch())
+            latencies.append((time.perf_counter() - tick) * 1000)
+
+    return {
+        **case,
+        "cold_start_seconds": round(cold_start, 3),
+        "load_seconds": round(loaded - start, 3),
+        "first_batch_ms": round(first_batch * 1000, 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2),
+        "images_per_sec": round(batch_size * len(latencies) / (sum(latencies) / 1000), 1),
+        "peak_rss_mb": round(peak_rss_bytes() / 1e6, 1),
+    }
+
+
+# 🔑 What identifies a configuration across runs
+def case_key(result):
+    return (result["model"], result["backend"], result["threads"], result["batch_size"], result["input"])
+
+
+# 🏃 Sweep every combination and save the results
+def run_benchmarks(args):
+    cases = [
+        {"model": model, "backend": backend, "threads": threads, "batch_size": batch_size, "input": input_kind,
+         "runs": args.runs, "warmup": args.warmup, "images_dir": args.images}
+        for model, backend, threads, batch_size, input_kind in itertools.product(
+            args.models, args.backends, args.threads, args.batch_sizes, args.inputs)
+    ]
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    print(f"{'Model':<18}{'Backend':<13}{'Thr':>4}{'Batch':>6}  {'Input':<10}{'Cold s':>8}{'p50 ms':>9}"
+          f"{'p95 ms':>9}{'p99 ms':>9}{'img/s':>9}{'RSS MB':>9}")
+    for case in cases:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(run_case, case).result()
+        results.append(result)
+        label = f"{case['model']:<18}{case['backend']:<13}{case['threads']:>4}{case['batch_size']:>6}  {case['input']:<10}"
+        if "skipped" in result:
+            print(f"{label}⏭️ skipped: {result['skipped']}")
+        else:
+            print(f"{label}{result['cold_start_seconds']:>8.2f}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}"
+                  f"{result['p99_ms']:>9.1f}{result['images_per_sec']:>9.1f}{result['peak_rss_mb']:>9.0f}")
+
+    report = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "environment": {
+            "torch": torch.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results saved to {args.output}")
+
+
+# 🔍 Configurations whose metrics got worse by more than the threshold (in %)
+def find_regressions(baseline, candidate, threshold):
+    before = {case_key(result): result for result in baseline["results"] if "skipped" not in result}
+    regressions = []
+    for result in candidate["results"]:
+        old = before.get(case_key(result))
+        if old is None or "skipped" in result:
+            continue
+        for metric in HIGHER_IS_WORSE + ("images_per_sec",):
+            if not old[metric]:
+                continue
+            change = (result[metric] - old[metric]) / old[metric] * 100
+            worse = -change if metric == "images_per_sec" else change
+            if worse > threshold:
+                regressions.append((case_key(result), metric, old[metric], result[metric], change))
+    return regressions
+
+
+# ⚖️ Compare two result files; exits with status 1 when anything regressed
+def compare(baseline_path, candidate_path, threshold):
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+    with open(candidate_path, "r") as f:
+        candidate = json.load(f)
+
+    regressions = find_regressions(baseline, candidate, threshold)
+    if not regressions:
+        print(f"✅ No regressions over {threshold:.0f}% ({candidate_path} vs {baseline_path})")
+        return
+
+    print(f"❌ {len(regressions)} regression(s) over {threshold:.0f}% ({candidate_path} vs {baseline_path})")
+    for (model, backend, threads, batch_size, input_kind), metric, old, new, change in regressions:
+        print(f"   {model}/{backend} threads={threads} batch={batch_size} {input_kind}: "
+              f"{metric} {old} -> {new} ({change:+.1f}%)")
+    sys.exit(1)
+
+
+def main():
+    comma_list = lambda cast: (lambda value: [cast(item) for item in value.split(",")])
+    parser = argparse.ArgumentParser(description="Benchmark inference across models, batch sizes, threads and backends.")
+    parser.add_argument("--models", type=comma_list(str), default=sorted(MODEL_SPECS))
+    parser.add_argument("--backends", type=comma_list(str), default=["eager"], help=f"Any of {', '.join(BENCHMARK_BACKENDS)}")
+    parser.add_argument("--batch-sizes", type=comma_list(int), default=[1, 8, 32])
+    parser.add_argument("--threads", type=comma_list(int), default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument("--inputs", type=comma_list(str), default=["synthetic", "real"], help="synthetic and/or real")
+    parser.add_argument("--images", default=IMAGES_DIR, help="Folder of real images")
+    parser.add_argument("--runs", type=int, default=30, help="Timed batches per configuration")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"), help="Compare two result files instead of running")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in %% (with --compare)")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare, args.threshold)
+        return
+
+    for backend in args.backends:
+        if backend not in BENCHMARK_BACKENDS:
+            parser.error(f"unknown backend '{backend}' (choose from {', '.join(BENCHMARK_BACKENDS)})")
+    for model, backend in itertools.product(args.models, args.backends):
+        if registry_name(model, backend) not in MODEL_REGISTRY.names():
+            parser.error(f"model '{model}' is not available on backend '{backend}' ({registry_name(model, backend)} is not registered)")
+    for input_kind in args.inputs:
+        if input_kind not in ("synthetic", "real"):
+            parser.error(f"unknown input '{input_kind}' (choose synthetic or real)")
+    run_benchmarks(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# 📦 Required Imports
+import os
+import re
+import sys
+import time
+import argparse
+import itertools
+
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.jsonl import iter_records
+from utils.pdf_text import available_engines, extract_text
+from utils.report_parser import REPORT_FIELDS, legacy_document, parse_report
+
+# 📁 Golden fixtures (no script writes here): recorded outputs of the old two-stage pipeline (extractor output ->
+# cleaned output), and edge-case documents with the old pipeline's fields and, where they differ on purpose, the new ones
+GOLDEN_DIR = "outputs/golden"
+GOLDEN_EXTRACTED = os.path.join(GOLDEN_DIR, "extracted_reports.json")
+GOLDEN_CLEANED = os.path.join(GOLDEN_DIR, "cleaned_reports.json")
+GOLDEN_EDGE_CASES = os.path.join(GOLDEN_DIR, "edge_cases.json")
+PDF_DIR = "data/brain-mri/"
+
+
+# 🕰️ The old two-stage parser, kept verbatim as the reference: batch_pdf_extractor.extract_fields_from_text ...
+def legacy_extract_fields(text):
+    fields = {"age": None, "sex": None, "race": None, "year": None, "report": None, "conclusion": None, "recommendations": None}
+    lines = text.split("\n")
+    for line in lines:
+        line = line.strip()
+        if line.lower().startswith("age:"):
+            fields["age"] = line.split(":", 1)[1].strip()
+        elif line.lower().startswith("sex:"):
+            fields["sex"] = line.split(":", 1)[1].strip()
+        elif line.lower().startswith("race:"):
+            fields["race"] = line.split(":", 1)[1].strip()
+        elif "year of study" in line.lower():
+            fields["year"] = line.split(":")[-1].strip()
+        elif line.lower().startswith("report"):
+            idx = lines.index(line)
+            fields["report"] = "\n".join(lines[idx+1:])
+            break
+    return fields
+
+
+# 🕰️ ... followed by clean_extracted_reports.clean_report
+def legacy_clean_report(entry):
+    raw_text = entry.get("report", "")
+    conclusion_idx = raw_text.upper().find("CONCLUSION")
+    recommendations_idx = raw_text.upper().find("RECOMMENDATIONS")
+    year_idx = raw_text.lower().find("year of study and report")
+    report_main = raw_text[:conclusion_idx].strip() if conclusion_idx != -1 else raw_text.strip()
+    conclusion = raw_text[conclusion_idx:recommendations_idx].replace("CONCLUSION", "").strip() if conclusion_idx != -1 and recommendations_idx != -1 else None
+    recommendations = raw_text[recommendations_idx:year_idx].replace("RECOMMENDATIONS.", "").strip() if recommendations_idx != -1 and year_idx != -1 else None
+    year = None
+    if year_idx != -1:
+        year_match = re.search(r"(\d{4})", raw_text[year_idx:])
+        if year_match:
+            year = year_match.group(1)
+    return {
+        "age": entry.get("age", "").replace(".", "").strip(),
+        "sex": entry.get("sex", "").replace(".", "").strip(),
+        "race": entry.get("race", "").replace(".", "").strip(),
+        "year": year,
+        "report": report_main,
+        "conclusion": conclusion,
+        "recommendations": recommendations,
+    }
+
+
+def two_stage_parse(text):
+    return legacy_clean_report(legacy_extract_fields(text))
+
+
+# 📚 Documents to parse: the text behind the recorded outputs, plus every PDF under --pdf-dir when an engine is installed
+def load_documents(pdf_dir):
+    documents = []
+    if os.path.exists(GOLDEN_EXTRACTED):
+        documents += [legacy_document(entry) for entry in iter_records(GOLDEN_EXTRACTED)]
+    if os.path.isdir(pdf_dir) and available_engines():
+        for root, _, files in sorted(os.walk(pdf_dir)):
+            for name in sorted(files):
+                if name.lower().endswith(".pdf"):
+                    documents.append(extract_text(os.path.join(root, name), available_engines())[0])
+    return documents
+
+
+# ↔️ Edge cases: the old pipeline must still give the recorded fields (the reference is unchanged), and the new parser
+# the recorded "expected" fields where it diverges on purpose, the old ones otherwise. Returns (failures, divergences)
+def check_edge_cases():
+    failures, divergences = [], []
+    if not os.path.exists(GOLDEN_EDGE_CASES):
+        return failures, divergences
+    cases = list(iter_records(GOLDEN_EDGE_CASES))
+    for case in cases:
+        if two_stage_parse(case["text"]) != case["two_stage"]:
+            failures.append((f"old pipeline on edge case {case['name']}", case["two_stage"], two_stage_parse(case["text"])))
+        expected = case.get("expected", case["two_stage"])
+        if parse_report(case["text"]) != expected:
+            failures.append((f"edge case {case['name']}", expected, parse_report(case["text"])))
+        elif "expected" in case:
+            divergences.append((case["name"], case["divergence"]))
+    print(f"↔️ Edge cases: {len(cases)} checked, {len(divergences)} intended divergences from the old pipeline")
+    return failures, divergences
+
+
+# ✅ Golden checks: the recorded cleaned outputs, and the old pipeline on every document it can parse.
+# Returns (failures, documents the old pipeline could parse)
+def check_golden(documents):
+    failures = []
+    if os.path.exists(GOLDEN_EXTRACTED) and os.path.exists(GOLDEN_CLEANED):
+        expected = {record["file_path"]: record for record in iter_records(GOLDEN_CLEANED)}
+        for entry in iter_records(GOLDEN_EXTRACTED):
+            golden = {name: expected[entry["file_path"]][name] for name in REPORT_FIELDS}
+            if parse_report(legacy_document(entry)) != golden:
+                failures.append((f"recorded output for {entry['file_path']}", golden, parse_report(legacy_document(entry))))
+        print(f"📼 Recorded outputs: {len(expected)} checked")
+
+    compared = []
+    for number, text in enumerate(documents, start=1):
+        try:
+            old = two_stage_parse(text)
+        except Exception:
+            continue  # e.g. no "Age:" line: the old cleaning step crashed on these
+        compared.append(text)
+        if parse_report(text) != old:
+            failures.append((f"document {number}", old, parse_report(text)))
+    print(f"🔁 Old two-stage pipeline: {len(compared)} documents compared, {len(documents) - len(compared)} it could not parse")
+    return failures, compared
+
+
+# ⏱️ Documents per second of a parser over the benchmark corpus
+def throughput(parse, corpus):
+    start = time.perf_counter()
+    for text in corpus:
+        parse(text)
+    return len(corpus) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of the single-pass report parser, checked against the old two-stage results.")
+    parser.add_argument("--documents", type=int, default=20000, help="Documents parsed per timing run")
+    parser.add_argument("--pdf-dir", default=PDF_DIR)
+    args = parser.parse_args()
+
+    documents = load_documents(args.pdf_dir)
+    if not documents:
+        sys.exit(f"❌ No documents: need {GOLDEN_EXTRACTED} or PDFs under {args.pdf_dir}")
+
+    failures, comparable = check_golden(documents)
+    edge_failures, divergences = check_edge_cases()
+    failures += edge_failures
+    for name, reason in divergences:
+        print(f"↔️ {name}: {reason}")
+    for label, expected, actual in failures[:5]:
+        print(f"❌ {label}:")
+        for name in REPORT_FIELDS:
+            if expected[name] != actual[name]:
+                print(f"   {name}: expected {expected[name]!r:.120} got {actual[name]!r:.120}")
+
+    # ⏱️ Both parsers on the same documents (the ones the old pipeline can parse; all of them when it parses none)
+    corpus = list(itertools.islice(itertools.cycle(comparable or documents), args.documents))
+    megabytes = sum(len(text.encode("utf-8")) for text in corpus) / 1e6
+    parsers = (("two-stage", two_stage_parse),) if comparable else ()
+    print(f"\n{'Parser':<14}{'docs/s':>12}{'MB/s':>9}")
+    rates = {}
+    for name, parse in parsers + (("single-pass", parse_report),):
+        rates[name] = throughput(parse, corpus)
+        print(f"{name:<14}{rates[name]:>12,.0f}{rates[name] * megabytes / len(corpus):>9.1f}")
+    if comparable:
+        print(f"⚡ {rates['single-pass'] / rates['two-stage']:.1f}x the old pipeline's throughput")
+
+    if failures:
+        sys.exit(f"❌ {len(failures)} golden mismatch(es)")
+    print(f"✅ Golden outputs match ({len(divergences)} intended divergences from the old pipeline, listed above)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# 📦 Required Imports
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch_generate_pdf_reports as real_reports
+import batch_generate_pdf_reports_synthetic as synthetic_reports
+from utils.jsonl import iter_records
+from utils.pdf_reports import run_timestamp
+
+# 🎲 Sample predictions (a mix of confident and low-confidence cases, so the warning path is timed too)
+def sample_predictions(count, seed=0):
+    rng = random.Random(seed)
+    classes = ["glioma", "meningioma", "no_tumor", "pituitary"]
+    return [
+        {"patient_id": f"SYN-{i:06d}", "predicted_class": rng.choice(classes), "confidence": round(rng.uniform(40, 99.9), 2)}
+        for i in range(count)
+    ]
+
+# ⏱️ Per-report milliseconds for build + serialization (in memory, so disk speed doesn't blur the result)
+def time_reports(render, cases):
+    render(cases[0])  # one-time costs (font parsing, template preparation) are not per-report costs
+    timings = []
+    for case in cases:
+        tick = time.perf_counter()
+        render(case).output()
+        timings.append((time.perf_counter() - tick) * 1000)
+    return timings
+
+# ✅ The template must not change what is drawn: compare the page content streams
+def same_pages(render_before, render_after, cases):
+    for case in cases:
+        before, after = render_before(case), render_after(case)
+        if [page.contents for page in before.pages.values()] != [page.contents for page in after.pages.values()]:
+            return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-report render time with and without the precompiled report template.")
+    parser.add_argument("--reports", type=int, default=200, help="Reports rendered per configuration")
+    parser.add_argument("--cleaned-reports", default=real_reports.CLEANED_REPORTS_PATH)
+    args = parser.parse_args()
+
+    created = run_timestamp("2025-01-01T09:00")
+    predictions = sample_predictions(args.reports)
+    suites = {
+        "synthetic": (
+            predictions,
+            lambda case: synthetic_reports.build_pdf(case, created, None),
+            lambda case: synthetic_reports.build_pdf(case, created),
+        ),
+    }
+    if os.path.exists(args.cleaned_reports):
+        patients = list(iter_records(args.cleaned_reports)) or [{}]
+        cases = [(patients[i % len(patients)], predictions[i]) for i in range(args.reports)]
+        suites["clinical"] = (
+            cases,
+            lambda case: real_reports.build_pdf(*case, created, None),
+            lambda case: real_reports.build_pdf(*case, created),
+        )
+
+    print(f"{'Reports':<11}{'Mode':<10}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'reports/s':>11}")
+    for name, (cases, before, after) in suites.items():
+        results = {}
+        for mode, render in (("before", before), ("template", after)):
+            timings = time_reports(render, cases)
+            results[mode] = sum(timings) / len(timings)
+            p95 = statistics.quantiles(timings, n=20)[-1]
+            print(f"{name:<11}{mode:<10}{results[mode]:>9.2f}{statistics.median(timings):>9.2f}"
+                  f"{p95:>9.2f}{1000 / results[mode]:>11.1f}")
+        identical = same_pages(before, after, cases[:20])
+        print(f"{'':<11}⚡ {results['before'] / results['template']:.2f}x faster per report; "
+              f"page content {'identical ✅' if identical else 'DIFFERS ❌'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# 📦 Required Imports
+import os
+import sys
+import time
+import random
+import argparse
+
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+import torch
+from utils.inference import IMAGE_EXTENSIONS, transform
+from utils.preprocessing import TOLERANCE_LEVELS, max_difference_levels, preprocess_images
+
+# 📁 Sample images
+IMAGE_DIR = "data/classificationdata/timri/test"
+
+# 🚀 Compare the batched tensor path with the PIL Compose chain
+def main():
+    parser = argparse.ArgumentParser(description="Check batched preprocessing against the PIL transform.")
+    parser.add_argument("--samples", type=int, default=64)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE_LEVELS, help="Max allowed gap in 8-bit grey levels")
+    args = parser.parse_args()
+
+    paths = sorted(
+        os.path.join(root, name)
+        for root, _, files in os.walk(IMAGE_DIR)
+        for name in files if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    paths = random.Random(0).sample(paths, min(args.samples, len(paths)))
+
+    start = time.perf_counter()
+    torch.stack([transform(Image.open(path).convert("RGB")) for path in paths])
+    pil_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    preprocess_images(paths)
+    batched_seconds = time.perf_counter() - start
+
+    gap = max_difference_levels(paths, transform)
+    print(f"⏱️ PIL chain: {pil_seconds * 1000 / len(paths):.2f} ms/img, batched: {batched_seconds * 1000 / len(paths):.2f} ms/img")
+    if gap > args.tolerance:
+        sys.exit(f"❌ Max gap {gap:.2f} grey levels exceeds tolerance {args.tolerance}")
+    print(f"✅ Max gap {gap:.2f} grey levels over {len(paths)} images (tolerance {args.tolerance})")
+
+if __name__ == "__main__":
+    main()
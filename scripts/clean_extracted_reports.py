@@ -1,59 +1,42 @@
 # 📦 Required imports
-import json
 import os
-import re
+import sys
+import argparse
+
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.jsonl import FORMATS, iter_records, open_writer, read_keys, with_format
+from utils.report_parser import legacy_document, parse_report
 
 # 📁 Paths
 input_path = "outputs/extracted_reports.json"
 output_path = "outputs/cleaned_reports.json"
 
-# 📖 Load extracted reports
-with open(input_path, "r") as f:
-    reports = json.load(f)
-
-cleaned_reports = []
-
-# 🔄 Process each report
-for entry in reports:
-    raw_text = entry.get("report", "")
-
-    # 📍 Find the positions
-    conclusion_idx = raw_text.upper().find("CONCLUSION")
-    recommendations_idx = raw_text.upper().find("RECOMMENDATIONS")
-    year_idx = raw_text.lower().find("year of study and report")
-
-    # ✂️ Extract parts
-    report_main = raw_text[:conclusion_idx].strip() if conclusion_idx != -1 else raw_text.strip()
-    conclusion = raw_text[conclusion_idx:recommendations_idx].replace("CONCLUSION", "").strip() if conclusion_idx != -1 and recommendations_idx != -1 else None
-    recommendations = raw_text[recommendations_idx:year_idx].replace("RECOMMENDATIONS.", "").strip() if recommendations_idx != -1 and year_idx != -1 else None
-
-    # 📅 Year
-    year = None
-    if year_idx != -1:
-        year_match = re.search(r"(\d{4})", raw_text[year_idx:])
-        if year_match:
-            year = year_match.group(1)
-
-    # 🧹 Clean trailing dots in age, sex, race
-    age = entry.get("age", "").replace(".", "").strip()
-    sex = entry.get("sex", "").replace(".", "").strip()
-    race = entry.get("race", "").replace(".", "").strip()
-
-    # ✅ Add cleaned entry
-    cleaned_reports.append({
-        "age": age,
-        "sex": sex,
-        "race": race,
-        "year": year,
-        "report": report_main,
-        "conclusion": conclusion,
-        "recommendations": recommendations,
-        "file_path": entry.get("file_path", "")
-    })
-
-# 💾 Save cleaned data
-os.makedirs("outputs", exist_ok=True)
-with open(output_path, "w") as f:
-    json.dump(cleaned_reports, f, indent=2, ensure_ascii=False)
-
-print(f"✅ Cleaned data saved to {output_path}")
+# 🔄 Clean one extracted report (same parser as batch_pdf_extractor.py, run on the text the record came from)
+def clean_report(entry):
+    return {**parse_report(legacy_document(entry)), "file_path": entry.get("file_path", "")}
+
+# 🚀 Main
+def main():
+    parser = argparse.ArgumentParser(description="Convert extracted_reports from older extractor versions into cleaned fields "
+                                                 "(batch_pdf_extractor.py now writes cleaned_reports directly).")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="Read and write .jsonl (streamed) instead of .json")
+    parser.add_argument("--resume", action="store_true", help="Keep existing results and skip reports already cleaned")
+    args = parser.parse_args()
+
+    source = with_format(input_path, args.format)
+    target = with_format(output_path, args.format)
+    done = read_keys(target, "file_path") if args.resume else set()
+
+    # 📖 Records are read one at a time, so memory stays flat in JSONL mode
+    with open_writer(target, args.format, append=args.resume) as writer:
+        for entry in iter_records(source):
+            if entry.get("file_path", "") in done:
+                continue
+            writer.write(clean_report(entry))
+
+    print(f"✅ Cleaned data saved to {target}")
+
+if __name__ == "__main__":
+    main()
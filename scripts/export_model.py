@@ -0,0 +1,78 @@
+# 📦 Required Imports
+import os
+import sys
+import argparse
+import torch
+
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.backends import EXPORT_PATHS, LOADERS
+from utils.model_registry import MODEL_SPECS, state_dict_loader
+
+# 📏 Maximum absolute logit difference allowed between eager and an exported backend
+TOLERANCE = 1e-3
+
+# 💾 TorchScript export (traced, then frozen so weights become constants)
+def export_torchscript(model, path, example):
+    with torch.no_grad():
+        scripted = torch.jit.freeze(torch.jit.trace(model, example).eval())
+    torch.jit.save(scripted, path)
+
+# 💾 ONNX export with a dynamic batch axis
+def export_onnx(model, path, example):
+    torch.onnx.export(
+        model, example, path,
+        input_names=["image"], output_names=["logits"],
+        dynamic_axes={"image": {0: "batch"}, "logits": {0: "batch"}},
+        opset_version=17,
+    )
+
+EXPORTERS = {"torchscript": export_torchscript, "onnx": export_onnx}
+
+# ✅ Compare every backend with the eager model on several batch sizes
+def verify(model, backend, path, tolerance, batch_sizes=(1, 3, 8)):
+    exported = LOADERS[backend](path)
+    worst = 0.0
+    with torch.no_grad():
+        for batch_size in batch_sizes:
+            images = torch.randn(batch_size, 3, 224, 224)
+            expected = model(images)
+            actual = exported(images)
+            worst = max(worst, (expected - actual).abs().max().item())
+            if not torch.equal(expected.argmax(dim=1), actual.argmax(dim=1)):
+                print(f"❌ {backend}: predicted classes differ from eager (batch={batch_size})")
+                return False
+    status = "✅" if worst <= tolerance else "❌"
+    print(f"{status} {backend}: max |logit diff| = {worst:.2e} (tolerance {tolerance:.0e}) on batches {batch_sizes}")
+    return worst <= tolerance
+
+# 🚀 Main workflow
+def main():
+    parser = argparse.ArgumentParser(description="Export trained classifiers to TorchScript and ONNX and check parity.")
+    parser.add_argument("--model", choices=sorted(EXPORT_PATHS) + ["all"], default="all")
+    parser.add_argument("--backend", choices=sorted(EXPORTERS) + ["all"], default="all")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    names = sorted(EXPORT_PATHS) if args.model == "all" else [args.model]
+    backends = sorted(EXPORTERS) if args.backend == "all" else [args.backend]
+    example = torch.randn(2, 3, 224, 224)
+    all_ok = True
+
+    for name in names:
+        arch, checkpoint = MODEL_SPECS[name]
+        model = state_dict_loader(arch)(checkpoint)
+        print(f"\n🧠 {name} ({checkpoint})")
+        for backend in backends:
+            path = EXPORT_PATHS[name][backend]
+            EXPORTERS[backend](model, path, example)
+            print(f"💾 Saved {backend} model to {path}")
+            all_ok = verify(model, backend, path, args.tolerance) and all_ok
+
+    if not all_ok:
+        sys.exit("\n❌ At least one backend does not match the eager model.")
+    print("\n🎯 All exported backends match the eager model.")
+
+if __name__ == "__main__":
+    main()
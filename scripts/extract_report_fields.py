@@ -1,52 +1,17 @@
-import pdfplumber
+# 📦 Required Imports
+import os
+import sys
 
-def extract_fields_from_pdf(pdf_path):
-    with pdfplumber.open(pdf_path) as pdf:
-        all_text = ""
-        for page in pdf.pages:
-            all_text += page.extract_text() + "\n"
-
-    fields = {
-        "Age": None,
-        "Sex": None,
-        "Race": None,
-        "Report": None,
-        "Conclusion": None,
-        "Recommendations": None
-    }
-
-    lines = all_text.splitlines()
-
-    current_section = None
-    collected_text = {
-        "Report": [],
-        "Conclusion": [],
-        "Recommendations": []
-    }
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-    for line in lines:
-        line = line.strip()
+from utils.pdf_text import extract_text
+from utils.report_parser import parse_report
 
-        if line.startswith("Age:"):
-            fields["Age"] = line.replace("Age:", "").strip().strip(".")
-        elif line.startswith("Sex:"):
-            fields["Sex"] = line.replace("Sex:", "").strip().strip(".")
-        elif line.startswith("Race:"):
-            fields["Race"] = line.replace("Race:", "").strip().strip(".")
-        elif line.startswith("REPORT"):
-            current_section = "Report"
-        elif line.startswith("CONCLUSION"):
-            current_section = "Conclusion"
-        elif line.startswith("RECOMMENDATIONS"):
-            current_section = "Recommendations"
-        elif current_section:
-            collected_text[current_section].append(line)
-
-    # Merge collected section texts
-    for section in collected_text:
-        fields[section] = "\n".join(collected_text[section]).strip()
-
-    return fields
+# 🛠️ Cleaned report fields of one PDF (the parser batch_pdf_extractor.py uses)
+def extract_fields_from_pdf(pdf_path):
+    text = extract_text(pdf_path)[0]
+    return parse_report(text)
 
 if __name__ == "__main__":
     pdf_path = "data/brain-mri/Brain_MRI_1.pdf"  # kendi dosya yoluna göre ayarla
@@ -0,0 +1,80 @@
+# 📦 Required Imports
+import os
+import sys
+import argparse
+
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.jsonl import FORMATS, with_format
+from utils.report_store import LOW_CONFIDENCE, SOURCES, STORE_PATH, ReportStore
+
+# 📁 The JSON outputs the store mirrors: (kind, prediction source) -> path
+JSON_FILES = {
+    ("reports", "unknown"): "outputs/cleaned_reports.json",
+    ("predictions", "unknown"): "outputs/predicted_labels.json",
+    ("predictions", "synthetic"): "outputs/predicted_synthetic_labels.json",
+}
+
+
+# 📥 Load every existing JSON / JSONL output into the store (merge: keep rows the files don't have)
+def import_outputs(store, fmt, merge=False):
+    for (kind, source), path in JSON_FILES.items():
+        path = with_format(path, fmt)
+        if not os.path.exists(path):
+            print(f"⚠️ {path} not found, skipped")
+            continue
+        print(f"📥 {path}: {store.import_records(path, kind, source, replace=not merge)} {kind}")
+
+
+# 📤 Write the store back out as the JSON / JSONL files the scripts read
+def export_outputs(store, fmt):
+    for (kind, source), path in JSON_FILES.items():
+        path = with_format(path, fmt)
+        print(f"📤 {path}: {store.export_records(path, kind, fmt, source)} {kind}")
+
+
+# 🚀 Main
+def main():
+    parser = argparse.ArgumentParser(description="Import, export and query the report store.")
+    parser.add_argument("--store", default=STORE_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load = commands.add_parser("import", help="Load the existing JSON outputs (replacing what the store holds)")
+    load.add_argument("--format", choices=FORMATS, default="json")
+    load.add_argument("--merge", action="store_true", help="Upsert into the store instead of replacing its contents")
+    dump = commands.add_parser("export", help="Rewrite the JSON outputs from the store")
+    dump.add_argument("--format", choices=FORMATS, default="json")
+
+    low = commands.add_parser("low-confidence", help="Predictions below a confidence, optionally since a date")
+    low.add_argument("--below", type=float, default=LOW_CONFIDENCE, help="Confidence threshold in %%")
+    low.add_argument("--since", default=None, help="ISO date or time, e.g. 2025-01-02")
+    low.add_argument("--source", choices=SOURCES, default="unknown")
+
+    patient = commands.add_parser("patient", help="Report, prediction and rendered PDFs of one patient")
+    patient.add_argument("patient_id")
+    patient.add_argument("--source", choices=SOURCES, default="unknown")
+    args = parser.parse_args()
+
+    store = ReportStore(args.store)
+    if args.command == "import":
+        import_outputs(store, args.format, args.merge)
+    elif args.command == "export":
+        export_outputs(store, args.format)
+    elif args.command == "low-confidence":
+        rows = store.low_confidence(args.since, args.below, args.source)
+        for row in rows:
+            print(f"⚠️ {row['patient_id']}: {row['predicted_class']} ({row['confidence']}%) at {row['predicted_at']}")
+        print(f"🔎 {len(rows)} predictions below {args.below}%" + (f" since {args.since}" if args.since else ""))
+    else:
+        for report, prediction in store.reports_with_predictions(args.source, args.patient_id):
+            print(f"📄 Report: {report}")
+            print(f"🧠 Prediction: {prediction}")
+        for row in store.generated_for(args.patient_id, args.source):
+            print(f"📝 {row['output_path']} rendered {row['rendered_at']} ({row['predicted_class']}, {row['confidence']}%)")
+    print(f"🗃️ Report store: {store.stats()}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
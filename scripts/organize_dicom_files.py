@@ -1,3 +1,4 @@
+# ℹ️ Not needed for prediction any more: predict_unknown_images.py --dicom-dir reads the DICOM series directly
 import os
 import shutil
 import pandas as pd
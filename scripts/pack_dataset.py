@@ -0,0 +1,35 @@
+# 📦 Required Imports
+import os
+import sys
+import time
+import argparse
+
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.inference import NUM_WORKERS
+from utils.packed_dataset import default_pack_dir, is_pack_current, pack_image_folder
+
+# 📂 Dataset path
+DATA_DIR = "data/classificationdata/timri/train"
+
+# 🚀 Decode an ImageFolder once into a memory-mapped pack for train_model.py --packed
+def main():
+    parser = argparse.ArgumentParser(description="Pack an ImageFolder into memory-mapped 224x224 uint8 arrays.")
+    parser.add_argument("--source", default=DATA_DIR)
+    parser.add_argument("--output", default=None, help="Pack folder (default: data/packed/<parent>_<folder>)")
+    parser.add_argument("--workers", type=int, default=NUM_WORKERS)
+    parser.add_argument("--force", action="store_true", help="Re-pack even if the pack is up to date")
+    args = parser.parse_args()
+
+    pack_dir = args.output or default_pack_dir(args.source)
+    if not args.force and is_pack_current(pack_dir, args.source):
+        print(f"♻️ {pack_dir} is up to date with {args.source}")
+        return
+
+    start = time.perf_counter()
+    pack_image_folder(args.source, pack_dir, num_workers=args.workers)
+    print(f"📦 Packed {args.source} into {pack_dir} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
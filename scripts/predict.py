@@ -1,42 +1,38 @@
+import os
+import sys
+import argparse
 import torch
-from torchvision import models, transforms
-from PIL import Image
 
-# 📁 Model path and device configuration
-MODEL_PATH = "model/classifier.pt"
-DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# 🏷️ Class names corresponding to folder structure
-class_names = ["glioma", "meningioma", "no_tumor", "pituitary"]
+from utils.backends import BACKENDS
+from utils.inference import BATCH_SIZE, NUM_WORKERS, load_classifier, predict_images
+from utils.model_registry import MODEL_REGISTRY, parse_model_name
 
-# 🧠 Load the ResNet50 model and adjust the output layer
-model = models.resnet50(pretrained=False)
-model.fc = torch.nn.Linear(model.fc.in_features, len(class_names))
-model.load_state_dict(torch.load(MODEL_PATH, map_location=DEVICE))
-model.eval()
+# 📁 Device configuration
+DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
-# 🔄 Image preprocessing pipeline
-transform = transforms.Compose([
-    transforms.Resize((224, 224)),
-    transforms.Grayscale(num_output_channels=3),
-    transforms.ToTensor(),
-    transforms.Normalize([0.485, 0.456, 0.406],
-                         [0.229, 0.224, 0.225])
-])
+# 🧪 Example image used when no path is given
+EXAMPLE_IMAGE = "data/classificationdata/glioma/Tr-glTr_0010.jpg"
 
 # 🔍 Prediction function
-def predict(image_path):
-    image = Image.open(image_path).convert("RGB")
-    image_tensor = transform(image).unsqueeze(0).to(DEVICE)
-
-    with torch.no_grad():
-        outputs = model(image_tensor)
-        probs = torch.softmax(outputs, dim=1)
-        pred_class = probs.argmax(dim=1).item()
-        confidence = probs[0][pred_class].item()
-
-    print(f"🧠 Prediction: {class_names[pred_class]}")
-    print(f"📊 Confidence: {confidence * 100:.2f}%")
-
-# 🧪 Example usage (replace with any image path you want to test)
-predict("data/classificationdata/glioma/Tr-glTr_0010.jpg")
+def predict(image_paths, model_name="resnet50", batch_size=BATCH_SIZE, num_workers=NUM_WORKERS):
+    # INT8 kernels only run on CPU
+    device = torch.device("cpu") if model_name.endswith("_int8") else DEVICE
+    # predict_images puts the model on the device (a copy: the registry's model is shared)
+    for image_path, predicted_class, confidence in predict_images(
+        image_paths, load_classifier(model_name), batch_size=batch_size, num_workers=num_workers, device=device
+    ):
+        print(f"🧠 Prediction ({image_path}): {predicted_class}")
+        print(f"📊 Confidence: {confidence * 100:.2f}%")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classify one or more MRI images.")
+    parser.add_argument("images", nargs="*", default=[EXAMPLE_IMAGE])
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=0, help="DataLoader decode workers")
+    parser.add_argument("--model", choices=MODEL_REGISTRY.names(), default="resnet50", help="e.g. resnet50_int8 for the quantized model")
+    parser.add_argument("--backend", choices=BACKENDS, default="eager", help="Run an exported model (see scripts/export_model.py)")
+    args = parser.parse_args()
+    predict(args.images, model_name=parse_model_name(parser, args.model, args.backend), batch_size=args.batch_size, num_workers=args.workers)
@@ -0,0 +1,115 @@
+# 📦 Required Imports
+import os
+import sys
+import time
+import argparse
+
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.backends import BACKENDS
+from utils.dicom import DICOM_DIR, group_series, index_dicom, slice_id, stratified_sample
+from utils.inference import BATCH_SIZE, NUM_WORKERS, DicomDataset, image_probabilities, image_probabilities_cached, load_classifier
+from utils.jsonl import FORMATS, open_writer, with_format
+from utils.model_registry import CLASS_NAMES, MODEL_REGISTRY, parse_model_name
+from utils.prediction_cache import PredictionCache
+from utils.report_store import ReportStore
+from utils.series import AGGREGATES, TOP_SLICES, aggregate_series
+
+# 📁 Paths
+OUTPUT_PATH = "outputs/predicted_series.json"
+
+
+# 🔢 --sample: at least one slice per series (0 or less would leave every series empty)
+def slice_count(value):
+    count = int(value)
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {count}")
+    return count
+
+
+# 🧾 Output record of one series (all_slices: the whole series, sampled or not). patient_id is the id the
+# first-JPG-per-series flow gave it, so the verdict replaces that slice's prediction downstream
+def series_record(aggregate, method, all_slices):
+    verdict = aggregate.verdict(method)
+    first = all_slices[0]
+    return {
+        "patient_id": slice_id(first.path),
+        "predicted_class": verdict["predicted_class"],
+        "confidence": round(verdict["confidence"] * 100, 2),
+        "series_uid": first.series_uid,
+        "series_number": first.series_number,
+        "description": first.description,
+        "aggregate": method,
+        "slices_scored": aggregate.count,
+        "slices_total": len(all_slices),
+        "class_scores": {name: round(score * 100, 2) for name, score in verdict["scores"].items()},
+        "slice_votes": verdict["votes"],
+        "top_slices": [
+            {"slice_id": slice_id(dicom_slice.path), "instance_number": dicom_slice.instance_number,
+             "probability": round(probability * 100, 2)}
+            for dicom_slice, probability in verdict["top_slices"]
+        ],
+    }
+
+
+# 🚀 Main workflow
+def main():
+    parser = argparse.ArgumentParser(description="Predict one tumor type per DICOM series from all (or a sample of) its slices.")
+    parser.add_argument("--dicom-dir", default=DICOM_DIR)
+    parser.add_argument("--sample", type=slice_count, default=None, help="Score N slices per series, evenly spread (default: every slice)")
+    parser.add_argument("--aggregate", choices=AGGREGATES, default="mean", help="How slice probabilities combine into the verdict")
+    parser.add_argument("--top-k", type=int, default=TOP_SLICES, help="Most supportive slices reported per series")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=NUM_WORKERS, help="DataLoader decode workers")
+    parser.add_argument("--model", choices=MODEL_REGISTRY.names(), default="resnet50", help="e.g. resnet50_int8 for the quantized model")
+    parser.add_argument("--backend", choices=BACKENDS, default="eager", help="Run an exported model (see scripts/export_model.py)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the prediction cache and score every slice")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="jsonl streams one record per line as series finish")
+    args = parser.parse_args()
+    output_path = with_format(OUTPUT_PATH, args.format)
+
+    model_name = parse_model_name(parser, args.model, args.backend)
+    model_version = f"{model_name}@{MODEL_REGISTRY.checkpoint_version(model_name)}"
+
+    # 🩻 Header-only index; the pixels of a slice are decoded only when its batch is loaded
+    slices = index_dicom(args.dicom_dir)
+    full_series = group_series(slices)
+    series = {uid: stratified_sample(series_slices, args.sample) for uid, series_slices in full_series.items()}
+    paths = [dicom_slice.path for series_slices in series.values() for dicom_slice in series_slices]
+    print(f"🩻 Scoring {len(paths)} of {len(slices)} slices in {len(series)} series ({args.aggregate} aggregate)")
+
+    # 🔁 Slices stream through the batched predictor in series order, so each verdict is final as soon as
+    # its last slice is scored; only a batch of pixels and a few numbers per open series are held at a time
+    cache = None if args.no_cache else PredictionCache()
+    if cache is None:
+        scored = image_probabilities(paths, load_classifier(model_name), batch_size=args.batch_size,
+                                     num_workers=args.workers, dataset_class=DicomDataset)
+    else:
+        scored = image_probabilities_cached(paths, model_name, cache, batch_size=args.batch_size,
+                                            num_workers=args.workers, dataset_class=DicomDataset)
+
+    writer = open_writer(output_path, args.format)
+    store = ReportStore()
+    start = time.perf_counter()
+    for series_uid, aggregate in aggregate_series(series, scored, CLASS_NAMES, args.top_k):
+        record = series_record(aggregate, args.aggregate, full_series[series_uid])
+        top = ", ".join(f"#{s['instance_number']} {s['probability']}%" for s in record["top_slices"])
+        print(f"✅ Series {record['series_number']} ({record['slices_scored']}/{record['slices_total']} slices): "
+              f"{record['predicted_class']} ({record['confidence']}%), top slices {top}")
+        writer.write(record)
+        store.upsert_prediction({**record, "patient_id": series_uid}, "series", f"{model_version}/series-{args.aggregate}")
+    elapsed = time.perf_counter() - start
+
+    if cache is not None:
+        print(f"🗄️ Prediction cache: {cache.stats()}")
+        cache.close()
+
+    # 📄 Save results
+    writer.close()
+    store.close()
+    print(f"\n🎯 {writer.count} series verdicts from {len(paths)} slices in {elapsed:.1f}s "
+          f"({len(paths) / max(elapsed, 1e-9):.1f} slices/sec). Results saved to {output_path}")
+
+if __name__ == "__main__":
+    main()
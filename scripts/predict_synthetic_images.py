@@ -1,65 +1,77 @@
 # 📦 Required Imports
 import os
-import json
-from PIL import Image
-import torch
-from torchvision import models, transforms
+import sys
+import argparse
 
-# 🧠 Model path and class labels
-MODEL_PATH = "model/classifier.pt"
-CLASS_NAMES = ["glioma", "meningioma", "no_tumor", "pituitary"]
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# 🔄 Load trained model
-model = models.resnet50(weights=None)
-model.fc = torch.nn.Linear(model.fc.in_features, len(CLASS_NAMES))
-model.load_state_dict(torch.load(MODEL_PATH, map_location="cpu"))
-model.eval()
+from utils.backends import BACKENDS
+from utils.inference import BATCH_SIZE, NUM_WORKERS, list_images, load_classifier, predict_images, predict_images_cached
+from utils.jsonl import FORMATS, open_writer, read_keys, with_format
+from utils.model_registry import MODEL_REGISTRY, parse_model_name
+from utils.prediction_cache import PredictionCache
+from utils.report_store import ReportStore
 
-# 🧪 Image transformation
-transform = transforms.Compose([
-    transforms.Resize((224, 224)),
-    transforms.Grayscale(num_output_channels=3),
-    transforms.ToTensor(),
-    transforms.Normalize([0.485, 0.456, 0.406],
-                         [0.229, 0.224, 0.225])
-])
-
-# 🔍 Predict function
-def predict(image_path):
-    image = Image.open(image_path).convert("RGB")
-    image = transform(image).unsqueeze(0)
-    with torch.no_grad():
-        outputs = model(image)
-        probabilities = torch.softmax(outputs, dim=1)
-        predicted_index = probabilities.argmax(dim=1).item()
-        confidence = probabilities[0][predicted_index].item()
-    predicted_class = CLASS_NAMES[predicted_index]
-    return predicted_class, confidence
+# 📁 Paths
+SYNTHETIC_DIR = "data/brain-mri/synthetic"
+OUTPUT_PATH = "outputs/predicted_synthetic_labels.json"
 
 # 🚀 Main workflow
 def main():
-    synthetic_dir = "data/brain-mri/synthetic"
-    results = []
+    parser = argparse.ArgumentParser(description="Predict tumor types for synthetic patient images.")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=NUM_WORKERS, help="DataLoader decode workers")
+    parser.add_argument("--model", choices=MODEL_REGISTRY.names(), default="resnet50", help="e.g. resnet50_int8 for the quantized model")
+    parser.add_argument("--backend", choices=BACKENDS, default="eager", help="Run an exported model (see scripts/export_model.py)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the prediction cache and score every image")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="jsonl streams one record per line as images are scored")
+    parser.add_argument("--resume", action="store_true", help="Keep existing results and only score patients missing from them")
+    args = parser.parse_args()
+
+    model_name = parse_model_name(parser, args.model, args.backend)
+    output_path = with_format(OUTPUT_PATH, args.format)
+    image_paths = list_images(SYNTHETIC_DIR, extensions=(".jpg",))
+    if args.resume:
+        done = read_keys(output_path, "patient_id")
+        image_paths = [path for path in image_paths if os.path.basename(path).split(".")[0] not in done]
+        print(f"🔁 Resuming: {len(done)} already scored, {len(image_paths)} to go")
+    writer = open_writer(output_path, args.format, append=args.resume)
+    store = ReportStore()  # a full run drops the patients it did not score once it has finished, not before
+    scored_ids = set()
+    model_version = f"{model_name}@{MODEL_REGISTRY.checkpoint_version(model_name)}"
+
+    cache = None if args.no_cache else PredictionCache()
+    if cache is None:
+        predictions = predict_images(image_paths, load_classifier(model_name), batch_size=args.batch_size, num_workers=args.workers)
+    else:
+        predictions = predict_images_cached(image_paths, model_name, cache, batch_size=args.batch_size, num_workers=args.workers)
 
-    for file_name in os.listdir(synthetic_dir):
-        if file_name.lower().endswith(".jpg"):
-            image_path = os.path.join(synthetic_dir, file_name)
-            predicted_class, confidence = predict(image_path)
+    for image_path, predicted_class, confidence in predictions:
+        file_name = os.path.basename(image_path)
+        print(f"✅ Predicted {file_name}: {predicted_class} ({confidence*100:.2f}%)")
 
-            print(f"✅ Predicted {file_name}: {predicted_class} ({confidence*100:.2f}%)")
+        record = {
+            "patient_id": file_name.split(".")[0],  # Patient_1, Patient_2 ...
+            "predicted_class": predicted_class,
+            "confidence": round(confidence * 100, 2)
+        }
+        writer.write(record)
+        store.upsert_prediction(record, "synthetic", model_version)
+        scored_ids.add(record["patient_id"])
 
-            results.append({
-                "patient_id": file_name.split(".")[0],  # Patient_1, Patient_2 ...
-                "predicted_class": predicted_class,
-                "confidence": round(confidence * 100, 2)
-            })
+    if cache is not None:
+        print(f"🗄️ Prediction cache: {cache.stats()}")
+        cache.close()
 
     # 📄 Save results
-    os.makedirs("outputs", exist_ok=True)
-    with open("outputs/predicted_synthetic_labels.json", "w") as f:
-        json.dump(results, f, indent=2)
+    writer.close()
+    if not args.resume:
+        print(f"🧹 {store.prune_predictions(scored_ids, 'synthetic')} predictions of images no longer present dropped from the store")
+    print(f"🗃️ Report store: {store.stats()}")
+    store.close()
 
-    print("\n🎯 Synthetic image predictions saved successfully!")
+    print(f"\n🎯 Synthetic image predictions saved to {output_path}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
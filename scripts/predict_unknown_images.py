@@ -1,65 +1,125 @@
 # 📦 Required Imports
 import os
-import json
-from PIL import Image
-import torch
-from torchvision import models, transforms
-
-# 🧠 Model path and class labels
-MODEL_PATH = "model/classifier.pt"
-CLASS_NAMES = ["glioma", "meningioma", "no_tumor", "pituitary"]
-
-# 🔄 Load trained model
-model = models.resnet50(weights=None)
-model.fc = torch.nn.Linear(model.fc.in_features, len(CLASS_NAMES))
-model.load_state_dict(torch.load(MODEL_PATH, map_location="cpu"))
-model.eval()
-
-# 🧪 Image transformation (same as training)
-transform = transforms.Compose([
-    transforms.Resize((224, 224)),
-    transforms.Grayscale(num_output_channels=3),
-    transforms.ToTensor(),
-    transforms.Normalize([0.485, 0.456, 0.406],
-                         [0.229, 0.224, 0.225])
-])
-
-# 🔍 Predict function
-def predict(image_path):
-    image = Image.open(image_path).convert("RGB")
-    image = transform(image).unsqueeze(0)
-    with torch.no_grad():
-        outputs = model(image)
-        probabilities = torch.softmax(outputs, dim=1)
-        predicted_index = probabilities.argmax(dim=1).item()
-        confidence = probabilities[0][predicted_index].item()
-    predicted_class = CLASS_NAMES[predicted_index]
-    return predicted_class, confidence
+import sys
+import argparse
+
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.backends import BACKENDS
+from utils.dicom import dicom_inputs, slice_id
+from utils.inference import BATCH_SIZE, NUM_WORKERS, DicomDataset, ImagePathDataset, list_images, load_classifier, predict_images, predict_images_cached
+from utils.jsonl import FORMATS, JsonArrayWriter, JsonlWriter, drop_records, iter_records, with_format
+from utils.manifest import ScoreManifest
+from utils.model_registry import MODEL_REGISTRY, parse_model_name
+from utils.prediction_cache import PredictionCache
+from utils.report_store import ReportStore
+
+# 📁 Paths
+UNKNOWN_DIR = "data/brain-mri/unknown"
+OUTPUT_PATH = "outputs/predicted_labels.json"
+MANIFEST_PATH = "outputs/predicted_labels.manifest.json"
+
+# 🏷️ Patient id from an image file name
+def patient_id_for(image_path):
+    return os.path.basename(image_path).split('.')[0]  # örnek: IM000001
 
 # 🚀 Main workflow
 def main():
-    unknown_dir = "data/brain-mri/unknown"
-    results = []
+    parser = argparse.ArgumentParser(description="Predict tumor types for unlabeled MRI images.")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=NUM_WORKERS, help="DataLoader decode workers")
+    parser.add_argument("--model", choices=MODEL_REGISTRY.names(), default="resnet50", help="e.g. resnet50_int8 for the quantized model")
+    parser.add_argument("--backend", choices=BACKENDS, default="eager", help="Run an exported model (see scripts/export_model.py)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the prediction cache and score every image")
+    parser.add_argument("--full", action="store_true", help="Rebuild from scratch instead of scoring only new or changed images")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="jsonl streams one record per line as images are scored")
+    parser.add_argument("--dicom-dir", default=None, help="Score DICOM slices under this folder directly (e.g. data/brain-mri/ST000001)")
+    parser.add_argument("--all-slices", action="store_true", help="With --dicom-dir: every slice instead of the first of each series")
+    args = parser.parse_args()
+    output_path = with_format(OUTPUT_PATH, args.format)
+
+    model_name = parse_model_name(parser, args.model, args.backend)
+    model_version = f"{model_name}@{MODEL_REGISTRY.checkpoint_version(model_name)}"
+
+    # 📋 Incremental run: skip files the manifest says are unchanged and already scored by this model. Image-folder and
+    # DICOM runs, and json and jsonl outputs, share the manifest and the store: switching either rebuilds from scratch
+    settings = {"input": args.dicom_dir or UNKNOWN_DIR, "all_slices": args.all_slices, "format": args.format}
+    manifest = ScoreManifest(MANIFEST_PATH, settings)
+    resume = not args.full and not manifest.settings_changed and os.path.exists(output_path)
+    if manifest.settings_changed and not args.full:
+        print(f"🔁 Last run used other inputs or another format ({MANIFEST_PATH}): rebuilding from scratch")
+    if not resume:
+        manifest.clear()
+    if args.dicom_dir:
+        all_paths = dicom_inputs(args.dicom_dir, args.all_slices)
+        print(f"🩻 {len(all_paths)} DICOM slices indexed from their headers")
+        id_for, dataset_class = slice_id, DicomDataset
+    else:
+        all_paths = list_images(UNKNOWN_DIR)
+        id_for, dataset_class = patient_id_for, ImagePathDataset
+    removed = manifest.prune(all_paths)
+    removed_ids = [entry.get("patient_id") or patient_id_for(path) for path, entry in removed.items()]
+    image_paths = [path for path in all_paths if not manifest.is_current(path, model_version)]
+    print(f"🔁 Scoring {len(image_paths)} new or changed of {len(all_paths)} images")
+
+    # 📄 JSONL appends (readers keep the last record per patient) after dropping the records of removed images;
+    # JSON merges into the previous array
+    if args.format == "jsonl":
+        if resume and removed_ids:
+            print(f"🧹 Dropped {drop_records(output_path, removed_ids)} records of removed images from {output_path}")
+        writer = JsonlWriter(output_path, append=resume)
+    else:
+        stale_ids = set(removed_ids) | {id_for(path) for path in image_paths}
+        previous = iter_records(output_path) if resume else []
+        writer = JsonArrayWriter(output_path, [item for item in previous if item["patient_id"] not in stale_ids])
+
+    # 🗃️ The store is upserted per patient: only removed and rescored patients change. A full rebuild drops the
+    # patients it did not score only once it has finished, so a crashed run leaves the previous predictions in place
+    store = ReportStore()
+    if resume:
+        store.remove_predictions(removed_ids, "unknown")
+    scored_ids = set()
+
+    cache = None if args.no_cache else PredictionCache()
+    if not image_paths:
+        predictions = []  # nothing to do, don't even load the model
+    elif cache is None:
+        predictions = predict_images(image_paths, load_classifier(model_name), batch_size=args.batch_size,
+                                     num_workers=args.workers, dataset_class=dataset_class)
+    else:
+        predictions = predict_images_cached(image_paths, model_name, cache, batch_size=args.batch_size,
+                                            num_workers=args.workers, dataset_class=dataset_class)
 
-    for filename in os.listdir(unknown_dir):
-        if filename.lower().endswith(('.jpg', '.jpeg', '.png')):
-            image_path = os.path.join(unknown_dir, filename)
-            predicted_class, confidence = predict(image_path)
+    for image_path, predicted_class, confidence in predictions:
+        filename = os.path.basename(image_path)
+        print(f"✅ Predicted {filename}: {predicted_class} ({confidence*100:.2f}%)")
 
-            print(f"✅ Predicted {filename}: {predicted_class} ({confidence*100:.2f}%)")
+        record = {
+            "patient_id": id_for(image_path),
+            "predicted_class": predicted_class,
+            "confidence": round(confidence * 100, 2)
+        }
+        flushed = writer.write(record)
+        store.upsert_prediction(record, "unknown", model_version)
+        scored_ids.add(record["patient_id"])
+        manifest.record(image_path, model_version, patient_id=record["patient_id"])
+        if flushed:
+            manifest.save()  # only after the records it vouches for are on disk
 
-            results.append({
-                "patient_id": filename.split('.')[0],  # örnek: IM000001
-                "predicted_class": predicted_class,
-                "confidence": round(confidence * 100, 2)
-            })
+    if cache is not None:
+        print(f"🗄️ Prediction cache: {cache.stats()}")
+        cache.close()
 
-    # 📄 Save results to JSON
-    os.makedirs("outputs", exist_ok=True)
-    with open("outputs/predicted_labels.json", "w") as f:
-        json.dump(results, f, indent=2)
+    # 📄 Save results
+    writer.close()
+    manifest.save()
+    if not resume:
+        print(f"🧹 {store.prune_predictions(scored_ids, 'unknown')} predictions of images no longer present dropped from the store")
+    print(f"🗃️ Report store: {store.stats()}")
+    store.close()
 
-    print("\n🎯 All predictions completed! Results saved to outputs/predicted_labels.json")
+    print(f"\n🎯 All predictions completed! Results saved to {output_path}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
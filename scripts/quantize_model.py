@@ -0,0 +1,110 @@
+# 📦 Required Imports
+import os
+import sys
+import time
+import random
+import argparse
+import torch
+from torch.utils.data import Subset
+from torchvision import datasets
+
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.inference import NUM_WORKERS, make_loader, transform
+from utils.model_registry import CLASS_NAMES, MODEL_REGISTRY, MODEL_SPECS, state_dict_loader
+from utils.quantization import QUANTIZED_PATHS, quantize_model, save_quantized, select_engine
+
+# 📁 Calibration and evaluation data
+CALIBRATION_DIR = "data/classificationdata/timri/train"
+EVAL_DIR = "data/classificationdata/timri/valid"
+
+# 🎲 Random sample of a dataset (fixed seed so reruns calibrate identically)
+def sample_subset(dataset, size, seed=0):
+    indices = random.Random(seed).sample(range(len(dataset)), min(size, len(dataset)))
+    return Subset(dataset, sorted(indices))
+
+# 🔍 Predicted and true labels over a loader
+def collect_predictions(model, loader):
+    predictions, labels = [], []
+    with torch.no_grad():
+        for images, targets in loader:
+            predictions.extend(model(images).argmax(dim=1).tolist())
+            labels.extend(targets.tolist())
+    return predictions, labels
+
+# ⏱️ Mean milliseconds per call and images/sec for a fixed batch
+def measure_speed(model, batch, runs=20, warmup=3):
+    with torch.no_grad():
+        for _ in range(warmup):
+            model(batch)
+        start = time.perf_counter()
+        for _ in range(runs):
+            model(batch)
+        elapsed = time.perf_counter() - start
+    return elapsed / runs * 1000, batch.shape[0] * runs / elapsed
+
+# 📊 Side-by-side fp32 vs INT8 report
+def print_report(name, fp32_model, int8_model, eval_loader, fp32_path, int8_path, batch_size):
+    fp32_preds, labels = collect_predictions(fp32_model, eval_loader)
+    int8_preds, _ = collect_predictions(int8_model, eval_loader)
+
+    print(f"\n📊 Quantization report: {name}")
+    print(f"{'Class':<12}{'N':>6}{'fp32 acc':>11}{'int8 acc':>11}{'agreement':>11}")
+    for class_index, class_name in enumerate(CLASS_NAMES + ["overall"]):
+        rows = [i for i, label in enumerate(labels) if class_name == "overall" or label == class_index]
+        if not rows:
+            continue
+        fp32_acc = sum(fp32_preds[i] == labels[i] for i in rows) / len(rows) * 100
+        int8_acc = sum(int8_preds[i] == labels[i] for i in rows) / len(rows) * 100
+        agreement = sum(fp32_preds[i] == int8_preds[i] for i in rows) / len(rows) * 100
+        print(f"{class_name:<12}{len(rows):>6}{fp32_acc:>10.2f}%{int8_acc:>10.2f}%{agreement:>10.2f}%")
+
+    single = torch.randn(1, 3, 224, 224)
+    batch = torch.randn(batch_size, 3, 224, 224)
+    fp32_latency, _ = measure_speed(fp32_model, single)
+    int8_latency, _ = measure_speed(int8_model, single)
+    _, fp32_throughput = measure_speed(fp32_model, batch, runs=5)
+    _, int8_throughput = measure_speed(int8_model, batch, runs=5)
+    fp32_size = os.path.getsize(fp32_path) / 1e6
+    int8_size = os.path.getsize(int8_path) / 1e6
+
+    print(f"\n{'Metric':<30}{'fp32':>12}{'int8':>12}{'ratio':>9}")
+    print(f"{'Latency (ms, batch=1)':<30}{fp32_latency:>12.2f}{int8_latency:>12.2f}{fp32_latency / int8_latency:>8.2f}x")
+    print(f"{f'Throughput (img/s, batch={batch_size})':<30}{fp32_throughput:>12.1f}{int8_throughput:>12.1f}{int8_throughput / fp32_throughput:>8.2f}x")
+    print(f"{'Model size (MB)':<30}{fp32_size:>12.1f}{int8_size:>12.1f}{fp32_size / int8_size:>8.2f}x")
+
+# 🚀 Main workflow
+def main():
+    parser = argparse.ArgumentParser(description="Create INT8 checkpoints with static post-training quantization.")
+    parser.add_argument("--model", choices=sorted(MODEL_SPECS) + ["all"], default="all")
+    parser.add_argument("--calibration-samples", type=int, default=256)
+    parser.add_argument("--eval-dir", default=EVAL_DIR, help="Labelled ImageFolder used for the parity report")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=NUM_WORKERS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = select_engine()
+    print(f"⚙️ Quantized engine: {engine}")
+
+    calibration_set = sample_subset(datasets.ImageFolder(CALIBRATION_DIR, transform=transform), args.calibration_samples, args.seed)
+    calibration_loader = make_loader(calibration_set, batch_size=args.batch_size, num_workers=args.workers)
+    eval_loader = make_loader(datasets.ImageFolder(args.eval_dir, transform=transform), batch_size=args.batch_size, num_workers=args.workers)
+    print(f"✅ Calibration samples: {len(calibration_set)}, evaluation samples: {len(eval_loader.dataset)}")
+
+    names = sorted(MODEL_SPECS) if args.model == "all" else [args.model]
+    for name in names:
+        fp32_model = MODEL_REGISTRY.get(name).model
+        # FX rewrites the module it is given, so quantize a fresh copy of the weights
+        arch, fp32_path = MODEL_SPECS[name]
+        int8_model = quantize_model(state_dict_loader(arch)(fp32_path), calibration_loader, engine)
+
+        int8_path = QUANTIZED_PATHS[name]
+        save_quantized(int8_model, int8_path, torch.randn(1, 3, 224, 224))
+        print(f"💾 Saved INT8 model to {int8_path}")
+
+        print_report(name, fp32_model, MODEL_REGISTRY.get(f"{name}_int8").model, eval_loader, fp32_path, int8_path, args.batch_size)
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,30 @@
 # 📦 Required imports
-import pdfplumber
-import fitz  # PyMuPDF
+import os
+import sys
+
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pdf_text import join_pages, read_pdf_pages
 
 # ⚙️ Engine selector
 PDF_ENGINE = "pdfplumber"  # Options: "pdfplumber" or "pymupdf"
 
 # 🛠️ Read PDF with pdfplumber
 def read_pdf_with_pdfplumber(file_path):
-    text = ""
     try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+        return join_pages(text for text in read_pdf_pages(file_path, "pdfplumber") if text)
     except Exception as e:
         print(f"Error reading PDF with pdfplumber: {e}")
-    return text
+    return ""
 
 # 🛠️ Read PDF with pymupdf
 def read_pdf_with_pymupdf(file_path):
-    text = ""
     try:
-        doc = fitz.open(file_path)
-        for page in doc:
-            text += page.get_text() + "\n"
+        return join_pages(read_pdf_pages(file_path, "pymupdf"))
     except Exception as e:
         print(f"Error reading PDF with pymupdf: {e}")
-    return text
+    return ""
 
 # 🔍 General read function
 def read_pdf(file_path, engine="pdfplumber"):
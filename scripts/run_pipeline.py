@@ -0,0 +1,276 @@
+# 📦 Required Imports
+import os
+import sys
+import argparse
+import threading
+import multiprocessing
+
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch_generate_pdf_reports as report_script
+import batch_pdf_extractor as extractor
+from utils.backends import BACKENDS
+from utils.extraction_cache import ExtractionCache
+from utils.jsonl import JsonlWriter, iter_records
+from utils.parallel import DEFAULT_WORKERS, run_in_parallel
+from utils.pdf_reports import run_timestamp
+from utils.pdf_text import PDF_ENGINES, select_engines
+from utils.pipeline import QUEUE_SIZE, Pipeline
+from utils.report_parser import PARSER_VERSION
+from utils.report_store import ReportStore
+
+# 🧭 Stages in order; --from-stage starts at one and reads what the stages before it saved instead of running them.
+# (Cleaning is part of extraction since the single-pass report parser.)
+STAGES = ("extract", "predict", "report")
+
+# 📁 Inputs, and the outputs each stage streams to disk (JSON Lines, one record as soon as it is produced)
+PDF_DIR = extractor.PDF_DIR
+UNKNOWN_DIR = "data/brain-mri/unknown"
+CLEANED_REPORTS_PATH = "outputs/cleaned_reports.jsonl"
+PREDICTED_LABELS_PATH = "outputs/predicted_labels.jsonl"
+
+# 📁 Rendered reports, named <PDF folder>/report_<patient_id>.pdf; kept apart from batch_generate_pdf_reports.py's
+# report_<idx>.pdf files, whose numbers could otherwise collide with numeric patient ids
+REPORT_DIR = "outputs/pipeline_reports"
+
+# 🤷 Prediction for a report without a matching image (same as batch_generate_pdf_reports.py)
+NO_PREDICTION = {"predicted_class": "Unknown", "confidence": 0.0}
+
+# 🏁 Sent by the prediction branch once every image is scored, so reports still waiting can be rendered
+PREDICTIONS_DONE = ("predictions done", None)
+
+# 🧵 Worker processes are spawned: forking a process that runs the pipeline's threads can deadlock
+SPAWN = multiprocessing.get_context("spawn")
+
+
+# 📄 Extract stage: cached reports right away, new or changed PDFs as the pool parses them
+def extract_stage(args, engines, store):
+    def body(_):
+        cache = ExtractionCache(PARSER_VERSION)  # created in the stage thread: SQLite connections stay in their thread
+        pdf_paths = sorted(extractor.find_pdfs(args.pdf_dir))
+        print(f"🧹 {cache.prune(pdf_paths)} PDFs removed since the last run")
+        store.prune_reports(pdf_paths)
+        with JsonlWriter(CLEANED_REPORTS_PATH) as writer:
+            reports = extractor.extract_reports(cache, pdf_paths, engines, args.extract_workers, {}, context=SPAWN)
+            for pdf_path, fields in reports:
+                record = extractor.report_record(pdf_path, fields)
+                writer.write(record)
+                store.upsert_report(record)
+                yield "report", record
+        print(f"🗄️ Extraction cache: {cache.stats()}")
+        cache.close()
+    return body
+
+
+# 🧠 Predict stage: each thread scores micro-batches of whatever images are queued. Returns (body, finish)
+def predict_stage(args, store):
+    # torch is only imported when this stage runs, so --from-stage report works without it
+    from utils.dicom import slice_id
+    from utils.inference import DicomDataset, ImagePathDataset, load_classifier, predict_images, predict_images_cached
+    from utils.model_registry import MODEL_REGISTRY
+    from utils.prediction_cache import PredictionCache
+
+    id_for, dataset_class = (slice_id, DicomDataset) if args.dicom_dir else (extractor.patient_id_for, ImagePathDataset)
+    model_name = args.model_name
+    model_version = f"{model_name}@{MODEL_REGISTRY.checkpoint_version(model_name)}"
+    cache = None if args.no_cache else PredictionCache()
+    writer = JsonlWriter(PREDICTED_LABELS_PATH)
+    lock = threading.Lock()
+
+    def body(inbox):
+        for paths in inbox.batches(args.batch_size):
+            if cache is None:
+                predictions = predict_images(paths, load_classifier(model_name), batch_size=len(paths), num_workers=0,
+                                             dataset_class=dataset_class)
+            else:
+                predictions = predict_images_cached(paths, model_name, cache, batch_size=len(paths), num_workers=0,
+                                                    dataset_class=dataset_class)
+            for image_path, predicted_class, confidence in predictions:
+                record = {
+                    "patient_id": id_for(image_path),
+                    "predicted_class": predicted_class,
+                    "confidence": round(confidence * 100, 2),
+                }
+                with lock:
+                    writer.write(record)
+                store.upsert_prediction(record, "unknown", model_version)
+                yield "prediction", record
+
+    def finish():
+        writer.close()
+        if cache is not None:
+            print(f"🗄️ Prediction cache: {cache.stats()}")
+            cache.close()
+
+    return body, finish
+
+
+# 📖 Source stage replaying what an earlier run saved
+def saved_records(path, kind):
+    def body(_):
+        if not os.path.exists(path):
+            print(f"⚠️ {path} not found: no {kind}s to resume from")
+            return
+        for record in iter_records(path):
+            yield kind, record
+    return body
+
+
+# 📁 Where a report is rendered: the source PDF's folder (relative to --pdf-dir) is kept under REPORT_DIR, so
+# same-named PDFs in different folders get different reports
+def pipeline_report_dir(report, pdf_dir):
+    folder = os.path.dirname(report.get("file_path", ""))
+    relative = os.path.relpath(folder or pdf_dir, pdf_dir)
+    if relative.startswith(os.pardir):  # saved by a run over another --pdf-dir
+        relative = os.path.splitdrive(os.path.abspath(folder))[1].lstrip(os.sep)
+    return os.path.normpath(os.path.join(REPORT_DIR, relative))
+
+
+# 🔗 Join stage: a report is ready once its patient's prediction has arrived (one prediction can serve several
+# reports: same-named PDFs in different folders share a patient id). Reports whose image never comes are released
+# (with NO_PREDICTION) when the prediction branch is done.
+# Both halves share one input channel, so the join cannot push back on just one of them: reports wait and predictions
+# are kept in memory instead, and their peak sizes go into the summary (waiting_buffer, predictions_buffer).
+# counts["reports"] counts the reports that came in, for the check against the PDFs rendered
+def join_patients(waiting_buffer, predictions_buffer, counts):
+    def body(inbox):
+        waiting, predictions = {}, {}  # waiting: patient id -> reports
+        waiting_reports = 0
+        predictions_done = False
+        for kind, record in inbox:
+            if kind == "report":
+                counts["reports"] += 1
+                patient_id = record.get("patient_id") or extractor.patient_id_for(record.get("file_path", ""))
+                if patient_id in predictions or predictions_done:
+                    yield patient_id, record, predictions.get(patient_id, NO_PREDICTION)
+                else:
+                    waiting.setdefault(patient_id, []).append(record)
+                    waiting_reports += 1
+                    waiting_buffer.observe(waiting_reports)
+            elif kind == "prediction":
+                predictions[record["patient_id"]] = record  # later records win, as in batch_generate_pdf_reports.py
+                predictions_buffer.observe(len(predictions))
+                for report in waiting.pop(record["patient_id"], []):
+                    waiting_reports -= 1
+                    yield record["patient_id"], report, record
+            else:
+                predictions_done = True
+                for patient_id, reports in waiting.items():
+                    for report in reports:
+                        yield patient_id, report, NO_PREDICTION
+                waiting.clear()
+                waiting_reports = 0
+    return body
+
+
+# 📝 Report stage: render each ready report on the process pool (see pipeline_report_dir).
+# counts["pdfs"] counts distinct output files, counts["skipped"] those --resume found already there
+def report_stage(args, created, store, counts):
+    def body(inbox):
+        rendering = {}  # output path -> (patient id, prediction) of the reports in flight
+        outputs = set()
+        def tasks():
+            for patient_id, patient_info, prediction_info in inbox:
+                output_dir = pipeline_report_dir(patient_info, args.pdf_dir)
+                output_path = report_script.report_path(patient_id, output_dir)
+                if args.resume and os.path.exists(output_path):
+                    outputs.add(output_path)
+                    counts["pdfs"], counts["skipped"] = len(outputs), counts["skipped"] + 1
+                    continue
+                os.makedirs(output_dir, exist_ok=True)
+                rendering[output_path] = (patient_id, prediction_info)
+                yield patient_info, prediction_info, patient_id, created, not args.no_template, output_dir
+
+        for output_path in run_in_parallel(report_script.render_task, tasks(), args.report_workers, context=SPAWN):
+            print(f"✅ Saved: {output_path}")
+            store.record_generated(output_path, *rendering.pop(output_path), created)
+            outputs.add(output_path)
+            counts["pdfs"] = len(outputs)
+            yield output_path
+    return body
+
+
+# 🚀 Main
+def main():
+    parser = argparse.ArgumentParser(description="Run extract -> predict -> report as one streaming pipeline.")
+    parser.add_argument("--from-stage", choices=STAGES, default="extract",
+                        help="Start here; earlier stages are replayed from their saved outputs")
+    parser.add_argument("--pdf-dir", default=PDF_DIR)
+    parser.add_argument("--images", default=UNKNOWN_DIR, help="Images to score (file name = patient id)")
+    parser.add_argument("--dicom-dir", default=None, help="Score DICOM series under this folder instead of --images")
+    parser.add_argument("--all-slices", action="store_true", help="With --dicom-dir: every slice, not the first per series")
+    parser.add_argument("--engine", choices=("auto",) + PDF_ENGINES, default="auto")
+    parser.add_argument("--extract-workers", type=int, default=DEFAULT_WORKERS, help="PDF extraction processes")
+    parser.add_argument("--predict-workers", type=int, default=1, help="Prediction threads sharing the model")
+    parser.add_argument("--batch-size", type=int, default=32, help="Largest prediction micro-batch")
+    parser.add_argument("--model", default="resnet50", help="Registry model name, e.g. resnet50_int8 (checked when predicting)")
+    parser.add_argument("--backend", choices=BACKENDS, default="eager", help="Run an exported model (see scripts/export_model.py)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the prediction cache")
+    parser.add_argument("--report-workers", type=int, default=DEFAULT_WORKERS, help="PDF rendering processes")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE, help="Items each queue between stages holds")
+    parser.add_argument("--resume", action="store_true", help="Skip patients whose report PDF already exists")
+    parser.add_argument("--timestamp", default=None, help="Report date as ISO time (default: now)")
+    parser.add_argument("--no-template", action="store_true", help="Lay out every report from scratch with the full font")
+    args = parser.parse_args()
+    start_at = STAGES.index(args.from_stage)
+    if start_at <= STAGES.index("predict"):
+        from utils.model_registry import parse_model_name
+
+        args.model_name = parse_model_name(parser, args.model, args.backend)
+    created = run_timestamp(args.timestamp)
+
+    store = ReportStore()  # reports, predictions and rendered PDFs are upserted as they stream by
+    pipeline = Pipeline(args.queue_size)
+    patients = pipeline.channel("patients")  # reports and predictions, in arrival order
+    ready = pipeline.channel("ready")
+
+    # 📄 Reports branch
+    if start_at <= STAGES.index("extract"):
+        pipeline.stage("extract", extract_stage(args, select_engines(args.engine), store), output=patients,
+                       processes=args.extract_workers)
+    else:
+        pipeline.stage("reports", saved_records(CLEANED_REPORTS_PATH, "report"), output=patients)
+
+    # 🧠 Predictions branch
+    finish_predict = None
+    if start_at <= STAGES.index("predict"):
+        from utils.dicom import dicom_inputs
+        from utils.inference import list_images
+
+        images = pipeline.channel("images")
+        if args.dicom_dir:
+            pipeline.stage("images", lambda _: iter(dicom_inputs(args.dicom_dir, args.all_slices)), output=images)
+        else:
+            pipeline.stage("images", lambda _: iter(list_images(args.images)), output=images)
+        predict_body, finish_predict = predict_stage(args, store)
+        pipeline.stage("predict", predict_body, input=images, output=patients, threads=args.predict_workers,
+                       final=[PREDICTIONS_DONE])
+    else:
+        pipeline.stage("predictions", saved_records(PREDICTED_LABELS_PATH, "prediction"), output=patients,
+                       final=[PREDICTIONS_DONE])
+
+    # 🔗 Join, then render
+    counts = {"reports": 0, "pdfs": 0, "skipped": 0}
+    join = join_patients(pipeline.buffer("join reports waiting"), pipeline.buffer("join predictions held"), counts)
+    pipeline.stage("join", join, input=patients, output=ready)
+    pipeline.stage("report", report_stage(args, created, store, counts), input=ready, processes=args.report_workers)
+
+    try:
+        pipeline.run()
+    finally:
+        if finish_predict is not None:
+            finish_predict()
+        store.close()
+        pipeline.print_summary()
+
+    # ✅ Every report that reached the join has its own PDF
+    skipped = f" ({counts['skipped']} already there, --resume)" if counts["skipped"] else ""
+    if counts["pdfs"] == counts["reports"]:
+        print(f"✅ {counts['reports']} reports in, {counts['pdfs']} PDFs out{skipped}")
+    else:
+        print(f"❌ {counts['reports']} reports in but {counts['pdfs']} PDFs out{skipped}: some reports were not rendered or overwrote each other")
+
+
+if __name__ == "__main__":
+    main()
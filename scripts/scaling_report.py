@@ -0,0 +1,74 @@
+# 📦 Required Imports
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+# 📂 Run from the project root so the training script finds data/ and model/
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 📄 Where the report is written
+REPORT_PATH = "outputs/scaling_report.json"
+
+# 🔢 Process counts to compare
+WORKER_COUNTS = (1, 2, 4, 8)
+
+
+# 🏃 One short training run under torchrun; returns the last epoch's metrics
+def run_training(processes, args, work_dir):
+    metrics_path = os.path.join(work_dir, f"metrics_{processes}.json")
+    command = [
+        sys.executable, "-m", "torch.distributed.run", "--standalone", f"--nproc-per-node={processes}",
+        "scripts/train_model.py",
+        "--epochs", str(args.epochs),
+        "--max-steps", str(args.max_steps),
+        "--batch-size", str(args.batch_size),
+        "--checkpoint-dir", os.path.join(work_dir, f"checkpoints_{processes}"),
+        "--output", os.path.join(work_dir, f"classifier_{processes}.pt"),
+        "--metrics-file", metrics_path,
+    ] + (["--packed"] if args.packed else []) + (["--fast"] if args.fast else [])
+    print(f"\n🚀 {processes} process(es): {' '.join(command[2:])}")
+    subprocess.run(command, cwd=PROJECT_ROOT, check=True)
+    with open(metrics_path, "r") as f:
+        return json.load(f)[-1]  # later epochs are past the warm-up
+
+
+# 📊 Throughput and efficiency relative to the single-process run
+def print_report(results):
+    baseline = results[0]["samples_per_sec"] / results[0]["world_size"]
+    print(f"\n📊 Scaling report (batch {results[0]['batch_size']} per process)")
+    print(f"{'Processes':>10}{'samples/sec':>14}{'speedup':>10}{'efficiency':>12}")
+    for result in results:
+        speedup = result["samples_per_sec"] / baseline
+        result["speedup"] = speedup
+        result["efficiency"] = speedup / result["world_size"]
+        print(f"{result['world_size']:>10}{result['samples_per_sec']:>14.1f}{speedup:>9.2f}x{result['efficiency']:>11.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure distributed training throughput for several process counts.")
+    parser.add_argument("--processes", default=",".join(map(str, WORKER_COUNTS)), help="Comma-separated process counts")
+    parser.add_argument("--epochs", type=int, default=2)
+    parser.add_argument("--max-steps", type=int, default=30, help="Batches per process per epoch")
+    parser.add_argument("--batch-size", type=int, default=16, help="Per process; the global batch grows with the process count")
+    parser.add_argument("--packed", action="store_true")
+    parser.add_argument("--fast", action="store_true")
+    parser.add_argument("--output", default=REPORT_PATH)
+    args = parser.parse_args()
+
+    counts = sorted(int(count) for count in args.processes.split(","))
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = [run_training(count, args, work_dir) for count in counts]
+
+    print_report(results)
+    output = os.path.join(PROJECT_ROOT, args.output)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,36 @@
 # 📦 Required imports
 import os
+import sys
+import time
+import random
+import argparse
+import json
+import numpy as np
 import torch
+import torch.distributed as dist
 import torch.nn as nn
 import torch.optim as optim
 from torchvision import datasets, transforms, models
-from torch.utils.data import DataLoader, random_split
+from torch.nn.parallel import DistributedDataParallel
+from torch.utils.data import DataLoader, RandomSampler, Subset, random_split
+from torch.utils.data.distributed import DistributedSampler
 from tqdm import tqdm  # for progress bar!
 
+# 📂 Make the project root importable (scripts are run as python scripts/<name>.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.packed_dataset import PackedImageDataset, ensure_pack
+from utils.preprocessing import normalize_batch
+
 # 📂 Dataset path
 DATA_DIR = "data/classificationdata/timri/train"
 
+# 💾 Rolling checkpoint (last.pt) and best-so-far checkpoint (best.pt)
+CHECKPOINT_DIR = "model/checkpoints"
+
+# 🧠 Where the best weights end up
+MODEL_PATH = "model/classifier.pt"
+
 # 🧪 Image transformations
 transform = transforms.Compose([
     transforms.Resize((224, 224)),
@@ -19,67 +40,367 @@ transform = transforms.Compose([
                          [0.229, 0.224, 0.225])
 ])
 
-# 🗂️ Load the dataset
-full_dataset = datasets.ImageFolder(DATA_DIR, transform=transform)
-print(f"✅ Dataset loaded. Total samples: {len(full_dataset)}")
+# 🗂️ Load the dataset (packed: decoded once into a memory-mapped file, re-packed when the folder changes)
+def load_dataset(packed=False):
+    if not packed:
+        return datasets.ImageFolder(DATA_DIR, transform=transform)
+    pack_dir, rebuilt = ensure_pack(DATA_DIR)
+    print(f"{'📦 Packed' if rebuilt else '♻️ Reusing packed'} dataset in {pack_dir}")
+    return PackedImageDataset(pack_dir)
+
+# 🧮 Packed batches arrive as uint8 luminance and are normalized here in one go
+def prepare_images(images, channels_last=False):
+    images = normalize_batch(images) if images.dtype == torch.uint8 else images
+    return images.contiguous(memory_format=torch.channels_last) if channels_last else images
 
-# 🔀 Split into training and validation sets
-train_size = int(0.8 * len(full_dataset))
-val_size = len(full_dataset) - train_size
-train_dataset, val_dataset = random_split(full_dataset, [train_size, val_size])
-print(f"✅ Train size: {len(train_dataset)}, Validation size: {len(val_dataset)}")
+# ⚙️ Command line options; --fast fills in throughput-oriented defaults for many-core CPUs
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the ResNet50 tumor classifier.")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=None, help="Default 16 (64 with --fast)")
+    parser.add_argument("--packed", action="store_true", help="Train from a pre-decoded memory-mapped copy of the dataset")
+    parser.add_argument("--fast", action="store_true", help="High-throughput CPU mode (workers, channels_last, bf16, thread tuning)")
+    parser.add_argument("--device", choices=["auto", "cpu", "mps", "cuda"], default="auto")
+    parser.add_argument("--workers", type=int, default=None, help="DataLoader workers (default 0, or a quarter of the cores with --fast)")
+    parser.add_argument("--prefetch-factor", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=None, help="Intra-op threads (default: cores left over after workers with --fast)")
+    parser.add_argument("--interop-threads", type=int, default=None)
+    parser.add_argument("--channels-last", action=argparse.BooleanOptionalAction, default=None)
+    parser.add_argument("--bf16", action=argparse.BooleanOptionalAction, default=None, help="bf16 autocast on CPU")
+    parser.add_argument("--seed", type=int, default=0, help="Seeds the split, shuffling and weight init")
+    parser.add_argument("--checkpoint-dir", default=CHECKPOINT_DIR)
+    parser.add_argument("--checkpoint-every", type=int, default=1, help="Save last.pt every N epochs")
+    parser.add_argument("--resume", action="store_true", help="Continue from <checkpoint-dir>/last.pt (read by rank 0 and sent to the others)")
+    parser.add_argument("--patience", type=int, default=None, help="Stop after N epochs without validation improvement")
+    parser.add_argument("--min-delta", type=float, default=0.0, help="Accuracy gain (in %%) that counts as an improvement")
+    parser.add_argument("--output", default=MODEL_PATH, help="Where the best model is saved")
+    parser.add_argument("--max-steps", type=int, default=None, help="Stop each epoch after N batches (benchmarking)")
+    parser.add_argument("--metrics-file", default=None, help="Write per-epoch throughput and accuracy as JSON")
+    args = parser.parse_args()
 
-# 🏋️ DataLoaders
-batch_size = 16  # 🔥 Now batch size is 16 for better performance on MacBook Air
-train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True, num_workers=0)
-val_loader = DataLoader(val_dataset, batch_size=batch_size, shuffle=False, num_workers=0)
+    # Under torchrun every process on a host gets an equal share of its cores
+    local_world_size = int(os.environ.get("LOCAL_WORLD_SIZE", 1))
+    cores = max(1, (os.cpu_count() or 1) // local_world_size)
+    if args.batch_size is None:
+        args.batch_size = 64 if args.fast else 16  # 🔥 16 for better performance on MacBook Air
+    if args.workers is None:
+        args.workers = max(2, cores // 4) if args.fast else 0
+    if args.threads is None and (args.fast or local_world_size > 1):
+        args.threads = max(1, cores - args.workers)
+    if args.channels_last is None:
+        args.channels_last = args.fast
+    if args.bf16 is None:
+        args.bf16 = args.fast
+    return args
 
-# 🧠 Model definition
-model = models.resnet50(weights=None)
-model.fc = nn.Linear(model.fc.in_features, 4)  # 4 classes: glioma, meningioma, no_tumor, pituitary
-device = torch.device("mps" if torch.backends.mps.is_available() else "cpu")  # 🔥 Use M1 GPU if available
-model = model.to(device)
+# 🖥️ Pick the training device
+def select_device(choice):
+    if choice != "auto":
+        return torch.device(choice)
+    if torch.cuda.is_available():
+        return torch.device("cuda")
+    return torch.device("mps" if torch.backends.mps.is_available() else "cpu")  # 🔥 Use M1 GPU if available
 
-# ⚙️ Loss and optimizer
-criterion = nn.CrossEntropyLoss()
-optimizer = optim.Adam(model.parameters(), lr=0.0001)
+# 🌐 Join the process group when launched by torchrun; returns (rank, local_rank, world_size)
+def init_distributed():
+    world_size = int(os.environ.get("WORLD_SIZE", 1))
+    if world_size == 1:
+        return 0, 0, 1
+    dist.init_process_group(backend="gloo")  # gloo: CPU collectives, works within and across hosts
+    return dist.get_rank(), int(os.environ.get("LOCAL_RANK", 0)), world_size
 
-# 🔥 Training loop
-EPOCHS = 5
+# ➕ Combine numbers across processes ("sum" or "max"); unchanged in a single-process run
+def all_reduce(values, op="sum"):
+    if not dist.is_initialized():
+        return list(values)
+    tensor = torch.tensor(values, dtype=torch.float64)
+    dist.all_reduce(tensor, op=dist.ReduceOp.SUM if op == "sum" else dist.ReduceOp.MAX)
+    return tensor.tolist()
 
-for epoch in range(EPOCHS):
+# 📡 Give every process rank 0's BatchNorm statistics, so validation scores the model rank 0 saves
+def sync_buffers(model):
+    if dist.is_initialized():
+        for buffer in model.buffers():
+            dist.broadcast(buffer, src=0)
+
+# 🏋️ DataLoader with parallel, persistent, prefetching workers when requested.
+# The order comes from the sampler; the loader's own generator only seeds the workers, and persistent workers draw
+# that seed once per process, so it is kept apart from the shuffle (a resumed run draws it in a different epoch)
+def make_loader(dataset, batch_size, workers, prefetch_factor, seed, sampler=None):
+    kwargs = {}
+    if workers > 0:
+        kwargs.update(persistent_workers=True, prefetch_factor=prefetch_factor)
+    return DataLoader(dataset, batch_size=batch_size, sampler=sampler, num_workers=workers,
+                      generator=torch.Generator().manual_seed(seed), **kwargs)
+
+# 🔥 One training epoch; returns loss and per-phase timings
+def train_one_epoch(model, loader, criterion, optimizer, device, autocast, channels_last, desc, max_steps=None, progress=True):
     model.train()
     running_loss = 0.0
+    samples = steps = 0
+    data_seconds = compute_seconds = 0.0
 
-    print(f"\n🔵 Epoch {epoch+1}/{EPOCHS}")
-
-    for images, labels in tqdm(train_loader, desc=f"Training Epoch {epoch+1}"):
-        images, labels = images.to(device), labels.to(device)
+    tick = time.perf_counter()
+    for images, labels in tqdm(loader, desc=desc, disable=not progress):
+        if max_steps is not None and steps >= max_steps:
+            break
+        images, labels = prepare_images(images, channels_last).to(device), labels.to(device)
+        loaded = time.perf_counter()
+        data_seconds += loaded - tick
 
         optimizer.zero_grad()
-        outputs = model(images)
-        loss = criterion(outputs, labels)
+        with autocast():
+            outputs = model(images)
+            loss = criterion(outputs, labels)
         loss.backward()
         optimizer.step()
 
         running_loss += loss.item()
+        samples += labels.size(0)
+        steps += 1
+        tick = time.perf_counter()
+        compute_seconds += tick - loaded
 
-    # 🔍 Validation
+    return {
+        "loss": running_loss / max(steps, 1),
+        "samples": samples,
+        "data_seconds": data_seconds,
+        "compute_seconds": compute_seconds,
+    }
+
+# 🎲 Seed every RNG the loop touches, per epoch, so a resumed run replays the same shuffles
+def seed_everything(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+# 🎲 Snapshot of all RNG states
+def rng_state():
+    state = {"python": random.getstate(), "numpy": np.random.get_state(), "torch": torch.get_rng_state()}
+    if torch.cuda.is_available():
+        state["cuda"] = torch.cuda.get_rng_state_all()
+    return state
+
+def set_rng_state(state):
+    random.setstate(state["python"])
+    np.random.set_state(state["numpy"])
+    torch.set_rng_state(state["torch"])
+    if "cuda" in state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state["cuda"])
+
+# 📡 Rank 0's last.pt in every process (None when there is none), so hosts without a shared --checkpoint-dir resume too
+def load_resume_checkpoint(path, rank):
+    checkpoint = None
+    if rank == 0 and os.path.exists(path):
+        checkpoint = torch.load(path, map_location="cpu", weights_only=False)
+    if dist.is_initialized():
+        shared = [checkpoint]
+        dist.broadcast_object_list(shared, src=0)
+        checkpoint = shared[0]
+    return checkpoint
+
+# 💾 Write a checkpoint atomically (an interrupted save never corrupts the previous one)
+def save_checkpoint(state, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    torch.save(state, tmp_path)
+    os.replace(tmp_path, path)
+
+# 🧱 Model weights in the default memory layout, ready for model/classifier.pt
+def portable_state_dict(model):
+    return {key: value.contiguous() for key, value in model.state_dict().items()}
+
+# 🔍 Validation accuracy
+def evaluate(model, loader, device, autocast, channels_last):
     model.eval()
     correct = 0
     total = 0
-    with torch.no_grad():
-        for images, labels in val_loader:
-            images, labels = images.to(device), labels.to(device)
+    with torch.no_grad(), autocast():
+        for images, labels in loader:
+            images, labels = prepare_images(images, channels_last).to(device), labels.to(device)
             outputs = model(images)
             _, predicted = torch.max(outputs.data, 1)
             total += labels.size(0)
             correct += (predicted == labels).sum().item()
+    return correct, total
+
+def main():
+    args = parse_args()
+    rank, local_rank, world_size = init_distributed()
+    distributed = world_size > 1
+    log = print if rank == 0 else (lambda *_, **__: None)  # only rank 0 talks
+
+    # 🧵 Thread controls (interop threads must be set before any parallel work starts)
+    if args.interop_threads:
+        torch.set_num_interop_threads(args.interop_threads)
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    log(f"⚙️ processes={world_size} threads={torch.get_num_threads()} workers={args.workers} batch={args.batch_size} "
+        f"channels_last={args.channels_last} bf16={args.bf16}")
+
+    last_path = os.path.join(args.checkpoint_dir, "last.pt")
+    best_path = os.path.join(args.checkpoint_dir, "best.pt")
+    checkpoint = None
+    if args.resume:
+        checkpoint = load_resume_checkpoint(last_path, rank)
+        if checkpoint is None:
+            sys.exit(f"❌ No checkpoint to resume from at {last_path}" + (" on rank 0" if distributed else ""))
+        log(f"🔁 Resuming from {last_path} (after epoch {checkpoint['epoch']})")
+        current = {"batch_size": args.batch_size, "seed": args.seed, "packed": args.packed, "world_size": world_size}
+        for key, value in current.items():
+            if checkpoint["args"].get(key, 1 if key == "world_size" else None) != value:
+                log(f"⚠️ {key.replace('_', ' ')} differs from the checkpoint; the run will not replay bit-for-bit")
+
+    # 📦 One process per host builds the pack; the others wait and then map it
+    if distributed and local_rank != 0:
+        dist.barrier()
+    full_dataset = load_dataset(args.packed)
+    if distributed and local_rank == 0:
+        dist.barrier()
+    log(f"✅ Dataset loaded. Total samples: {len(full_dataset)}")
+
+    # 🔀 Split into training and validation sets (a resumed run reuses the saved split)
+    if checkpoint is not None:
+        train_dataset = Subset(full_dataset, checkpoint["train_indices"])
+        val_dataset = Subset(full_dataset, checkpoint["val_indices"])
+    else:
+        train_size = int(0.8 * len(full_dataset))
+        val_size = len(full_dataset) - train_size
+        split_generator = torch.Generator().manual_seed(args.seed)
+        train_dataset, val_dataset = random_split(full_dataset, [train_size, val_size], generator=split_generator)
+    log(f"✅ Train size: {len(train_dataset)}, Validation size: {len(val_dataset)}")
+
+    # 🏋️ DataLoaders (the shuffle generator is re-seeded every epoch)
+    shuffle_generator = torch.Generator()
+    if distributed:
+        # Each process trains on its own shard and validates every world_size-th sample, so nothing is counted twice
+        train_sampler = DistributedSampler(train_dataset, num_replicas=world_size, rank=rank, shuffle=True, seed=args.seed)
+        val_shard = Subset(val_dataset, range(rank, len(val_dataset), world_size))
+    else:
+        train_sampler = None
+        val_shard = val_dataset
+    shuffle_sampler = train_sampler or RandomSampler(train_dataset, generator=shuffle_generator)
+    train_loader = make_loader(train_dataset, args.batch_size, args.workers, args.prefetch_factor, args.seed + rank, shuffle_sampler)
+    val_loader = make_loader(val_shard, args.batch_size, args.workers, args.prefetch_factor, args.seed + rank)
+
+    # 🧠 Model definition
+    seed_everything(args.seed)
+    model = models.resnet50(weights=None)
+    model.fc = nn.Linear(model.fc.in_features, 4)  # 4 classes: glioma, meningioma, no_tumor, pituitary
+    device = torch.device("cpu") if distributed else select_device(args.device)
+    model = model.to(device)
+    if args.channels_last:
+        model = model.to(memory_format=torch.channels_last)
+
+    # 🧮 bf16 autocast only applies on CPU; elsewhere it is a no-op context
+    use_bf16 = args.bf16 and device.type == "cpu"
+    autocast = lambda: torch.autocast(device_type="cpu", dtype=torch.bfloat16, enabled=use_bf16)
+
+    # ⚙️ Loss and optimizer
+    criterion = nn.CrossEntropyLoss()
+    optimizer = optim.Adam(model.parameters(), lr=0.0001)
+
+    # 🔁 Restore training state
+    start_epoch = 0
+    best_accuracy = None
+    stale_epochs = 0
+    if checkpoint is not None:
+        model.load_state_dict(checkpoint["model"])
+        optimizer.load_state_dict(checkpoint["optimizer"])
+        set_rng_state(checkpoint["rng"])
+        start_epoch = checkpoint["epoch"]
+        best_accuracy = checkpoint["best_accuracy"]
+        stale_epochs = checkpoint["stale_epochs"]
+
+    # 🌐 DDP averages gradients across processes every step; checkpoints keep the plain model's weights
+    train_model = DistributedDataParallel(model) if distributed else model
+
+    # 🔥 Training loop
+    EPOCHS = args.epochs
+    metrics = []
+
+    for epoch in range(start_epoch, EPOCHS):
+        log(f"\n🔵 Epoch {epoch+1}/{EPOCHS}")
+        seed_everything(args.seed + epoch)
+        shuffle_generator.manual_seed(args.seed + epoch)
+        if train_sampler is not None:
+            train_sampler.set_epoch(epoch)
+
+        epoch_start = time.perf_counter()
+        stats = train_one_epoch(train_model, train_loader, criterion, optimizer, device, autocast, args.channels_last,
+                                f"Training Epoch {epoch+1}", args.max_steps, progress=rank == 0)
+        train_seconds = time.perf_counter() - epoch_start
+
+        val_start = time.perf_counter()
+        sync_buffers(model)
+        correct, total = evaluate(model, val_loader, device, autocast, args.channels_last)
+        val_seconds = time.perf_counter() - val_start
+
+        # 📡 Totals over all processes; an epoch lasts as long as its slowest process
+        loss_sum, samples, correct, total = all_reduce([stats["loss"], stats["samples"], correct, total])
+        train_seconds, val_seconds, data_seconds, compute_seconds = all_reduce(
+            [train_seconds, val_seconds, stats["data_seconds"], stats["compute_seconds"]], op="max")
+        loss = loss_sum / world_size
+        accuracy = 100 * correct / total
+
+        log(f"✅ Epoch {epoch+1} Completed - Loss: {loss:.4f} - Validation Accuracy: {accuracy:.2f}%")
+        log(f"⏱️ {samples / train_seconds:.1f} samples/sec - train {train_seconds:.1f}s "
+            f"(data wait {data_seconds:.1f}s, compute {compute_seconds:.1f}s) - validation {val_seconds:.1f}s")
+        metrics.append({
+            "epoch": epoch + 1,
+            "world_size": world_size,
+            "batch_size": args.batch_size,
+            "samples": int(samples),
+            "train_seconds": train_seconds,
+            "samples_per_sec": samples / train_seconds,
+            "val_seconds": val_seconds,
+            "loss": loss,
+            "accuracy": accuracy,
+        })
+        if args.metrics_file and rank == 0:
+            os.makedirs(os.path.dirname(args.metrics_file) or ".", exist_ok=True)
+            with open(args.metrics_file, "w") as f:
+                json.dump(metrics, f, indent=2)
+
+        # 🏆 Keep only the best checkpoint (every process sees the same accuracy, so they all agree)
+        if best_accuracy is None or accuracy > best_accuracy + args.min_delta:
+            best_accuracy = accuracy
+            stale_epochs = 0
+            if rank == 0:
+                save_checkpoint({"epoch": epoch + 1, "accuracy": accuracy, "model": portable_state_dict(model)}, best_path)
+            log(f"🏆 New best validation accuracy {accuracy:.2f}% saved to {best_path}")
+        else:
+            stale_epochs += 1
+
+        stop_early = args.patience is not None and stale_epochs >= args.patience
+
+        # 💾 Periodic checkpoint with everything needed to continue bit-for-bit
+        if rank == 0 and ((epoch + 1) % args.checkpoint_every == 0 or epoch + 1 == EPOCHS or stop_early):
+            save_checkpoint({
+                "epoch": epoch + 1,
+                "model": model.state_dict(),
+                "optimizer": optimizer.state_dict(),
+                "rng": rng_state(),
+                "train_indices": list(train_dataset.indices),
+                "val_indices": list(val_dataset.indices),
+                "best_accuracy": best_accuracy,
+                "stale_epochs": stale_epochs,
+                "args": {"batch_size": args.batch_size, "seed": args.seed, "packed": args.packed, "world_size": world_size},
+            }, last_path)
 
-    print(f"✅ Epoch {epoch+1} Completed - Loss: {running_loss/len(train_loader):.4f} - Validation Accuracy: {100 * correct / total:.2f}%")
+        if stop_early:
+            log(f"🛑 Early stopping: no improvement for {stale_epochs} epochs")
+            break
 
-# 💾 Save the model
-os.makedirs("model", exist_ok=True)
-torch.save(model.state_dict(), "model/classifier.pt")
-print("\n✅ Model saved to model/classifier.pt")
+    # 💾 Save the best model
+    if rank == 0:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        best = torch.load(best_path, map_location="cpu")
+        torch.save(best["model"], args.output)
+        print(f"\n✅ Model from epoch {best['epoch']} ({best['accuracy']:.2f}% validation accuracy) saved to {args.output}")
+    if distributed:
+        dist.barrier()
+        dist.destroy_process_group()
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# 🧰 Shared helpers used by app.py and the scripts/ folder
@@ -0,0 +1,64 @@
+# ⚙️ Execution backends; every one maps a (N, 3, 224, 224) float tensor to (N, 4) logits.
+# torch is imported by the loaders, so scripts can offer these names without importing it
+BACKENDS = ("eager", "torchscript", "onnx")
+
+# 📁 fp32 model name -> exported files written by scripts/export_model.py
+EXPORT_PATHS = {
+    "resnet50": {
+        "torchscript": "model/classifier.torchscript.pt",
+        "onnx": "model/classifier.onnx",
+    },
+    "efficientnet_b0": {
+        "torchscript": "model/efficientnetb0_classifier.torchscript.pt",
+        "onnx": "model/efficientnetb0_classifier.onnx",
+    },
+}
+
+
+# 🏷️ Registry name for a model on a backend (eager keeps the plain name)
+def model_name_for(name, backend="eager"):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unsupported backend: {backend}. Choose one of {BACKENDS}.")
+    return name if backend == "eager" else f"{name}_{backend}"
+
+
+# 🔄 TorchScript loader
+def load_torchscript(path):
+    import torch
+
+    model = torch.jit.load(path, map_location="cpu")
+    model.eval()
+    return model
+
+
+# 🧩 ONNX Runtime session wrapped to behave like a torch model
+class OnnxModel:
+    def __init__(self, path):
+        import onnxruntime as ort  # optional dependency, only needed for the onnx backend
+        import torch
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = torch.get_num_threads()  # torch.set_num_threads sizes every backend
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, images):
+        import torch
+
+        logits = self.session.run(None, {self.input_name: images.detach().cpu().contiguous().numpy()})[0]
+        return torch.from_numpy(logits)
+
+    def eval(self):
+        return self
+
+    def to(self, device):
+        return self
+
+
+# 🔄 ONNX loader
+def load_onnx(path):
+    return OnnxModel(path)
+
+
+LOADERS = {"torchscript": load_torchscript, "onnx": load_onnx}
@@ -0,0 +1,131 @@
+# 📦 Required Imports
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import torch
+
+from utils.stats import percentile
+
+
+# 📨 One queued request
+class _Request:
+    __slots__ = ("tensor", "future", "enqueued_at")
+
+    def __init__(self, tensor):
+        self.tensor = tensor
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+# 🚦 Gathers single-image requests into one forward pass
+class MicroBatcher:
+    def __init__(self, get_entry, max_batch_size=8, max_wait_ms=10, latency_window=1000, prepare=None, metrics=None):
+        # get_entry() returns a registry LoadedModel and is called once per batch,
+        # so hot-swapped checkpoints are picked up between batches
+        self.get_entry = get_entry
+        # prepare(stacked) runs once per batch (e.g. normalization) before the forward pass
+        self.prepare = prepare
+        # metrics (a utils.metrics.StageMetrics) receives per-batch stage timings
+        self.metrics = metrics
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._latencies_ms = deque(maxlen=latency_window)
+        self._requests = 0
+        self._errors = 0
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    # 📥 Queue a (C, H, W) tensor; the future resolves to (softmax row, model version)
+    def submit(self, tensor):
+        request = _Request(tensor)
+        self._queue.put(request)
+        return request.future
+
+    # 🔍 Blocking helper used by request handlers; timings (a dict) receives this request's batch-side stage times
+    def predict(self, tensor, timeout=None, timings=None):
+        future = self.submit(tensor)
+        result = future.result(timeout=timeout)
+        if timings is not None:
+            timings.update(getattr(future, "timings", {}))
+        return result
+
+    # 🔁 Scheduler loop: wait for a first request, then collect more until the window closes
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._process(batch)
+
+    # 🧠 One stacked forward pass, then hand every caller its own slice
+    def _process(self, batch):
+        started = time.perf_counter()
+        try:
+            images = torch.stack([request.tensor for request in batch])
+            if self.prepare is not None:
+                images = self.prepare(images)
+            prepared = time.perf_counter()
+            entry = self.get_entry()
+            loaded = time.perf_counter()
+            with torch.no_grad():
+                logits = entry.model(images)
+                forwarded = time.perf_counter()
+                probabilities = torch.softmax(logits, dim=1)
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+            with self._lock:
+                self._errors += len(batch)
+            return
+
+        done = time.perf_counter()
+        timings = {
+            "normalize": prepared - started,
+            "model_load": loaded - prepared,
+            "forward": forwarded - loaded,
+            "softmax": done - forwarded,
+        }
+        if self.metrics is not None:
+            for stage, seconds in timings.items():
+                self.metrics.observe(stage, seconds)
+        for i, request in enumerate(batch):
+            queue_wait = started - request.enqueued_at
+            if self.metrics is not None:
+                self.metrics.observe("queue_wait", queue_wait)
+            # Read by predict() before the caller's thread wakes up
+            request.future.timings = {"queue_wait": queue_wait, **timings, "batch_size": len(batch)}
+            request.future.set_result((probabilities[i], entry.version))
+        with self._lock:
+            self._batch_sizes[len(batch)] += 1
+            self._requests += len(batch)
+            self._latencies_ms.extend((done - request.enqueued_at) * 1000 for request in batch)
+
+    # 📊 Queue depth, batch-size histogram and latency percentiles
+    def stats(self):
+        with self._lock:
+            latencies = list(self._latencies_ms)
+            histogram = dict(sorted(self._batch_sizes.items()))
+            requests, errors = self._requests, self._errors
+        p50, p99 = percentile(latencies, 50), percentile(latencies, 99)
+        return {
+            "queue_depth": self._queue.qsize(),
+            "requests": requests,
+            "errors": errors,
+            "batches": sum(histogram.values()),
+            "batch_size_histogram": histogram,
+            "latency_p50_ms": round(p50, 2) if p50 is not None else None,
+            "latency_p99_ms": round(p99, 2) if p99 is not None else None,
+        }
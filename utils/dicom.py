@@ -0,0 +1,163 @@
+# 📦 Required Imports
+import os
+from collections.abc import Sequence
+
+import numpy as np
+
+# 📁 DICOM study folder (series folders SE*/ with one file per slice)
+DICOM_DIR = "data/brain-mri/ST000001"
+
+# 🏷️ Header tags the index reads; reading stops before the pixel data
+HEADER_TAGS = [
+    "PatientID", "StudyInstanceUID", "SeriesInstanceUID", "SeriesNumber", "SeriesDescription", "InstanceNumber",
+    "Modality", "Rows", "Columns", "NumberOfFrames", "PhotometricInterpretation",
+    "WindowCenter", "WindowWidth", "RescaleSlope", "RescaleIntercept",
+]
+
+
+# 🧾 Header of one slice: enough to pick, order and normalize it without decoding pixels
+class DicomSlice:
+    def __init__(self, path, patient_id, study_uid, series_uid, series_number, instance_number, description,
+                 rows, columns, frames, photometric, window):
+        self.path = path
+        self.patient_id = patient_id
+        self.study_uid = study_uid
+        self.series_uid = series_uid
+        self.series_number = series_number
+        self.instance_number = instance_number
+        self.description = description
+        self.rows = rows
+        self.columns = columns
+        self.frames = frames
+        self.photometric = photometric
+        self.window = window  # (center, width), or None when the header has no VOI window
+
+
+# 🔢 First value of a possibly multi-valued header element
+def _first(value, default=None):
+    if value is None or value == "":
+        return default
+    if isinstance(value, Sequence) and not isinstance(value, str):  # pydicom's MultiValue
+        return value[0] if len(value) else default
+    return value
+
+
+# 🪟 (center, width) of the header's first VOI window, or None
+def _window(ds):
+    center, width = _first(ds.get("WindowCenter")), _first(ds.get("WindowWidth"))
+    return (float(center), float(width)) if center is not None and width is not None else None
+
+
+# 🔍 Candidate slice files: *.dcm and the extensionless IM000001-style names scanners write
+def _candidate_files(root):
+    for folder, _, files in os.walk(root):
+        for name in sorted(files):
+            extension = os.path.splitext(name)[1].lower()
+            if extension in (".dcm", ".dicom", ""):
+                yield os.path.join(folder, name)
+
+
+# 📖 Header of one file (no pixel data is read), or None when it is not DICOM
+def read_header(path):
+    import pydicom  # optional dependency, only needed for DICOM input
+    from pydicom.errors import InvalidDicomError
+
+    try:
+        ds = pydicom.dcmread(path, stop_before_pixels=True, specific_tags=HEADER_TAGS)
+    except (InvalidDicomError, OSError):
+        return None
+    if "Rows" not in ds:
+        return None  # e.g. a structured report: no image
+    return DicomSlice(
+        path=path,
+        patient_id=str(ds.get("PatientID", "")),
+        study_uid=str(ds.get("StudyInstanceUID", "")),
+        series_uid=str(ds.get("SeriesInstanceUID", os.path.dirname(path))),
+        series_number=int(_first(ds.get("SeriesNumber"), 0)),
+        instance_number=int(_first(ds.get("InstanceNumber"), 0)),
+        description=str(ds.get("SeriesDescription", "")),
+        rows=int(ds.Rows),
+        columns=int(ds.Columns),
+        frames=int(_first(ds.get("NumberOfFrames"), 1)),
+        photometric=str(ds.get("PhotometricInterpretation", "MONOCHROME2")),
+        window=_window(ds),
+    )
+
+
+# 🗂️ Header-only index of every image slice under root, ordered by study, series and instance number.
+# One entry per file: a multi-frame file (an enhanced MR volume) stays one slice and is scored on its first frame
+def index_dicom(root=DICOM_DIR):
+    slices = [header for header in map(read_header, _candidate_files(root)) if header is not None]
+    slices.sort(key=lambda s: (s.study_uid, s.series_number, s.series_uid, s.instance_number, s.path))
+    multi_frame = sum(1 for dicom_slice in slices if dicom_slice.frames > 1)
+    if multi_frame:
+        print(f"⚠️ {multi_frame} multi-frame DICOM files under {root}: only the first frame of each is scored")
+    return slices
+
+
+# 📚 Slices grouped per series, in index order: {series_uid: [slices]}
+def group_series(slices):
+    series = {}
+    for dicom_slice in slices:
+        series.setdefault(dicom_slice.series_uid, []).append(dicom_slice)
+    return series
+
+
+# 🎯 Stratified sample of a series: `count` equal runs of consecutive slices, the middle slice of each,
+# so the sample spans the whole volume in order (every slice when count is None or covers the series)
+def stratified_sample(slices, count=None):
+    if count is not None and count < 1:
+        raise ValueError(f"Sample size must be at least 1, got {count}")
+    if count is None or count >= len(slices):
+        return list(slices)
+    return [slices[int((stratum + 0.5) * len(slices) / count)] for stratum in range(count)]
+
+
+# 🩻 Slice files to score, chosen from the header index alone: the first slice of every series (what
+# move_all_first_jpgs.py used to export as JPEG), or every slice
+def dicom_inputs(root=DICOM_DIR, all_slices=False):
+    slices = index_dicom(root)
+    if all_slices:
+        return [dicom_slice.path for dicom_slice in slices]
+    return [series_slices[0].path for series_slices in group_series(slices).values()]
+
+
+# 🏷️ Id of a slice: "<series folder>_<file stem>", the name move_all_first_jpgs.py gave its JPEG copy
+def slice_id(path):
+    return f"{os.path.basename(os.path.dirname(path))}_{os.path.splitext(os.path.basename(path))[0]}"
+
+
+# 🪟 Window/level to 8 bits with the DICOM linear VOI function (PS3.3 C.11.2.1.2);
+# without a window the slice's own value range is used
+def window_level(values, window=None):
+    values = values.astype(np.float32, copy=False)
+    if window is None:
+        low, high = float(values.min()), float(values.max())
+        center, width = (low + high) / 2 + 0.5, max(high - low, 1.0) + 1
+    else:
+        center, width = window
+        width = max(width, 1.0)
+    scaled = ((values - (center - 0.5)) / (width - 1) + 0.5) * 255
+    return np.clip(scaled, 0, 255).round().astype(np.uint8)
+
+
+# 🖼️ Decode one slice's pixels (only now is the pixel data read) to uint8 luminance, shape (H, W).
+# Stored values go through the rescale (modality LUT) and then the header window. Multi-frame files give their first
+# frame only: the index has one entry per file, so the other frames of such a file are not scored
+def load_dicom_luminance(path):
+    import pydicom  # optional dependency, only needed for DICOM input
+
+    ds = pydicom.dcmread(path)
+    pixels = ds.pixel_array
+    if int(_first(ds.get("NumberOfFrames"), 1)) > 1:
+        pixels = pixels[0]
+    if pixels.ndim == 3:  # colour (pixel_array gives RGB): same ITU-R 601 weights as PIL's convert("L")
+        pixels = pixels[..., 0] * 0.299 + pixels[..., 1] * 0.587 + pixels[..., 2] * 0.114
+    slope = float(_first(ds.get("RescaleSlope"), 1.0))
+    intercept = float(_first(ds.get("RescaleIntercept"), 0.0))
+    values = pixels.astype(np.float32) * slope + intercept
+
+    luminance = window_level(values, _window(ds))
+    if ds.get("PhotometricInterpretation") == "MONOCHROME1":  # low values are white
+        luminance = 255 - luminance
+    return np.ascontiguousarray(luminance)
@@ -0,0 +1,133 @@
+# 📦 Required Imports
+import hashlib
+import json
+import os
+import sqlite3
+
+# 📁 Cache location
+CACHE_PATH = "outputs/extraction_cache.sqlite"
+
+
+# 🔑 Content hash of a file, read in chunks
+def hash_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# 🗄️ Extracted text and parsed fields of every PDF, keyed by file content hash.
+# files: path -> (size, mtime, hash), so unchanged files are not even re-read;
+# extractions: hash -> text + fields, so a moved or copied PDF is not parsed twice.
+class ExtractionCache:
+    def __init__(self, parser_version, path=CACHE_PATH, commit_every=100):
+        self.path = path
+        self.parser_version = str(parser_version)
+        self.commit_every = commit_every
+        self._pending = 0
+        self._counters = {"hits": 0, "extracted": 0, "reparsed": 0, "removed": 0, "failed": 0}
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "file_path TEXT PRIMARY KEY, size INTEGER, mtime REAL, content_hash TEXT)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS extractions ("
+            "content_hash TEXT PRIMARY KEY, engine TEXT, pages INTEGER, text TEXT, parser_version TEXT, fields TEXT)"
+        )
+        self._db.commit()
+
+    # 🧹 Forget PDFs that are no longer on disk (and extractions no remaining file points to); returns how many
+    def prune(self, existing_paths):
+        existing = set(existing_paths)
+        gone = [(path,) for (path,) in self._db.execute("SELECT file_path FROM files") if path not in existing]
+        self._db.executemany("DELETE FROM files WHERE file_path = ?", gone)
+        self._db.execute("DELETE FROM extractions WHERE content_hash NOT IN (SELECT content_hash FROM files)")
+        self._db.commit()
+        self._counters["removed"] += len(gone)
+        return len(gone)
+
+    def clear(self):
+        self._db.execute("DELETE FROM files")
+        self._db.execute("DELETE FROM extractions")
+        self._db.commit()
+
+    # 🔍 (state, content hash) of a PDF: "hit" = cached and current, "reparse" = text cached but parsed by
+    # another parser version, "extract" = never seen this content
+    def lookup(self, file_path):
+        stat = os.stat(file_path)
+        row = self._db.execute("SELECT size, mtime, content_hash FROM files WHERE file_path = ?", (file_path,)).fetchone()
+        if row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime:
+            content_hash = row[2]
+        else:
+            content_hash = hash_file(file_path)
+            self._db.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", (file_path, stat.st_size, stat.st_mtime, content_hash)
+            )
+            self._written()
+
+        row = self._db.execute("SELECT parser_version FROM extractions WHERE content_hash = ?", (content_hash,)).fetchone()
+        if row is None:
+            return "extract", content_hash
+        if row[0] != self.parser_version:
+            return "reparse", content_hash
+        self._counters["hits"] += 1
+        return "hit", content_hash
+
+    # 📄 Cached text of a content hash
+    def text(self, content_hash):
+        row = self._db.execute("SELECT text FROM extractions WHERE content_hash = ?", (content_hash,)).fetchone()
+        return row[0] if row is not None else None
+
+    # 🏷️ Cached fields of a PDF on disk, or None when it has no extraction
+    def fields(self, file_path):
+        row = self._db.execute(
+            "SELECT e.fields FROM files f JOIN extractions e ON e.content_hash = f.content_hash WHERE f.file_path = ?",
+            (file_path,),
+        ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    # 💾 Store a fresh extraction
+    def store(self, content_hash, engine, pages, text, fields):
+        self._db.execute(
+            "INSERT OR REPLACE INTO extractions VALUES (?, ?, ?, ?, ?, ?)",
+            (content_hash, engine, pages, text, self.parser_version, json.dumps(fields, ensure_ascii=False)),
+        )
+        self._counters["extracted"] += 1
+        self._written()
+
+    # 🔁 Replace the fields of cached text parsed again by the current parser
+    def update_fields(self, content_hash, fields):
+        self._db.execute(
+            "UPDATE extractions SET fields = ?, parser_version = ? WHERE content_hash = ?",
+            (json.dumps(fields, ensure_ascii=False), self.parser_version, content_hash),
+        )
+        self._counters["reparsed"] += 1
+        self._written()
+
+    # ⚠️ Count a PDF no engine could read (it is tried again next run)
+    def failed(self):
+        self._counters["failed"] += 1
+
+    # 💾 Commit in batches; an interrupted run keeps everything up to the last commit
+    def _written(self):
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self._db.commit()
+            self._pending = 0
+
+    # 📊 Hit/extract counters and cache size
+    def stats(self):
+        counters = dict(self._counters)
+        counters["entries"] = self._db.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+        lookups = counters["hits"] + counters["extracted"] + counters["reparsed"] + counters["failed"]
+        counters["hit_rate"] = round(counters["hits"] / lookups, 3) if lookups else None
+        return counters
+
+    # 💾 Flush pending writes
+    def close(self):
+        self._db.commit()
+        self._db.close()
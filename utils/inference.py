@@ -0,0 +1,149 @@
+# 📦 Required Imports
+import copy
+import os
+import weakref
+
+import torch
+from torch.utils.data import DataLoader, Dataset
+from torchvision import transforms
+
+from utils.dicom import load_dicom_luminance
+from utils.model_registry import CLASS_NAMES, MODEL_REGISTRY
+from utils.preprocessing import collate_luminance, load_luminance, normalize_batch
+
+# 🖼️ File types the predictors accept
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+# ⚙️ Defaults for batch scripts
+BATCH_SIZE = 32
+NUM_WORKERS = min(4, os.cpu_count() or 1)
+
+# 🧪 Reference PIL transformation (same as training); the predictors use utils/preprocessing.py
+transform = transforms.Compose([
+    transforms.Resize((224, 224)),
+    transforms.Grayscale(num_output_channels=3),
+    transforms.ToTensor(),
+    transforms.Normalize([0.485, 0.456, 0.406],
+                         [0.229, 0.224, 0.225])
+])
+
+
+# 📂 Sorted image paths in a folder
+def list_images(directory, extensions=IMAGE_EXTENSIONS):
+    return [
+        os.path.join(directory, name)
+        for name in sorted(os.listdir(directory))
+        if name.lower().endswith(extensions)
+    ]
+
+
+# 🗂️ Dataset over a list of image files, yielding (uint8 luminance, index); decoded inside DataLoader workers
+class ImagePathDataset(Dataset):
+    def __init__(self, paths):
+        self.paths = list(paths)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getitem__(self, idx):
+        return load_luminance(self.paths[idx]), idx
+
+
+# 🩻 Same over DICOM slice files: the pixel data is decoded (and windowed) only here, inside the workers
+class DicomDataset(ImagePathDataset):
+    def __getitem__(self, idx):
+        return torch.from_numpy(load_dicom_luminance(self.paths[idx])), idx
+
+
+# 🔄 Resident classifier from the shared registry ("resnet50" = model/classifier.pt)
+def load_classifier(name="resnet50"):
+    return MODEL_REGISTRY.get(name).model
+
+
+# 🖥️ Per-device copies of shared models: {model: {device: copy}}, dropped when the registry replaces the model
+_DEVICE_COPIES = weakref.WeakKeyDictionary()
+
+
+# 🖥️ The model on `device`. The registry's models are shared (and stay on the CPU), so other devices get a copy
+# instead of moving the shared one in place
+def model_on(model, device):
+    device = torch.device(device)
+    parameter = next(model.parameters(), None) if isinstance(model, torch.nn.Module) else None
+    if parameter is None or parameter.device == device:
+        return model  # already there, or not a torch module (e.g. an ONNX Runtime session)
+    copies = _DEVICE_COPIES.setdefault(model, {})
+    if str(device) not in copies:
+        copies[str(device)] = copy.deepcopy(model).to(device)
+    return copies[str(device)]
+
+
+# 🏋️ DataLoader that decodes in background workers while the model runs
+def make_loader(dataset, batch_size=BATCH_SIZE, num_workers=NUM_WORKERS, collate_fn=None):
+    kwargs = {}
+    if num_workers > 0:
+        kwargs.update(prefetch_factor=2, persistent_workers=False)
+    return DataLoader(dataset, batch_size=batch_size, shuffle=False, num_workers=num_workers, collate_fn=collate_fn, **kwargs)
+
+
+# 🏷️ (predicted_class, confidence) from a probability row
+def top_class(probabilities):
+    predicted_index = max(range(len(probabilities)), key=probabilities.__getitem__)
+    return CLASS_NAMES[predicted_index], probabilities[predicted_index]
+
+
+# 🔍 Batched softmax over a dataset yielding (uint8 luminance, index) pairs: yields (index, probabilities)
+def predict_probabilities(dataset, model, batch_size=BATCH_SIZE, num_workers=NUM_WORKERS, device="cpu"):
+    # Workers decode and resize whole batches; only the uint8 batch crosses the process boundary
+    loader = make_loader(dataset, batch_size=batch_size, num_workers=num_workers, collate_fn=collate_luminance)
+    model = model_on(model, device)
+    with torch.no_grad():
+        for images, indices in loader:
+            probabilities = torch.softmax(model(normalize_batch(images).to(device)), dim=1)
+            yield from zip(indices.tolist(), probabilities.tolist())
+
+
+# 🔍 Batched prediction over a dataset: yields (index, predicted_class, confidence)
+def predict_dataset(dataset, model, batch_size=BATCH_SIZE, num_workers=NUM_WORKERS, device="cpu"):
+    for idx, probabilities in predict_probabilities(dataset, model, batch_size, num_workers, device):
+        yield (idx, *top_class(probabilities))
+
+
+# 🔍 Batched prediction over image files (dataset_class=DicomDataset for DICOM slices): yields (path, predicted_class, confidence)
+def predict_images(paths, model, batch_size=BATCH_SIZE, num_workers=NUM_WORKERS, device="cpu", dataset_class=ImagePathDataset):
+    dataset = dataset_class(paths)
+    for idx, predicted_class, confidence in predict_dataset(dataset, model, batch_size, num_workers, device):
+        yield dataset.paths[idx], predicted_class, confidence
+
+
+# 🔍 Batched softmax over image files: yields (path, probabilities) in input order
+def image_probabilities(paths, model, batch_size=BATCH_SIZE, num_workers=NUM_WORKERS, device="cpu", dataset_class=ImagePathDataset):
+    dataset = dataset_class(paths)
+    for idx, probabilities in predict_probabilities(dataset, model, batch_size, num_workers, device):
+        yield dataset.paths[idx], probabilities
+
+
+# 🗄️ Like image_probabilities (input order, streamed), but files whose content was already scored by this checkpoint
+# come from the cache. A file is only read to hash it when its size or mtime changed since the last run
+def image_probabilities_cached(paths, model_name, cache, batch_size=BATCH_SIZE, num_workers=NUM_WORKERS, device="cpu",
+                               dataset_class=ImagePathDataset):
+    entry = MODEL_REGISTRY.get(model_name)
+    lookups = []
+    for path in paths:
+        image_hash = cache.file_hash(path)
+        lookups.append((path, image_hash, cache.get(model_name, entry.version, image_hash)))
+
+    misses = [path for path, _, probabilities in lookups if probabilities is None]
+    scored = predict_probabilities(dataset_class(misses), entry.model, batch_size, num_workers, device)
+    for path, image_hash, probabilities in lookups:
+        if probabilities is None:
+            _, probabilities = next(scored)  # misses come back in the order they were queued
+            cache.put(model_name, entry.version, image_hash, probabilities)
+        yield path, probabilities
+
+
+# 🗄️ Like predict_images, but files whose content was already scored by this checkpoint come from the cache
+def predict_images_cached(paths, model_name, cache, batch_size=BATCH_SIZE, num_workers=NUM_WORKERS, device="cpu",
+                          dataset_class=ImagePathDataset):
+    scored = image_probabilities_cached(paths, model_name, cache, batch_size, num_workers, device, dataset_class)
+    for path, probabilities in scored:
+        yield (path, *top_class(probabilities))
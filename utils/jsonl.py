@@ -0,0 +1,153 @@
+# 📦 Required Imports
+import json
+import os
+
+# 📄 Output formats: "json" = one array written at the end, "jsonl" = one record per line as it is produced
+FORMATS = ("json", "jsonl")
+
+# 💾 Records written between flushes to disk in JSONL mode
+FLUSH_EVERY = 50
+
+
+# 🔀 Same path with the extension of the chosen format (outputs/x.json <-> outputs/x.jsonl)
+def with_format(path, fmt):
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}. Choose one of {FORMATS}.")
+    return f"{os.path.splitext(path)[0]}.{fmt}"
+
+
+# 📖 Lazily iterate records from a .jsonl file, or from a legacy .json array
+def iter_records(path):
+    if not path.endswith(".jsonl"):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Only the last line can be cut short by an interrupted run
+                print(f"⚠️ Skipping unreadable line {line_number} in {path}")
+
+
+# 🔑 Values of one field across an existing output (used to resume interrupted runs)
+def read_keys(path, key):
+    if not os.path.exists(path):
+        return set()
+    return {record.get(key) for record in iter_records(path)}
+
+
+# 🧹 Rewrite a .jsonl file without the records whose `key` is in `dropped`; returns how many were dropped.
+# The kept records stream to a temporary file that replaces the original, so a crash leaves one of the two intact
+def drop_records(path, dropped, key="patient_id"):
+    dropped = set(dropped)
+    if not dropped or not os.path.exists(path):
+        return 0
+    temporary = f"{path}.tmp"
+    removed = 0
+    with open(temporary, "w", encoding="utf-8") as f:
+        for record in iter_records(path):
+            if record.get(key) in dropped:
+                removed += 1
+                continue
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+    return removed
+
+
+# ✂️ Drop a half-written last line so appended records start on a fresh line
+def _trim_partial_line(path):
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        position = size
+        while position > 0:
+            step = min(4096, position)
+            f.seek(position - step)
+            chunk = f.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                position = position - step + newline + 1
+                break
+            position -= step
+        if position != size:
+            f.truncate(position)
+
+
+# ✍️ Streaming writer: one JSON record per line, flushed to disk periodically
+class JsonlWriter:
+    def __init__(self, path, append=False, flush_every=FLUSH_EVERY):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if append and os.path.exists(path):
+            _trim_partial_line(path)
+        self.path = path
+        self.flush_every = flush_every
+        self.count = 0
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+
+    # ➕ Returns True when this write triggered a flush
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self.flush()
+            return True
+        return False
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ✍️ Legacy writer: collects records and dumps one JSON array on close
+class JsonArrayWriter:
+    def __init__(self, path, records=None, indent=2):
+        self.path = path
+        self.indent = indent
+        self.records = list(records or [])
+        self.count = 0
+
+    def write(self, record):
+        self.records.append(record)
+        self.count += 1
+        return False
+
+    def flush(self):
+        pass
+
+    def close(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.records, f, indent=self.indent, ensure_ascii=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# 📂 Writer for the chosen format; append keeps existing records (resume)
+def open_writer(path, fmt="json", append=False):
+    if fmt == "jsonl":
+        return JsonlWriter(with_format(path, "jsonl"), append=append)
+    path = with_format(path, "json")
+    records = list(iter_records(path)) if append and os.path.exists(path) else []
+    return JsonArrayWriter(path, records)
@@ -0,0 +1,57 @@
+# 📦 Required Imports
+import json
+import os
+
+
+# 📋 Record of which files were scored, as they were on disk, by which model version.
+# settings (e.g. input folder and output format) describe the run the entries belong to: a manifest saved with
+# other settings (or by an older version) is not reused, and settings_changed tells the caller to rebuild
+class ScoreManifest:
+    def __init__(self, path, settings=None):
+        self.path = path
+        self.settings = dict(settings or {})
+        self.entries = {}
+        self.settings_changed = False
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                saved = json.load(f)
+            if saved.get("settings") == self.settings:
+                self.entries = saved["entries"]
+            else:
+                self.settings_changed = True
+
+    # 📏 Size and mtime identify a file version without reading it
+    @staticmethod
+    def _signature(file_path):
+        stat = os.stat(file_path)
+        return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    # ✅ True when the file is unchanged since it was scored by this model version
+    def is_current(self, file_path, model_version):
+        entry = self.entries.get(file_path)
+        if entry is None or entry.get("model_version") != model_version:
+            return False
+        return entry.get("size") == os.path.getsize(file_path) and entry.get("mtime") == os.path.getmtime(file_path)
+
+    # ➕ Remember a scored file
+    def record(self, file_path, model_version, **extra):
+        self.entries[file_path] = {**self._signature(file_path), "model_version": model_version, **extra}
+
+    # 🧹 Forget files that are no longer on disk; returns their entries
+    def prune(self, existing_paths):
+        existing = set(existing_paths)
+        removed = {path: entry for path, entry in self.entries.items() if path not in existing}
+        for path in removed:
+            del self.entries[path]
+        return removed
+
+    def clear(self):
+        self.entries = {}
+
+    # 💾 Write atomically so an interrupted run never leaves a half-written manifest
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"settings": self.settings, "entries": self.entries}, f, indent=2)
+        os.replace(tmp_path, self.path)
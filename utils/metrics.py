@@ -0,0 +1,204 @@
+# 📦 Required Imports
+import bisect
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.model_registry import current_rss_bytes
+
+# 📏 Histogram bucket upper bounds, in seconds (Prometheus' defaults plus a few sub-millisecond ones)
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 🌐 Port of the Prometheus endpoint (the Gradio server keeps 7860)
+METRICS_PORT = int(os.environ.get("METRICS_PORT", 7861))
+
+# 🔌 APP_METRICS=0 turns all recording off; APP_REQUEST_LOG=0 keeps the metrics but drops the per-request log lines
+METRICS_ENABLED = os.environ.get("APP_METRICS", "1") != "0"
+REQUEST_LOG_ENABLED = os.environ.get("APP_REQUEST_LOG", "1") != "0"
+
+# 🧾 Stage timings of the request running in the current thread
+_current_request = contextvars.ContextVar("current_request", default=None)
+
+# 💤 Shared no-op context used when metrics are disabled
+_NO_OP = contextlib.nullcontext()
+
+
+# 📊 Cumulative histogram with fixed buckets
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    # 📄 Prometheus lines for one labelled series
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+# ⏱️ Per-stage timing histograms, request and error counters, and a structured log line per request
+class StageMetrics:
+    def __init__(self, enabled=METRICS_ENABLED, log_requests=REQUEST_LOG_ENABLED):
+        self.enabled = enabled
+        self.log_requests = log_requests
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._requests = {}
+        self._errors = {}
+        self._request_seconds = {}
+        self._gauges = {}
+        self._server = None
+
+    # 📏 Expose a live value (read() is called on every scrape), e.g. a queue depth
+    def gauge(self, name, help_text, read):
+        self._gauges[name] = (help_text, read)
+
+    # ➕ Record one duration (seconds) for a stage, and add it to the current request's log line
+    def observe(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = Histogram()
+            histogram.observe(seconds)
+        trace = _current_request.get()
+        if trace is not None:
+            trace["stages"][stage] = trace["stages"].get(stage, 0.0) + seconds
+
+    # ⏱️ Time a block as one stage: with METRICS.stage("decode"): ...
+    def stage(self, name):
+        return self._timed_stage(name) if self.enabled else _NO_OP
+
+    @contextlib.contextmanager
+    def _timed_stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    # 🧾 Add stage times (seconds) measured in another thread, e.g. by the micro-batcher, to the current request's log line
+    def add_request_stages(self, stages):
+        trace = _current_request.get()
+        if trace is not None:
+            for stage, seconds in stages.items():
+                trace["stages"][stage] = trace["stages"].get(stage, 0.0) + seconds
+
+    # 🏷️ Attach extra fields (model, cache hit, ...) to the current request's log line
+    def annotate(self, **fields):
+        trace = _current_request.get()
+        if trace is not None:
+            trace["fields"].update(fields)
+
+    # 🧾 Count a request to an endpoint, time it, count failures and log one JSON line when it ends
+    def request(self, endpoint):
+        return self._timed_request(endpoint) if self.enabled else _NO_OP
+
+    @contextlib.contextmanager
+    def _timed_request(self, endpoint):
+        trace = {"stages": {}, "fields": {}}
+        token = _current_request.set(trace)
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            yield trace
+        except Exception as e:
+            status = f"error: {type(e).__name__}"
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            _current_request.reset(token)
+            with self._lock:
+                self._requests[endpoint] = self._requests.get(endpoint, 0) + 1
+                if status != "ok":
+                    self._errors[endpoint] = self._errors.get(endpoint, 0) + 1
+                histogram = self._request_seconds.get(endpoint)
+                if histogram is None:
+                    histogram = self._request_seconds[endpoint] = Histogram()
+                histogram.observe(seconds)
+            if self.log_requests:
+                record = {
+                    "event": "request",
+                    "endpoint": endpoint,
+                    "status": status,
+                    "total_ms": round(seconds * 1000, 2),
+                    "stages_ms": {stage: round(value * 1000, 3) for stage, value in trace["stages"].items()},
+                    **trace["fields"],
+                }
+                print(json.dumps(record), flush=True)
+
+    # 📄 Everything in the Prometheus text exposition format
+    def render(self):
+        with self._lock:
+            lines = [
+                "# HELP app_stage_seconds Time spent in each stage of request handling.",
+                "# TYPE app_stage_seconds histogram",
+            ]
+            for stage, histogram in sorted(self._stages.items()):
+                lines.extend(histogram.render("app_stage_seconds", f'stage="{stage}"'))
+            lines += [
+                "# HELP app_request_seconds End-to-end time per request.",
+                "# TYPE app_request_seconds histogram",
+            ]
+            for endpoint, histogram in sorted(self._request_seconds.items()):
+                lines.extend(histogram.render("app_request_seconds", f'endpoint="{endpoint}"'))
+            lines += ["# HELP app_requests_total Requests handled.", "# TYPE app_requests_total counter"]
+            lines += [f'app_requests_total{{endpoint="{e}"}} {n}' for e, n in sorted(self._requests.items())]
+            lines += ["# HELP app_request_errors_total Requests that raised an error.", "# TYPE app_request_errors_total counter"]
+            lines += [f'app_request_errors_total{{endpoint="{e}"}} {self._errors.get(e, 0)}' for e in sorted(self._requests)]
+        lines += [
+            "# HELP app_process_resident_memory_bytes Resident set size of the app process.",
+            "# TYPE app_process_resident_memory_bytes gauge",
+            f"app_process_resident_memory_bytes {current_rss_bytes()}",
+        ]
+        for name, (help_text, read) in sorted(self._gauges.items()):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {read()}"]
+        return "\n".join(lines) + "\n"
+
+    # 🌐 Serve /metrics from a background thread
+    def serve(self, port=METRICS_PORT, host="0.0.0.0"):
+        if self._server is not None:
+            return self._server
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # scrapes every few seconds would drown the request log
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+        print(f"📈 Metrics on http://{host}:{port}/metrics")
+        return self._server
+
+
+# 🌍 Shared instance used by app.py
+METRICS = StageMetrics()
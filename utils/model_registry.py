@@ -0,0 +1,231 @@
+# 📦 Required Imports
+import hashlib
+import os
+import threading
+import time
+
+import torch
+from torchvision import models
+
+from utils.backends import EXPORT_PATHS, LOADERS, model_name_for
+from utils.quantization import QUANTIZED_PATHS, load_quantized
+
+# 🏷️ Class labels (same order as the training folders)
+CLASS_NAMES = ["glioma", "meningioma", "no_tumor", "pituitary"]
+
+# 📁 Known checkpoints: name -> (architecture, checkpoint path)
+MODEL_SPECS = {
+    "efficientnet_b0": ("efficientnet_b0", "model/efficientnetb0_classifier.pt"),
+    "resnet50": ("resnet50", "model/classifier.pt"),
+}
+
+# ⏱️ How often (seconds) a resident model checks its checkpoint for changes
+CHECK_INTERVAL = 2.0
+
+
+# 🧠 Build an untrained network with the 4-class head
+def build_model(arch, num_classes=len(CLASS_NAMES)):
+    if arch == "efficientnet_b0":
+        model = models.efficientnet_b0(weights=None)
+        model.classifier[1] = torch.nn.Linear(model.classifier[1].in_features, num_classes)
+    elif arch == "resnet50":
+        model = models.resnet50(weights=None)
+        model.fc = torch.nn.Linear(model.fc.in_features, num_classes)
+    else:
+        raise ValueError(f"Unsupported architecture: {arch}. Choose one of {sorted(MODEL_SPECS)}.")
+    return model
+
+
+# 🔄 Default loader: rebuild the architecture and load the state dict
+def state_dict_loader(arch):
+    def load(path):
+        model = build_model(arch)
+        model.load_state_dict(torch.load(path, map_location="cpu"))
+        model.eval()
+        return model
+    return load
+
+
+# 🔑 SHA-256 of a file, read in chunks
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# 📏 Bytes held by a model's parameters and buffers
+def model_size_bytes(model):
+    if not isinstance(model, torch.nn.Module):
+        return None
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+# 📊 Peak resident set size of this process so far
+def peak_rss_bytes():
+    import resource
+    import sys
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # macOS reports bytes, Linux kilobytes
+
+
+# 📊 Resident set size of this process (current on Linux, peak elsewhere)
+def current_rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+# 📦 One loaded checkpoint (never mutated after creation, so it can be shared freely)
+class LoadedModel:
+    def __init__(self, name, model, path, mtime, sha256, version, load_seconds):
+        self.name = name
+        self.model = model
+        self.path = path
+        self.mtime = mtime
+        self.sha256 = sha256
+        self.version = version
+        self.load_seconds = load_seconds
+        # Packed INT8 weights are not listed as parameters, so fall back to the file size
+        self.size_bytes = model_size_bytes(model) or os.path.getsize(path)
+
+
+# 🗂️ Process-wide registry of resident models
+class ModelRegistry:
+    def __init__(self, check_interval=CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._specs = {}
+        self._entries = {}
+        self._checked_at = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    # ➕ Register a checkpoint under a name (loader: path -> ready-to-run model)
+    def register(self, name, path, loader):
+        with self._lock:
+            self._specs[name] = (path, loader)
+            self._load_locks.setdefault(name, threading.Lock())
+            self._counters.setdefault(name, {"requests": 0, "loads": 0, "reloads": 0, "total_load_seconds": 0.0})
+
+    # 🏷️ Registered model names
+    def names(self):
+        return sorted(self._specs)
+
+    # 📁 Checkpoint file registered under a name
+    def checkpoint_path(self, name):
+        return self._specs[name][0]
+
+    # 🔑 Version of a registered checkpoint on disk, without loading it
+    def checkpoint_version(self, name):
+        entry = self._entries.get(name)
+        path, _ = self._specs[name]
+        if entry is not None and os.stat(path).st_mtime == entry.mtime:
+            return entry.version
+        return file_sha256(path)[:12]
+
+    # 🔍 Return the resident model, loading or hot-swapping it when needed
+    def get(self, name):
+        if name not in self._specs:
+            raise KeyError(f"Unknown model '{name}'. Registered: {sorted(self._specs)}")
+
+        entry = self._entries.get(name)
+        if entry is None or self._is_stale(name, entry):
+            entry = self._reload(name)
+
+        with self._lock:
+            self._counters[name]["requests"] += 1
+        return entry
+
+    # ⏳ Cheap mtime check, throttled to once per check_interval
+    def _is_stale(self, name, entry):
+        now = time.monotonic()
+        if now - self._checked_at.get(name, 0.0) < self.check_interval:
+            return False
+        self._checked_at[name] = now
+        try:
+            return os.stat(entry.path).st_mtime != entry.mtime
+        except OSError:
+            # Checkpoint temporarily missing (e.g. mid-copy): keep serving the resident model
+            return False
+
+    # 🔄 Load outside the registry lock, then swap the entry in one assignment
+    def _reload(self, name):
+        path, loader = self._specs[name]
+        with self._load_locks[name]:
+            current = self._entries.get(name)
+            mtime = os.stat(path).st_mtime
+            if current is not None and current.mtime == mtime:
+                return current  # another thread already reloaded it
+
+            sha256 = file_sha256(path)
+            if current is not None and current.sha256 == sha256:
+                # Touched but unchanged: keep the weights, remember the new mtime
+                current = LoadedModel(name, current.model, path, mtime, sha256, current.version, current.load_seconds)
+                self._entries[name] = current
+                return current
+
+            start = time.perf_counter()
+            model = loader(path)
+            load_seconds = time.perf_counter() - start
+            version = sha256[:12]  # keep in sync with checkpoint_version()
+            entry = LoadedModel(name, model, path, mtime, sha256, version, load_seconds)
+
+            # In-flight requests keep their reference to the old entry until they finish
+            self._entries[name] = entry
+            self._checked_at[name] = time.monotonic()
+            with self._lock:
+                counters = self._counters[name]
+                counters["loads"] += 1
+                counters["reloads"] += 1 if current is not None else 0
+                counters["total_load_seconds"] += load_seconds
+
+            size_mb = (entry.size_bytes or 0) / 1e6
+            print(f"✅ Loaded model '{name}' v{version} in {load_seconds:.2f}s ({size_mb:.1f} MB weights)")
+            return entry
+
+    # 📊 Load-time and memory figures for every registered model
+    def stats(self):
+        with self._lock:
+            counters = {name: dict(values) for name, values in self._counters.items()}
+        report = {"process_rss_mb": round(current_rss_bytes() / 1e6, 1), "models": {}}
+        for name, values in counters.items():
+            entry = self._entries.get(name)
+            info = dict(values)
+            if entry is not None:
+                info.update({
+                    "version": entry.version,
+                    "path": entry.path,
+                    "last_load_seconds": round(entry.load_seconds, 3),
+                    "weights_mb": round((entry.size_bytes or 0) / 1e6, 1),
+                    # Every request after the first would have paid this without the registry
+                    "load_seconds_saved": round(entry.load_seconds * max(values["requests"] - values["loads"], 0), 2),
+                })
+            info["total_load_seconds"] = round(info["total_load_seconds"], 3)
+            report["models"][name] = info
+        return report
+
+
+# 🌍 Shared registry with the project's checkpoints pre-registered
+MODEL_REGISTRY = ModelRegistry()
+for _name, (_arch, _path) in MODEL_SPECS.items():
+    MODEL_REGISTRY.register(_name, _path, state_dict_loader(_arch))
+for _name, _path in QUANTIZED_PATHS.items():
+    MODEL_REGISTRY.register(f"{_name}_int8", _path, load_quantized)
+for _name, _paths in EXPORT_PATHS.items():
+    for _backend, _path in _paths.items():
+        MODEL_REGISTRY.register(model_name_for(_name, _backend), _path, LOADERS[_backend])
+
+
+# ✅ Registry name for --model/--backend, as an argparse error at startup (not a KeyError at the first prediction)
+# when that model has no such backend, e.g. an INT8 model with --backend onnx
+def parse_model_name(parser, model, backend):
+    name = model_name_for(model, backend)
+    if name not in MODEL_REGISTRY.names():
+        parser.error(f"--model {model} is not available with --backend {backend} ({name} is not registered; "
+                     f"INT8 models run with --backend eager)")
+    return name
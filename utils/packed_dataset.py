@@ -0,0 +1,115 @@
+# 📦 Required Imports
+import hashlib
+import json
+import os
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+from utils.inference import IMAGE_EXTENSIONS, NUM_WORKERS, ImagePathDataset, make_loader
+from utils.preprocessing import IMAGE_SIZE, collate_luminance
+
+# 📁 Default location of packed datasets
+PACK_ROOT = "data/packed"
+
+# 🔢 Bump when the on-disk layout or the preprocessing changes
+PACK_VERSION = 1
+
+
+# 📂 Class folders and (path, label) samples, ordered exactly like datasets.ImageFolder
+def scan_image_folder(source_dir):
+    classes = sorted(entry.name for entry in os.scandir(source_dir) if entry.is_dir())
+    samples = []
+    for label, class_name in enumerate(classes):
+        for root, _, files in sorted(os.walk(os.path.join(source_dir, class_name), followlinks=True)):
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    samples.append((os.path.join(root, name), label))
+    return classes, samples
+
+
+# 🔑 Fingerprint of the source folder: any added, removed or modified file changes it
+def folder_fingerprint(samples):
+    digest = hashlib.sha256(f"v{PACK_VERSION}:{IMAGE_SIZE}".encode())
+    for path, label in samples:
+        stat = os.stat(path)
+        digest.update(f"{path}|{label}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+# 📁 Pack folder for a source folder (data/classificationdata/timri/train -> data/packed/timri_train)
+def default_pack_dir(source_dir):
+    parts = os.path.normpath(source_dir).split(os.sep)
+    return os.path.join(PACK_ROOT, "_".join(parts[-2:]))
+
+
+# ✅ True when the pack exists and was built from the folder as it is now
+def is_pack_current(pack_dir, source_dir):
+    meta_path = os.path.join(pack_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path, "r") as f:
+        meta = json.load(f)
+    _, samples = scan_image_folder(source_dir)
+    return meta.get("fingerprint") == folder_fingerprint(samples)
+
+
+# 📦 Decode every image once and store 224x224 uint8 luminance + labels as memory-mappable .npy files
+def pack_image_folder(source_dir, pack_dir=None, num_workers=NUM_WORKERS, batch_size=256):
+    pack_dir = pack_dir or default_pack_dir(source_dir)
+    os.makedirs(pack_dir, exist_ok=True)
+    meta_path = os.path.join(pack_dir, "meta.json")
+    if os.path.exists(meta_path):
+        os.remove(meta_path)  # invalid until the new pack is complete
+    classes, samples = scan_image_folder(source_dir)
+    paths = [path for path, _ in samples]
+
+    images_path = os.path.join(pack_dir, "images.npy")
+    images = np.lib.format.open_memmap(images_path, mode="w+", dtype=np.uint8, shape=(len(samples), 1, *IMAGE_SIZE))
+    loader = make_loader(ImagePathDataset(paths), batch_size=batch_size, num_workers=num_workers, collate_fn=collate_luminance)
+    for batch, indices in loader:
+        images[indices.numpy()] = batch.numpy()
+    images.flush()
+    del images
+
+    np.save(os.path.join(pack_dir, "labels.npy"), np.array([label for _, label in samples], dtype=np.int64))
+
+    # meta.json is written last, so an interrupted pack is never mistaken for a complete one
+    meta = {"source_dir": source_dir, "classes": classes, "count": len(samples), "fingerprint": folder_fingerprint(samples)}
+    with open(meta_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    return pack_dir
+
+
+# 🔁 Pack only when missing or out of date
+def ensure_pack(source_dir, pack_dir=None, num_workers=NUM_WORKERS):
+    pack_dir = pack_dir or default_pack_dir(source_dir)
+    if is_pack_current(pack_dir, source_dir):
+        return pack_dir, False
+    return pack_image_folder(source_dir, pack_dir, num_workers), True
+
+
+# 🗂️ Dataset over a pack: yields (uint8 (1, 224, 224) tensor, label); normalize per batch with normalize_batch
+class PackedImageDataset(Dataset):
+    def __init__(self, pack_dir):
+        self.pack_dir = pack_dir
+        with open(os.path.join(pack_dir, "meta.json"), "r") as f:
+            meta = json.load(f)
+        self.classes = meta["classes"]
+        self.labels = np.load(os.path.join(pack_dir, "labels.npy"))
+        self._images = None  # opened lazily so every DataLoader worker maps the file itself
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, idx):
+        if self._images is None:
+            self._images = np.load(os.path.join(self.pack_dir, "images.npy"), mmap_mode="r")
+        return torch.from_numpy(np.array(self._images[idx])), int(self.labels[idx])
+
+    # 🧳 Don't pickle an open memmap into worker processes
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_images"] = None
+        return state
@@ -0,0 +1,28 @@
+# 📦 Required Imports
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# ⚙️ Default number of worker processes
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+
+# 🏭 Apply fn to every task on a process pool and yield the results as they finish.
+# At most `window` tasks are in flight, so a 100k-item input is never materialized at once.
+# Pass context=multiprocessing.get_context("spawn") when the caller runs threads (forking those can deadlock).
+def run_in_parallel(fn, tasks, workers=DEFAULT_WORKERS, window=None, context=None):
+    if workers <= 1:
+        for task in tasks:
+            yield fn(task)
+        return
+
+    window = window or workers * 4
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = set()
+        for task in tasks:
+            pending.add(pool.submit(fn, task))
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in wait(pending).done:
+            yield future.result()
@@ -0,0 +1,198 @@
+# 📦 Required Imports
+import copy
+import hashlib
+import io
+import os
+import tempfile
+from datetime import datetime
+
+import fontTools
+from fontTools import subset as ftsubset
+from fontTools import ttLib
+from fpdf import FPDF
+from fpdf.enums import MethodReturnValue, XPos, YPos
+
+from utils.parallel import DEFAULT_WORKERS
+
+# 🔤 Report font
+FONT_PATH = "fonts/Arial.ttf"
+FONT_FAMILY = "ArialUnicode"
+
+# ⚙️ Default number of rendering processes
+REPORT_WORKERS = DEFAULT_WORKERS
+
+# 🔤 Characters a template's font subset always covers, on top of its static text:
+# printable ASCII, Latin-1, Turkish letters and common typographic punctuation
+TEMPLATE_CHARSET = (
+    "".join(chr(code) for code in range(0x20, 0x7F))
+    + "".join(chr(code) for code in range(0xA0, 0x100))
+    + "ğĞıİşŞ–—‘’“”•…€"
+)
+
+# 📁 Font subsets built by templates (shared by runs and worker processes)
+FONT_SUBSET_DIR = os.path.join(tempfile.gettempdir(), "brain-mri-report-fonts")
+
+# 🗄️ Parsed fonts of this process: path -> (pristine TTFFont, raw file bytes)
+_FONT_CACHE = {}
+
+
+# 🔤 Add a TrueType font without re-parsing the file: widths, cmap and metrics are computed once per process
+def add_shared_font(pdf, family=FONT_FAMILY, path=FONT_PATH):
+    fontkey = family.lower()
+    cached = _FONT_CACHE.get(path)
+    if cached is None:
+        parser = FPDF()
+        parser.add_font(family, "", path)
+        with open(path, "rb") as f:
+            cached = _FONT_CACHE[path] = (parser.fonts[fontkey], f.read())
+    pristine, font_bytes = cached
+
+    # Per-document state (glyph widths used, subset map) is copied; the read-only tables are shared.
+    # Writing the PDF subsets the fontTools object in place, so every document gets its own, loaded lazily from memory.
+    font = copy.deepcopy(pristine)
+    font.ttfont = ttLib.TTFont(io.BytesIO(font_bytes), recalcTimestamp=False, lazy=True)
+    font.subset.font = font
+    font.i = len(pdf.fonts) + 1
+    pdf.fonts[fontkey] = font
+
+
+# 🔑 Unicode code points a font file can draw
+def font_characters(path=FONT_PATH):
+    if path not in _FONT_CACHE:
+        add_shared_font(FPDF(), path=path)
+    return set(_FONT_CACHE[path][0].cmap)
+
+
+# ✂️ Smaller copy of a font holding only `chars`; built once and kept on disk, keyed by font, characters,
+# fontTools version and subsetter options (a fontTools upgrade or an options change builds a new subset)
+def subset_font(path, chars, output_dir=FONT_SUBSET_DIR):
+    # Same outlines, metrics and hinting; only glyphs and tables the PDF writer never uses are left out
+    options = ftsubset.Options(notdef_outline=True, recommended_glyphs=True, glyph_names=True, layout_features=[])
+    options.drop_tables += ["GSUB", "GPOS", "GDEF", "VDMX", "hdmx", "kern", "LTSH", "PCLT", "JSTF", "DSIG"]
+
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read())
+    digest.update("".join(sorted(chars)).encode("utf-8"))
+    digest.update(fontTools.version.encode("utf-8"))
+    digest.update(repr(sorted(vars(options).items())).encode("utf-8"))
+    name, extension = os.path.splitext(os.path.basename(path))
+    subset_path = os.path.join(output_dir, f"{name}.{digest.hexdigest()[:16]}{extension}")
+    if os.path.exists(subset_path):
+        return subset_path
+
+    font = ttLib.TTFont(path, recalcTimestamp=False)
+    subsetter = ftsubset.Subsetter(options)
+    subsetter.populate(text="".join(chars))
+    subsetter.subset(font)
+
+    # Several worker processes may build the same subset at once; the rename keeps the file whole
+    os.makedirs(output_dir, exist_ok=True)
+    tmp_path = f"{subset_path}.{os.getpid()}.tmp"
+    font.save(tmp_path)
+    os.replace(tmp_path, subset_path)
+    return subset_path
+
+
+# 🧩 Precompiled report template: the font subset and the layout of the static text are worked out once per run,
+# so each report only lays out its variable fields
+class ReportTemplate:
+    def __init__(self, static_texts=(), font_path=FONT_PATH):
+        self.static_texts = tuple(static_texts)
+        self.font_path = font_path
+        self._subset_path = None
+        self._subset_chars = None
+        self._full_font_chars = None
+        self._single_lines = None
+
+    # 🔤 Build (or reuse) the subset on first use, so importing a script stays cheap
+    def _prepare(self):
+        if self._subset_path is not None:
+            return
+        full_chars = font_characters(self.font_path)
+        wanted = set(TEMPLATE_CHARSET).union(*self.static_texts)
+        self._subset_chars = {char for char in wanted if ord(char) in full_chars}
+        self._full_font_chars = full_chars
+        self._subset_path = subset_font(self.font_path, self._subset_chars)
+
+    # 🔤 Font file for a report: the subset, unless a variable field uses a character only the full font has
+    def font_for(self, *texts):
+        self._prepare()
+        for text in texts:
+            for char in str(text):
+                if char not in self._subset_chars and ord(char) in self._full_font_chars:
+                    return self.font_path
+        return self._subset_path
+
+    # 📐 Static paragraphs that fit on one line (these skip line breaking; multi_cell and cell draw them identically)
+    def is_single_line(self, text, h=8, size=12):
+        if self._single_lines is None:
+            scratch = ReportPDF(template=self)
+            scratch.add_page()
+            scratch.set_font(FONT_FAMILY, "", size)
+            self._single_lines = {
+                (static, h, size) for static in self.static_texts
+                if len(scratch.multi_cell(0, h, static, dry_run=True, output=MethodReturnValue.LINES)) == 1
+            }
+        return (text, h, size) in self._single_lines
+
+
+# 📜 Report layout shared by the batch report scripts
+class ReportPDF(FPDF):
+    title_text = "Brain MRI Diagnostic Report"
+
+    # fields: the report's variable text, used to pick the template's font subset when one is given
+    def __init__(self, created=None, template=None, fields=()):
+        super().__init__()
+        self.template = template
+        add_shared_font(self, path=template.font_for(*fields) if template is not None else FONT_PATH)
+        if created is not None:
+            self.set_creation_date(created)  # fixed metadata: same inputs give byte-identical files
+
+    def header(self):
+        self.set_font(FONT_FAMILY, "", 14)
+        self.cell(0, 10, self.title_text, ln=True, align="C")
+        self.ln(5)
+
+    def chapter_title(self, title):
+        self.set_font(FONT_FAMILY, "", 13)
+        self.cell(0, 10, title, ln=True)
+        self.ln(2)
+
+    def chapter_body(self, text):
+        self.set_font(FONT_FAMILY, "", 12)
+        if self.template is not None and self.template.is_single_line(text):
+            self.cell(0, 8, text, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        else:
+            self.multi_cell(0, 8, text)
+        self.ln(4)
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font(FONT_FAMILY, "", 8)
+        self.cell(0, 10, "Generated by AI Assistant", align="C")
+
+
+# 🕒 Timestamp printed in (and stamped on) every report of a run; pass --timestamp to reproduce a run exactly
+def run_timestamp(value=None):
+    moment = datetime.fromisoformat(value) if value else datetime.now().replace(second=0, microsecond=0)
+    return moment if moment.tzinfo else moment.astimezone()  # local time, as printed in the reports
+
+
+# 🧩 "--shard i/n" -> (i, n), with 1 <= i <= n
+def parse_shard(value):
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}': expected i/n, e.g. 2/4")
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{value}': i must be between 1 and n")
+    return index, count
+
+
+# 🧩 Round-robin split by record number, so every machine agrees on the split without coordination
+def in_shard(idx, shard):
+    if shard is None:
+        return True
+    index, count = shard
+    return (idx - 1) % count == index - 1
+
@@ -0,0 +1,73 @@
+# 📦 Required Imports
+import importlib
+import importlib.util
+import time
+
+# ⚙️ Text extraction engines, fastest first (PyMuPDF parses text PDFs several times faster than pdfplumber)
+PDF_ENGINES = ("pymupdf", "pdfplumber")
+
+# 📦 Module behind each engine; both are optional, only the installed ones are used
+ENGINE_MODULES = {"pymupdf": "pymupdf", "pdfplumber": "pdfplumber"}
+
+
+# 🔍 Engines installed in this environment, fastest first
+def available_engines():
+    return [engine for engine in PDF_ENGINES if importlib.util.find_spec(ENGINE_MODULES[engine]) is not None]
+
+
+# ⚙️ Engines to try, in order, for an --engine choice ("auto" = every installed engine, fastest first)
+def select_engines(engine="auto"):
+    if engine == "auto":
+        engines = available_engines()
+        if not engines:
+            raise RuntimeError("No PDF engine installed. Install pymupdf (preferred) or pdfplumber.")
+        return engines
+    if engine not in PDF_ENGINES:
+        raise ValueError(f"Unsupported PDF engine: {engine}. Choose one of {PDF_ENGINES} or 'auto'.")
+    return [engine]
+
+
+# 🛠️ Page texts with PyMuPDF
+def read_pages_with_pymupdf(file_path):
+    import pymupdf  # formerly imported as fitz, which now warns on import
+
+    with pymupdf.open(file_path) as doc:
+        return [page.get_text().rstrip("\n") for page in doc]  # pdfplumber has no newline after the last line either
+
+
+# 🛠️ Page texts with pdfplumber
+def read_pages_with_pdfplumber(file_path):
+    import pdfplumber
+
+    with pdfplumber.open(file_path) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages]
+
+
+_READERS = {"pymupdf": read_pages_with_pymupdf, "pdfplumber": read_pages_with_pdfplumber}
+
+
+# 📄 Text of every page of a PDF with one engine (errors are raised, so callers can fall back)
+def read_pdf_pages(file_path, engine="pymupdf"):
+    if engine not in _READERS:
+        raise ValueError(f"Unsupported PDF engine: {engine}. Choose one of {PDF_ENGINES}.")
+    return _READERS[engine](file_path)
+
+
+# 🧵 Full text with one newline after each page (a single join instead of growing a string page by page)
+def join_pages(pages):
+    return "".join(f"{text}\n" for text in pages)
+
+
+# 🔁 Extract with the first engine that can read the file; returns (text, engine, page count, seconds)
+def extract_text(file_path, engines=PDF_ENGINES):
+    errors = []
+    for engine in engines:
+        try:
+            importlib.import_module(ENGINE_MODULES[engine])  # a worker's first import is not extraction time
+            start = time.perf_counter()
+            pages = read_pdf_pages(file_path, engine)
+        except Exception as e:
+            errors.append(f"{engine}: {e}")
+            continue
+        return join_pages(pages), engine, len(pages), time.perf_counter() - start
+    raise RuntimeError("; ".join(errors) or "no PDF engine to try")
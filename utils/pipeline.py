@@ -0,0 +1,261 @@
+# 📦 Required Imports
+import queue
+import threading
+import time
+
+# 📏 Default number of items a queue between two stages holds before the producer has to wait
+QUEUE_SIZE = 64
+
+# ⏱️ How often blocked stages check whether the pipeline was aborted
+POLL_SECONDS = 0.1
+
+# 🏁 End-of-stream marker, one per producing stage
+_END = object()
+
+
+# 🛑 Raised inside stages when another stage failed, so every thread unwinds
+class PipelineAborted(RuntimeError):
+    pass
+
+
+# 📬 Bounded queue between stages; counts its producers so consumers know when the stream is over
+class Channel:
+    def __init__(self, name, maxsize=QUEUE_SIZE):
+        self.name = name
+        self.maxsize = maxsize
+        self._queue = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self._open_producers = 0
+        self.peak_depth = 0
+
+    def depth(self):
+        return self._queue.qsize()
+
+
+# 🗃️ Unbounded buffer inside a stage (e.g. a join holding one half until the other arrives); its peak size is
+# tracked for the summary, next to the queue peaks
+class Buffer:
+    def __init__(self, name):
+        self.name = name
+        self.peak_size = 0
+
+    def observe(self, size):
+        self.peak_size = max(self.peak_size, size)
+
+
+# 📊 Counters of one stage (all threads together)
+class StageStats:
+    def __init__(self, name, threads, processes=0):
+        self.name = name
+        self.threads = threads
+        self.processes = processes
+        self.items_in = 0
+        self.items_out = 0
+        self.starved_seconds = 0.0  # waiting for input
+        self.blocked_seconds = 0.0  # waiting for room downstream: backpressure
+        self.thread_seconds = 0.0
+        self.started = None
+        self.finished = None
+        self.first_output = None
+        self._lock = threading.Lock()
+
+    def add(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                setattr(self, name, getattr(self, name) + amount)
+
+    # 📄 One row of the summary table
+    def row(self):
+        wall = (self.finished or time.perf_counter()) - (self.started or time.perf_counter())
+        thread_seconds = self.thread_seconds or 1e-9
+        busy = max(thread_seconds - self.starved_seconds - self.blocked_seconds, 0.0)
+        return {
+            "stage": self.name,
+            "threads": self.threads,
+            "processes": self.processes,
+            "in": self.items_in,
+            "out": self.items_out,
+            "items_per_sec": self.items_out / wall if wall > 0 else 0.0,
+            "busy_pct": 100 * busy / thread_seconds,
+            "starved_pct": 100 * self.starved_seconds / thread_seconds,
+            "blocked_pct": 100 * self.blocked_seconds / thread_seconds,
+            "seconds": wall,
+        }
+
+
+# 📥 A stage thread's view of its input channel: iterate items, or take micro-batches of whatever is queued
+class Inbox:
+    def __init__(self, pipeline, channel, stats):
+        self._pipeline = pipeline
+        self._channel = channel
+        self._stats = stats
+
+    def _get(self, block=True):
+        channel = self._channel
+        start = time.perf_counter()
+        while True:
+            try:
+                item = channel._queue.get(timeout=POLL_SECONDS) if block else channel._queue.get_nowait()
+                break
+            except queue.Empty:
+                if not block:
+                    return None
+                self._pipeline._check_aborted()
+        if block:
+            self._stats.add(starved_seconds=time.perf_counter() - start)
+        if item is _END:
+            with channel._lock:
+                channel._open_producers -= 1
+                finished = channel._open_producers <= 0
+            # The last producer is done: pass the marker on so the stage's other threads stop too
+            if finished:
+                channel._queue.put(_END)
+                return _END
+            return self._get(block)
+        self._stats.add(items_in=1)
+        return item
+
+    def __iter__(self):
+        while True:
+            item = self._get()
+            if item is _END:
+                return
+            yield item
+
+    # 📦 Lists of up to max_size items: waits for the first one, then takes only what is already queued
+    def batches(self, max_size):
+        while True:
+            first = self._get()
+            if first is _END:
+                return
+            batch = [first]
+            while len(batch) < max_size:
+                item = self._get(block=False)
+                if item is None:
+                    break
+                if item is _END:
+                    yield batch
+                    return
+                batch.append(item)
+            yield batch
+
+
+# 🏭 Streaming pipeline: stages run in threads and pass items through bounded channels, so a slow stage makes the
+# ones upstream wait (backpressure) instead of piling work up in memory
+class Pipeline:
+    def __init__(self, queue_size=QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.channels = []
+        self.buffers = []
+        self.stages = []
+        self._threads = []
+        self._errors = []
+        self._aborted = threading.Event()
+        self.started = None
+
+    # 📬 New channel between stages
+    def channel(self, name):
+        channel = Channel(name, self.queue_size)
+        self.channels.append(channel)
+        return channel
+
+    # 🗃️ New in-stage buffer to report in the summary
+    def buffer(self, name):
+        buffer = Buffer(name)
+        self.buffers.append(buffer)
+        return buffer
+
+    # ➕ Add a stage. body(inbox) is a generator yielding output items (inbox is None for source stages);
+    # `threads` copies of it share the input channel. `final` items are emitted once, after the last copy finished.
+    # processes: size of the process pool the body runs its work on, for the summary only
+    def stage(self, name, body, input=None, output=None, threads=1, final=(), processes=0):
+        stats = StageStats(name, threads, processes)
+        self.stages.append(stats)
+        if output is not None:
+            output._open_producers += 1
+        remaining = [threads]
+        lock = threading.Lock()
+
+        def run():
+            start = time.perf_counter()
+            if stats.started is None:
+                stats.started = start
+            try:
+                items = body(Inbox(self, input, stats) if input is not None else None)
+                for item in items:
+                    self._emit(output, item, stats)
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last and output is not None:
+                    for item in final:
+                        self._put(output, item)
+            except PipelineAborted:
+                last = False
+            except BaseException as error:
+                self._errors.append((name, error))
+                self._aborted.set()
+                last = False
+            finally:
+                stats.add(thread_seconds=time.perf_counter() - start)
+            if last:
+                stats.finished = time.perf_counter()
+                if output is not None:
+                    try:
+                        self._put(output, _END)
+                    except PipelineAborted:
+                        pass
+
+        for number in range(threads):
+            self._threads.append(threading.Thread(target=run, name=f"{name}-{number}", daemon=True))
+        return stats
+
+    # 📤 Send an item downstream, counting the time spent waiting for room as backpressure
+    def _emit(self, output, item, stats):
+        if stats.first_output is None:
+            stats.first_output = time.perf_counter()
+        stats.add(items_out=1)
+        if output is None:
+            return
+        start = time.perf_counter()
+        self._put(output, item)
+        stats.add(blocked_seconds=time.perf_counter() - start)
+        output.peak_depth = max(output.peak_depth, output.depth())
+
+    def _put(self, channel, item):
+        while True:
+            try:
+                channel._queue.put(item, timeout=POLL_SECONDS)
+                return
+            except queue.Full:
+                self._check_aborted()
+
+    def _check_aborted(self):
+        if self._aborted.is_set():
+            raise PipelineAborted()
+
+    # ▶️ Run every stage to completion; re-raises the first stage error
+    def run(self):
+        self.started = time.perf_counter()
+        for thread in self._threads:
+            thread.start()
+        for thread in self._threads:
+            thread.join()
+        if self._errors:
+            name, error = self._errors[0]
+            raise RuntimeError(f"Stage '{name}' failed: {error}") from error
+        return [stats.row() for stats in self.stages]
+
+    # 📊 Per-stage throughput, utilisation and backpressure
+    def print_summary(self):
+        print(f"\n{'Stage':<12}{'Thr':>4}{'Proc':>5}{'In':>8}{'Out':>8}{'items/s':>10}{'busy %':>8}{'starved %':>11}{'blocked %':>11}"
+              f"{'first out s':>13}")
+        for stats in self.stages:
+            row = stats.row()
+            first = f"{stats.first_output - self.started:.2f}" if stats.first_output and self.started else "-"
+            print(f"{row['stage']:<12}{row['threads']:>4}{row['processes'] or '-':>5}{row['in']:>8}{row['out']:>8}{row['items_per_sec']:>10.1f}"
+                  f"{row['busy_pct']:>8.0f}{row['starved_pct']:>11.0f}{row['blocked_pct']:>11.0f}{first:>13}")
+        print("📬 Queue peaks: " + ", ".join(f"{c.name} {c.peak_depth}/{c.maxsize}" for c in self.channels))
+        if self.buffers:
+            print("🗃️ Buffer peaks (unbounded): " + ", ".join(f"{b.name} {b.peak_size}" for b in self.buffers))
+        print("   blocked % = time a stage waited for room downstream (backpressure); starved % = time it waited for input")
@@ -0,0 +1,134 @@
+# 📦 Required Imports
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# 📁 Persistent tier location and in-memory tier size
+CACHE_PATH = "outputs/prediction_cache.sqlite"
+MAX_MEMORY_ENTRIES = 4096
+
+
+# 🔑 Content hash of an in-memory PIL image (pixels, not the upload's file name)
+def hash_image(image):
+    digest = hashlib.sha256(f"{image.mode}:{image.size}".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+# 🗄️ Two-tier prediction cache keyed on (model, checkpoint version, image hash)
+class PredictionCache:
+    def __init__(self, path=CACHE_PATH, max_memory_entries=MAX_MEMORY_ENTRIES, commit_every=100):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.commit_every = commit_every
+        self._memory = OrderedDict()
+        self._versions = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "invalidations": 0, "files_hashed": 0, "hashes_reused": 0}
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            "model_name TEXT, model_version TEXT, image_hash TEXT, probabilities TEXT, "
+            "PRIMARY KEY (model_name, model_version, image_hash))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS file_hashes (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, sha256 TEXT)"
+        )
+        self._db.commit()
+
+    # 🧹 A new checkpoint version drops everything cached for the old one
+    def _check_version(self, model_name, model_version):
+        if self._versions.get(model_name) == model_version:
+            return
+        self._versions[model_name] = model_version
+        stale = [key for key in self._memory if key[0] == model_name and key[1] != model_version]
+        for key in stale:
+            del self._memory[key]
+        deleted = self._db.execute(
+            "DELETE FROM predictions WHERE model_name = ? AND model_version != ?", (model_name, model_version)
+        ).rowcount
+        self._db.commit()
+        if stale or deleted:
+            self._counters["invalidations"] += 1
+
+    # 🔍 Cached probabilities, or None on a miss
+    def get(self, model_name, model_version, image_hash):
+        key = (model_name, model_version, image_hash)
+        with self._lock:
+            self._check_version(model_name, model_version)
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return self._memory[key]
+
+            row = self._db.execute(
+                "SELECT probabilities FROM predictions WHERE model_name = ? AND model_version = ? AND image_hash = ?", key
+            ).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            probabilities = json.loads(row[0])
+            self._remember(key, probabilities)
+            self._counters["disk_hits"] += 1
+            return probabilities
+
+    # 💾 Store probabilities in both tiers
+    def put(self, model_name, model_version, image_hash, probabilities):
+        key = (model_name, model_version, image_hash)
+        probabilities = [float(p) for p in probabilities]
+        with self._lock:
+            self._check_version(model_name, model_version)
+            self._remember(key, probabilities)
+            self._write("INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)", key + (json.dumps(probabilities),))
+
+    # 🔑 Content hash of an image file; the file is read again only when its size or mtime changed since it was hashed
+    def file_hash(self, path):
+        from utils.model_registry import file_sha256  # the registry imports torch; only file-based scoring needs it
+
+        stat = os.stat(path)
+        with self._lock:
+            row = self._db.execute("SELECT size, mtime_ns, sha256 FROM file_hashes WHERE path = ?", (path,)).fetchone()
+            if row is not None and row[:2] == (stat.st_size, stat.st_mtime_ns):
+                self._counters["hashes_reused"] += 1
+                return row[2]
+        sha256 = file_sha256(path)
+        with self._lock:
+            self._counters["files_hashed"] += 1
+            self._write("INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?)", (path, stat.st_size, stat.st_mtime_ns, sha256))
+        return sha256
+
+    # 💾 Write under the lock, committing in batches
+    def _write(self, sql, row):
+        self._db.execute(sql, row)
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self._db.commit()
+            self._pending = 0
+
+    # 🧠 LRU insert, evicting the least recently used entry when full
+    def _remember(self, key, probabilities):
+        self._memory[key] = probabilities
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    # 📊 Hit/miss counters
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            counters["memory_entries"] = len(self._memory)
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        counters["hit_rate"] = round((lookups - counters["misses"]) / lookups, 3) if lookups else None
+        return counters
+
+    # 💾 Flush pending writes
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
@@ -0,0 +1,61 @@
+# 📦 Required Imports
+import torch
+import torch.nn.functional as F
+from PIL import Image
+
+# 🧪 Same geometry and statistics as the training transform
+IMAGE_SIZE = (224, 224)
+MEAN = torch.tensor([0.485, 0.456, 0.406]).view(1, 3, 1, 1)
+STD = torch.tensor([0.229, 0.224, 0.225]).view(1, 3, 1, 1)
+
+# 📏 Allowed gap to the PIL transform, in 8-bit grey levels
+TOLERANCE_LEVELS = 3
+
+
+# 🖼️ Decode a file (or PIL image) straight to one uint8 luminance channel, shape (H, W)
+def load_luminance(source):
+    image = source if isinstance(source, Image.Image) else Image.open(source)
+    image = image.convert("L")  # same ITU-R 601 weights as transforms.Grayscale
+    return torch.frombuffer(bytearray(image.tobytes()), dtype=torch.uint8).view(image.height, image.width)
+
+
+# 📐 Resize a list of (H, W) uint8 images to one (N, 1, 224, 224) uint8 batch
+def resize_batch(images, size=IMAGE_SIZE):
+    batch = torch.empty((len(images), 1, *size), dtype=torch.uint8)
+    # Slices from one scanner usually share a shape, so each group is resized in a single call
+    groups = {}
+    for i, image in enumerate(images):
+        groups.setdefault(tuple(image.shape), []).append(i)
+    for shape, indices in groups.items():
+        stacked = torch.stack([images[i] for i in indices]).unsqueeze(1).float()
+        if shape != size:
+            stacked = F.interpolate(stacked, size=size, mode="bilinear", align_corners=False, antialias=True)
+        # Round like PIL does, so results stay within a grey level of the old pipeline
+        batch[indices] = stacked.round_().clamp_(0, 255).to(torch.uint8)
+    return batch
+
+
+# 🧮 uint8 (N, 1, H, W) -> normalized float (N, 3, H, W); the 3 channels start as a zero-copy view
+def normalize_batch(batch):
+    gray = batch.float().div_(255)
+    return gray.expand(-1, 3, -1, -1).sub(MEAN).div_(STD)
+
+
+# 🔄 Files or PIL images -> model-ready batch
+def preprocess_images(sources, size=IMAGE_SIZE):
+    return normalize_batch(resize_batch([load_luminance(source) for source in sources], size))
+
+
+# 🗂️ DataLoader collate for datasets yielding (uint8 luminance, index): resizing runs in the workers
+def collate_luminance(samples):
+    images, indices = zip(*samples)
+    return resize_batch(list(images)), torch.tensor(indices)
+
+
+# ✅ Largest gap (in grey levels) between this path and a reference PIL transform
+def max_difference_levels(paths, reference_transform):
+    reference = torch.stack([reference_transform(Image.open(path).convert("RGB")) for path in paths])
+    batched = preprocess_images(paths)
+    # Undo the normalization so the gap is measured in pixel values
+    gap = ((reference - batched) * STD).abs().max().item()
+    return gap * 255
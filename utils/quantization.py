@@ -0,0 +1,48 @@
+# 📦 Required Imports
+import torch
+from torch.ao.quantization import get_default_qconfig_mapping
+from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+# 📁 fp32 model name -> INT8 checkpoint written by scripts/quantize_model.py
+QUANTIZED_PATHS = {
+    "resnet50": "model/classifier_int8.pt",
+    "efficientnet_b0": "model/efficientnetb0_classifier_int8.pt",
+}
+
+
+# ⚙️ Pick the best quantized kernel backend available on this CPU
+def select_engine():
+    supported = torch.backends.quantized.supported_engines
+    for engine in ("x86", "fbgemm", "qnnpack"):
+        if engine in supported:
+            torch.backends.quantized.engine = engine
+            return engine
+    raise RuntimeError(f"No quantized engine available (supported: {supported})")
+
+
+# 🧮 Static post-training quantization: observe activations on calibration batches, then convert
+def quantize_model(model, calibration_loader, engine=None):
+    engine = engine or select_engine()
+    model.eval()
+    example, _ = next(iter(calibration_loader))
+    prepared = prepare_fx(model, get_default_qconfig_mapping(engine), example_inputs=(example,))
+    with torch.no_grad():
+        for images, _ in calibration_loader:
+            prepared(images)
+    return convert_fx(prepared)
+
+
+# 💾 Save as TorchScript so the INT8 graph loads without re-running FX
+def save_quantized(model, path, example):
+    with torch.no_grad():
+        scripted = torch.jit.freeze(torch.jit.trace(model, example).eval())
+    torch.jit.save(scripted, path)
+    return path
+
+
+# 🔄 Registry loader for INT8 checkpoints
+def load_quantized(path):
+    select_engine()
+    model = torch.jit.load(path, map_location="cpu")
+    model.eval()
+    return model
@@ -0,0 +1,149 @@
+# 📦 Required Imports
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from fpdf import FPDF
+from fpdf.enums import XPos, YPos
+
+from utils.stats import percentile
+
+# 📁 Where the app's reports are written
+REPORT_DIR = "outputs"
+
+# ⚙️ Rendering processes, reports allowed to wait for one, and finished jobs remembered for polling
+REPORT_WORKERS = 2
+MAX_PENDING_REPORTS = 32
+MAX_TRACKED_JOBS = 1000
+
+
+# 🚫 Raised by ReportJobs.submit when MAX_PENDING_REPORTS are already waiting
+class ReportQueueFull(RuntimeError):
+    pass
+
+
+# 📝 Render the app's one-page diagnostic report; returns (pdf path, render seconds). Runs in a worker process
+def render_diagnostic_report(predicted_class, confidence, description, job_id, output_dir=REPORT_DIR):
+    start = time.perf_counter()
+    now = datetime.now().strftime("%d-%m-%Y_%H-%M-%S")
+    os.makedirs(output_dir, exist_ok=True)
+    pdf_file = os.path.join(output_dir, f"{predicted_class}_{now}_{job_id}.pdf")  # job id: no clashes within a second
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+
+    # Başlık
+    pdf.cell(0, 10, "Brain MRI Diagnostic Report", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="C")
+
+    # Tarih ve Saat
+    pdf.cell(0, 10, f"Date & Time: {now}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+    # Tahmin edilen sınıf
+    pdf.cell(0, 10, f"Tumor Type: {predicted_class.title()}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+    # Güven düzeyi
+    pdf.cell(0, 10, f"Confidence: {confidence}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+    # Açıklama
+    pdf.multi_cell(0, 10, f"Description: {description}")
+
+    pdf.output(pdf_file)
+    return pdf_file, time.perf_counter() - start
+
+
+# 🏭 Bounded process pool for report rendering, with job handles the UI can poll
+class ReportJobs:
+    def __init__(self, workers=REPORT_WORKERS, max_pending=MAX_PENDING_REPORTS, max_tracked=MAX_TRACKED_JOBS,
+                 latency_window=1000, metrics=None):
+        # spawn: workers don't fork the app's threads, locks and model memory. Each one re-imports the launching
+        # script when it starts; app.py builds its models, batchers, cache and UI in main(), so a worker only loads
+        # this module (keep it free of torch imports)
+        self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_tracked = max_tracked
+        # metrics (a utils.metrics.StageMetrics) receives pdf_render and report_turnaround timings
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._pending = 0
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+        self._render_ms = deque(maxlen=latency_window)
+        self._turnaround_ms = deque(maxlen=latency_window)
+
+    # 📥 Queue a report and return its job id immediately
+    def submit(self, predicted_class, confidence, description):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._counters["rejected"] += 1
+                raise ReportQueueFull(f"{self._pending} reports are already waiting")
+            self._pending += 1
+            self._counters["submitted"] += 1
+
+        job_id = uuid.uuid4().hex[:12]
+        submitted_at = time.perf_counter()
+        try:
+            future = self._pool.submit(render_diagnostic_report, predicted_class, confidence, description, job_id)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        with self._lock:
+            self._jobs[job_id] = future
+            while len(self._jobs) > self.max_tracked:
+                self._jobs.popitem(last=False)  # the oldest handle stops being pollable
+        future.add_done_callback(lambda done: self._finished(done, submitted_at))
+        return job_id
+
+    # ✅ Bookkeeping once a worker returns
+    def _finished(self, future, submitted_at):
+        turnaround = time.perf_counter() - submitted_at
+        failed = future.cancelled() or future.exception() is not None
+        with self._lock:
+            self._pending -= 1
+            self._counters["failed" if failed else "completed"] += 1
+            if not failed:
+                self._render_ms.append(future.result()[1] * 1000)
+                self._turnaround_ms.append(turnaround * 1000)
+        if self.metrics is not None and not failed:
+            self.metrics.observe("pdf_render", future.result()[1])
+            self.metrics.observe("report_turnaround", turnaround)
+
+    # 🔍 {"state": "pending" | "done" | "failed" | "unknown", "file": path when done, "error": message when failed}
+    def status(self, job_id):
+        with self._lock:
+            future = self._jobs.get(job_id)
+        if future is None:
+            return {"state": "unknown"}
+        if not future.done():
+            return {"state": "pending"}
+        if future.cancelled():  # exception() would raise CancelledError
+            return {"state": "failed", "error": "cancelled"}
+        if future.exception() is not None:
+            return {"state": "failed", "error": str(future.exception())}
+        return {"state": "done", "file": future.result()[0]}
+
+    # 📏 Reports submitted but not finished yet
+    def queue_depth(self):
+        with self._lock:
+            return self._pending
+
+    # 📊 Queue depth, counters and render / turnaround percentiles
+    def stats(self):
+        with self._lock:
+            render, turnaround = list(self._render_ms), list(self._turnaround_ms)
+            report = {"workers": self.workers, "queue_depth": self._pending, **self._counters}
+        for name, values in (("render", render), ("turnaround", turnaround)):
+            for q in (50, 99):
+                value = percentile(values, q)
+                report[f"{name}_p{q}_ms"] = round(value, 1) if value is not None else None
+        return report
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,80 @@
+# 📦 Required Imports
+import re
+
+# 🏷️ Version of parse_report: bump it when its output changes, so cached PDFs are parsed again
+PARSER_VERSION = 3
+
+# 🧾 Cleaned fields of a report, in output order
+REPORT_FIELDS = ("age", "sex", "race", "year", "report", "conclusion", "recommendations")
+
+# 🔎 Lines the parser reacts to, compiled once: "Age:/Sex:/Race:" fields and section headings. The leading newline
+# gives the pattern a literal prefix, so the regex engine jumps from line start to line start instead of trying
+# every character; section bodies are then sliced out between the matches rather than rebuilt line by line.
+# A heading is a line of its own ("CONCLUSION", "RECOMMENDATIONS.") or a heading with a colon ("Conclusion: <text>"),
+# so prose lines that merely start with one of the words ("Conclusion of the previous study ...") stay text.
+_LINE_MARKERS = re.compile(
+    r"\n[ \t]*(?:(?P<field>age|sex|race)[ \t]*:(?P<value>[^\n]*)"
+    r"|(?P<heading>report|conclusion|recommendations)[ \t]*(?::[^\n]*|\.?[ \t]*(?=\n|$)))",
+    re.IGNORECASE,
+)
+_YEAR_PHRASE = re.compile(r"year of study", re.IGNORECASE)
+_YEAR = re.compile(r"\d{4}")
+
+# 🔀 Sections in document order; a heading only counts when it moves the parser forward
+_SECTION_ORDER = {"report": 0, "conclusion": 1, "recommendations": 2}
+
+
+# 🧹 "74." -> "74", " Female. " -> "Female"
+def _clean_value(value):
+    return value.strip(" \t.")
+
+
+# 📅 First four-digit number after "Year of study" in text[start:end], as (phrase position, year); (None, None) if absent
+def _find_year(text, start, end):
+    phrase = _YEAR_PHRASE.search(text, start, end)
+    if phrase is None:
+        return None, None
+    year = _YEAR.search(text, phrase.end(), end)
+    return phrase.start(), year.group() if year else None
+
+
+# 🧠 Final fields of a report's text in one pass: header fields until REPORT, then the report, conclusion and
+# recommendations sections, up to "Year of study and report: <year>". Missing parts are None.
+def parse_report(text):
+    text = "\n" + text  # the first line starts after a newline too
+    fields = dict.fromkeys(REPORT_FIELDS)
+    section, start = None, 0  # section being read (None = header) and where its text begins
+    header_end = len(text)
+
+    for match in _LINE_MARKERS.finditer(text):
+        if match["field"] is not None:
+            if section is None:  # the same words inside the report are just text
+                fields[match["field"].lower()] = _clean_value(match["value"])
+            continue
+        heading = match["heading"].lower()
+        if section is None:
+            if heading == "report":
+                section, start, header_end = heading, match.end() + 1, match.start()  # the heading line is not report text
+        elif _SECTION_ORDER[heading] > _SECTION_ORDER[section]:
+            fields[section] = text[start:match.start()]
+            section, start = heading, match.start("heading") + len(heading)  # keeps "CONCLUSION: <text>"
+
+    # 📅 The closing "Year of study and report: <year>" ends the last section; a header "Year of study" is the fallback
+    if section is not None:
+        year_at, fields["year"] = _find_year(text, start, len(text))
+        fields[section] = text[start:year_at]
+    if fields["year"] is None:
+        fields["year"] = _find_year(text, 0, header_end)[1]
+
+    for name in ("report", "conclusion", "recommendations"):
+        if fields[name] is not None:
+            fields[name] = fields[name].strip().lstrip(".:").strip()
+    return fields
+
+
+# 🔁 Text a legacy extracted record came from (the old first stage kept the header fields and everything after REPORT)
+def legacy_document(entry):
+    header = "".join(f"{name.title()}: {entry[name]}\n" for name in ("age", "sex", "race") if entry.get(name) is not None)
+    if entry.get("year") is not None:
+        header += f"Year of study: {entry['year']}\n"
+    return f"{header}REPORT\n{entry.get('report') or ''}"
@@ -0,0 +1,242 @@
+# 📦 Required Imports
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from utils.jsonl import iter_records, open_writer
+
+# 📁 Store location
+STORE_PATH = "outputs/report_store.sqlite"
+
+# 🏷️ Prediction sources: scored scans of real patients, synthetic training patients, and DICOM series verdicts
+# (keyed by series UID, so pruning the per-image predictions leaves them alone)
+SOURCES = ("unknown", "synthetic", "series")
+
+# ⚠️ Confidence (in %) below which reports carry the low-confidence warning
+LOW_CONFIDENCE = 60
+
+# 🧾 Columns of each table, in JSON record order
+REPORT_COLUMNS = ("age", "sex", "race", "year", "report", "conclusion", "recommendations", "patient_id", "file_path")
+PREDICTION_COLUMNS = ("patient_id", "predicted_class", "confidence")
+
+# 🧱 Tables and indexes. Reports are keyed by file_path (same-named PDFs in different folders are different reports)
+# and looked up by patient_id through an index
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS reports ("
+    "patient_id TEXT, file_path TEXT PRIMARY KEY, age TEXT, sex TEXT, race TEXT, year TEXT, "
+    "report TEXT, conclusion TEXT, recommendations TEXT, updated_at TEXT)",
+    "CREATE INDEX IF NOT EXISTS reports_by_patient ON reports (patient_id)",
+    "CREATE TABLE IF NOT EXISTS predictions ("
+    "source TEXT, patient_id TEXT, predicted_class TEXT, confidence REAL, model_version TEXT, predicted_at TEXT, "
+    "PRIMARY KEY (source, patient_id))",
+    "CREATE INDEX IF NOT EXISTS predictions_by_confidence ON predictions (source, confidence, predicted_at)",
+    "CREATE INDEX IF NOT EXISTS predictions_by_time ON predictions (predicted_at)",
+    "CREATE TABLE IF NOT EXISTS generated_reports ("
+    "output_path TEXT PRIMARY KEY, source TEXT, patient_id TEXT, predicted_class TEXT, confidence REAL, "
+    "created_at TEXT, rendered_at TEXT)",
+    "CREATE INDEX IF NOT EXISTS generated_by_patient ON generated_reports (source, patient_id)",
+)
+
+
+# 🕒 Current UTC time as ISO text (sorts and compares as a string)
+def utc_now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+# 🕒 Modification time of a file as ISO text; what imported legacy records are dated with
+def file_time(path):
+    return datetime.fromtimestamp(os.path.getmtime(path), timezone.utc).isoformat(timespec="seconds")
+
+
+# 🏷️ Patient id of a report record; legacy records only have the PDF path (file stem, as in batch_pdf_extractor.py)
+def report_patient_id(record):
+    return record.get("patient_id") or os.path.basename(record.get("file_path", "")).split(".")[0]
+
+
+# 🗄️ Extracted reports, predictions and generated-report metadata in one SQLite file.
+# Every write is an upsert (reports keyed by PDF path, predictions by source and patient), so reruns replace rows
+# instead of rewriting whole files; reports and predictions are joined by the indexed patient_id in SQL, and
+# predictions are indexed by confidence and time.
+class ReportStore:
+    def __init__(self, path=STORE_PATH, commit_every=100):
+        self.path = path
+        self.commit_every = commit_every
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._counters = {"reports": 0, "predictions": 0, "generated": 0}
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)  # shared by the pipeline's stage threads
+        self._db.row_factory = sqlite3.Row
+        for statement in _SCHEMA:
+            self._db.execute(statement)
+        self._db.commit()
+
+    # ➕ Insert or replace the extracted report of a PDF
+    def upsert_report(self, record, updated_at=None):
+        row = [report_patient_id(record), record.get("file_path")]
+        row += [record.get(name) for name in REPORT_COLUMNS[:7]]
+        self._write(
+            "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row + [updated_at or utc_now()]
+        )
+        self._counters["reports"] += 1
+
+    # ➕ Insert or replace the latest prediction of a patient
+    def upsert_prediction(self, record, source="unknown", model_version=None, predicted_at=None):
+        if source not in SOURCES:
+            raise ValueError(f"Unsupported source: {source}. Choose one of {SOURCES}.")
+        self._write(
+            "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?, ?)",
+            (source, record["patient_id"], record["predicted_class"], record["confidence"], model_version,
+             predicted_at or utc_now()),
+        )
+        self._counters["predictions"] += 1
+
+    # 🧹 Drop reports whose PDF is no longer among existing_paths; returns how many
+    def prune_reports(self, existing_paths):
+        existing = set(existing_paths)
+        gone = [(path,) for (path,) in self._query("SELECT file_path FROM reports") if path not in existing]
+        with self._lock:
+            self._db.executemany("DELETE FROM reports WHERE file_path = ?", gone)
+            self._db.commit()
+        return len(gone)
+
+    # 🧹 Drop the predictions of a source whose patient is not among existing_ids (what a full rebuild just scored);
+    # returns how many. Called after the run succeeded, so a crash keeps the previous predictions
+    def prune_predictions(self, existing_ids, source="unknown"):
+        existing = set(existing_ids)
+        rows = self._query("SELECT patient_id FROM predictions WHERE source = ?", (source,))
+        gone = [patient_id for (patient_id,) in rows if patient_id not in existing]
+        self.remove_predictions(gone, source)
+        return len(gone)
+
+    # 🧹 Drop the predictions of patients whose image was removed or is about to be scored again
+    def remove_predictions(self, patient_ids, source="unknown"):
+        with self._lock:
+            self._db.executemany(
+                "DELETE FROM predictions WHERE source = ? AND patient_id = ?", [(source, pid) for pid in patient_ids]
+            )
+            self._db.commit()
+
+    # 🧹 Drop every prediction of a source (a full rebuild replaces them all)
+    def clear_predictions(self, source="unknown"):
+        with self._lock:
+            self._db.execute("DELETE FROM predictions WHERE source = ?", (source,))
+            self._db.commit()
+
+    # 📝 Remember a rendered report PDF and the prediction it shows
+    def record_generated(self, output_path, patient_id, prediction_info, created, source="unknown"):
+        self._write(
+            "INSERT OR REPLACE INTO generated_reports VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (output_path, source, patient_id, prediction_info.get("predicted_class"), prediction_info.get("confidence"),
+             created.isoformat(), utc_now()),
+        )
+        self._counters["generated"] += 1
+
+    # 💾 Commit in batches; an interrupted run keeps everything up to the last commit
+    def _write(self, sql, row):
+        with self._lock:
+            self._db.execute(sql, row)
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self._db.commit()
+                self._pending = 0
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    # 🔗 (report, prediction) of every report in PDF path order (the order of cleaned_reports.json), joined on
+    # patient_id through the predictions primary key; prediction is None for patients without one.
+    # patient_id limits it to one patient's reports (an index lookup on reports, a primary-key lookup on predictions)
+    def reports_with_predictions(self, source="unknown", patient_id=None):
+        sql = (
+            "SELECT r.*, p.predicted_class, p.confidence FROM reports r "
+            "LEFT JOIN predictions p ON p.source = ? AND p.patient_id = r.patient_id"
+        )
+        params = [source]
+        if patient_id is not None:
+            sql += " WHERE r.patient_id = ?"
+            params.append(patient_id)
+        rows = self._query(sql + " ORDER BY r.file_path", params)
+        for row in rows:
+            prediction = None
+            if row["predicted_class"] is not None:
+                prediction = {"patient_id": row["patient_id"], "predicted_class": row["predicted_class"],
+                              "confidence": row["confidence"]}
+            yield {name: row[name] for name in REPORT_COLUMNS}, prediction
+
+    # 📋 Predictions of a source in patient order, optionally only those below a confidence and / or made since an ISO date
+    def predictions(self, source="unknown", below=None, since=None):
+        sql = "SELECT * FROM predictions WHERE source = ?"
+        params = [source]
+        if below is not None:
+            sql += " AND confidence < ?"
+            params.append(below)
+        if since is not None:
+            sql += " AND predicted_at >= ?"
+            params.append(since)
+        return [dict(row) for row in self._query(sql + " ORDER BY patient_id", params)]
+
+    # ⚠️ "All low-confidence predictions since <date>"
+    def low_confidence(self, since=None, threshold=LOW_CONFIDENCE, source="unknown"):
+        return self.predictions(source, below=threshold, since=since)
+
+    # 📄 Report PDFs rendered for a patient, newest first
+    def generated_for(self, patient_id, source="unknown"):
+        rows = self._query(
+            "SELECT * FROM generated_reports WHERE source = ? AND patient_id = ? ORDER BY rendered_at DESC",
+            (source, patient_id),
+        )
+        return [dict(row) for row in rows]
+
+    # 📥 Load a legacy JSON / JSONL output (kind: "reports" or "predictions"); returns how many records.
+    # replace=True makes the table (or the source's predictions) match the file; otherwise records are merged in
+    def import_records(self, path, kind, source="unknown", replace=False):
+        stamp = file_time(path)
+        if replace and kind == "reports":
+            self.prune_reports(())
+        elif replace:
+            self.clear_predictions(source)
+        count = 0
+        for record in iter_records(path):
+            if kind == "reports":
+                self.upsert_report(record, updated_at=stamp)
+            else:
+                self.upsert_prediction(record, source, predicted_at=stamp)
+            count += 1
+        self.commit()
+        return count
+
+    # 📤 Write a table back out in the existing JSON / JSONL record layout; returns how many records
+    def export_records(self, path, kind, fmt="json", source="unknown"):
+        if kind == "reports":
+            rows = self._query(f"SELECT {', '.join(REPORT_COLUMNS)} FROM reports ORDER BY file_path")
+        else:
+            rows = self._query(
+                f"SELECT {', '.join(PREDICTION_COLUMNS)} FROM predictions WHERE source = ? ORDER BY patient_id", (source,)
+            )
+        writer = open_writer(path, fmt)
+        for row in rows:
+            writer.write(dict(row))
+        writer.close()
+        return writer.count
+
+    # 📊 Rows written this run and table sizes
+    def stats(self):
+        counters = {f"{name}_written": count for name, count in self._counters.items()}
+        for table in ("reports", "predictions", "generated_reports"):
+            counters[table] = self._query(f"SELECT COUNT(*) FROM {table}")[0][0]
+        return counters
+
+    def commit(self):
+        with self._lock:
+            self._db.commit()
+            self._pending = 0
+
+    # 💾 Flush pending writes
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
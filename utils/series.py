@@ -0,0 +1,77 @@
+# 📦 Required Imports
+import heapq
+
+# 🧮 How per-slice probabilities become one series verdict:
+# mean = average probability (soft vote), max = strongest slice per class (renormalized), vote = share of slice argmaxes
+AGGREGATES = ("mean", "max", "vote")
+
+# 🔦 Slices kept per class as attributions
+TOP_SLICES = 3
+
+
+# 📊 Running verdict of one series. Memory does not grow with the series: per-class sums, maxima and votes,
+# plus the top_k slices of each class in small heaps
+class SeriesAggregate:
+    def __init__(self, series_slices, class_names, top_k=TOP_SLICES):
+        self.slices = series_slices
+        self.class_names = class_names
+        self.top_k = top_k
+        self.count = 0
+        self.sums = [0.0] * len(class_names)
+        self.maxima = [0.0] * len(class_names)
+        self.votes = [0] * len(class_names)
+        self._top = [[] for _ in class_names]  # per class: min-heap of (probability, arrival, slice)
+
+    # ➕ Fold in one slice's probabilities
+    def add(self, dicom_slice, probabilities):
+        best = max(range(len(probabilities)), key=probabilities.__getitem__)
+        self.votes[best] += 1
+        for c, probability in enumerate(probabilities):
+            self.sums[c] += probability
+            self.maxima[c] = max(self.maxima[c], probability)
+            item = (probability, self.count, dicom_slice)
+            if len(self._top[c]) < self.top_k:
+                heapq.heappush(self._top[c], item)
+            else:
+                heapq.heappushpop(self._top[c], item)
+        self.count += 1
+
+    def done(self):
+        return self.count >= len(self.slices)
+
+    # 🏷️ Series verdict: class scores, the winning class, and the slices that most support it
+    def verdict(self, method="mean"):
+        if method not in AGGREGATES:
+            raise ValueError(f"Unsupported aggregate: {method}. Choose one of {AGGREGATES}.")
+        count = max(self.count, 1)
+        if method == "mean":
+            scores = [total / count for total in self.sums]
+        elif method == "max":
+            total = sum(self.maxima) or 1.0
+            scores = [maximum / total for maximum in self.maxima]
+        else:
+            scores = [votes / count for votes in self.votes]
+        best = max(range(len(scores)), key=scores.__getitem__)
+        top = sorted(self._top[best], key=lambda item: (-item[0], item[1]))
+        return {
+            "predicted_class": self.class_names[best],
+            "confidence": scores[best],
+            "scores": dict(zip(self.class_names, scores)),
+            "votes": dict(zip(self.class_names, self.votes)),
+            "top_slices": [(dicom_slice, probability) for probability, _, dicom_slice in top],
+        }
+
+
+# 🔁 Series verdicts as soon as each series' last slice is scored.
+# series: {series_uid: [slices to score]}; scored: (path, probabilities) in any order. Yields (series_uid, SeriesAggregate)
+def aggregate_series(series, scored, class_names, top_k=TOP_SLICES):
+    owner = {dicom_slice.path: (series_uid, dicom_slice) for series_uid, slices in series.items() for dicom_slice in slices}
+    open_series = {}
+    for path, probabilities in scored:
+        series_uid, dicom_slice = owner.pop(path)
+        aggregate = open_series.get(series_uid)
+        if aggregate is None:
+            aggregate = open_series[series_uid] = SeriesAggregate(series[series_uid], class_names, top_k)
+        aggregate.add(dicom_slice, probabilities)
+        if aggregate.done():
+            yield series_uid, open_series.pop(series_uid)
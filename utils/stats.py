@@ -0,0 +1,11 @@
+# 📦 Required Imports
+import math
+
+
+# 📐 Nearest-rank percentile of a list of numbers (q in 0-100)
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = min(max(math.ceil(q / 100 * len(ordered)) - 1, 0), len(ordered) - 1)
+    return ordered[rank]